@@ -0,0 +1,110 @@
+"""
+Booking admin changelist render time on a large table, before and after
+the changelist optimisations in bookings/admin.py.
+
+"before" restores the old BookingAdmin settings on the same data: a full
+COUNT(*) on every page, exact paginator counts, icontains search on
+every field and no date hierarchy. The indexes from migration 0004 are
+present in both columns.
+
+    python -m benchmarks.admin_changelist [--bookings 1000000] [--repeat 3]
+
+Seeds a throwaway database with bookings/seeding.py (about 5 minutes
+per million bookings on PostgreSQL). The estimated counts, trigram search
+and UPPER() indexes only apply on PostgreSQL, so run it with DB_HOST set;
+on SQLite only the skipped counts make a difference.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.common import setup_django, print_table, throwaway_database
+
+BEFORE = {
+    'show_full_result_count': True,
+    'search_fields': ['booking_reference', 'driver_name', 'driver_email', 'license_number'],
+    'date_hierarchy': None,
+}
+
+
+def cases():
+    from django.utils import timezone
+    from bookings.models import Booking
+
+    booking = Booking.objects.order_by('id').only('booking_reference', 'driver_name', 'license_number').first()
+    today = timezone.localdate()
+    return [
+        ('first page', {}),
+        ('page 50', {'p': 49}),
+        ('status filter', {'status__exact': 'CONFIRMED'}),
+        ('created this month', {'created_at__year': today.year, 'created_at__month': today.month}),
+        ('search reference', {'q': booking.booking_reference}),
+        ('search license', {'q': booking.license_number}),
+        ('search driver name', {'q': booking.driver_name}),
+    ]
+
+
+def render(client, params, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.get('/admin/bookings/booking/', params)
+            timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+    return statistics.median(timings), len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--bookings', type=int, default=1_000_000)
+    parser.add_argument('--vehicles', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib import admin
+    from django.core.paginator import Paginator
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from bookings import seeding
+    from bookings.models import Booking
+    from users.models import User
+
+    setup_test_environment()
+    with throwaway_database():
+        started = time.perf_counter()
+        seeding.seed(vehicles=args.vehicles, bookings=args.bookings, customers=1000, staff=1,
+                     workers=seeding.default_workers())
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        print(f'Seeded {args.bookings:,} bookings on {connection.vendor} in {time.perf_counter() - started:.0f}s\n')
+
+        client = Client()
+        client.force_login(User.objects.create_superuser(email='bench-admin@example.com', password=None))
+        model_admin = admin.site._registry[Booking]
+        after = {key: getattr(model_admin, key) for key in BEFORE}
+        after['paginator'] = model_admin.paginator
+
+        rows = []
+        for label, params in cases():
+            results = []
+            for config in ({**BEFORE, 'paginator': Paginator}, after):
+                for key, value in config.items():
+                    setattr(model_admin, key, value)
+                results.append(render(client, params, args.repeat))
+            (before_s, before_q), (after_s, after_q) = results
+            rows.append((
+                label, f'{before_s * 1000:,.0f} ms', f'{after_s * 1000:,.0f} ms',
+                f'{before_s / after_s:.1f}x', f'{before_q} -> {after_q}',
+            ))
+        print_table(['changelist', 'before', 'after', 'speed-up', 'queries'], rows)
+
+
+if __name__ == '__main__':
+    main()
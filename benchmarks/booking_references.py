@@ -0,0 +1,117 @@
+"""
+Booking reference generation: the old random 'LX-' + 6 characters versus
+the block-allocated counter in bookings/references.py.
+
+Reports
+- the birthday-problem chance that random references have collided after
+  N bookings,
+- insert throughput for --threads concurrent workers each creating
+  --bookings bookings, with failed inserts (IntegrityError on a duplicate
+  reference) counted for the random generator.
+
+    python -m benchmarks.booking_references [--threads 8] [--bookings 200]
+
+Inserts run against a throwaway test database (a temporary SQLite file,
+or test_<NAME> when DB_HOST points at PostgreSQL).
+"""
+import argparse
+import math
+import random
+import string
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from benchmarks.common import setup_django, print_table, throwaway_database
+
+RANDOM_SPACE = 36 ** 6
+
+
+def collision_probability(bookings):
+    return 1 - math.exp(-bookings * (bookings - 1) / (2 * RANDOM_SPACE))
+
+
+def random_reference():
+    return 'LX-' + ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+
+
+def booking_kwargs(user_id):
+    from django.utils import timezone
+
+    now = timezone.now()
+    return dict(
+        user_id=user_id, vehicle_id=1, pickup_date=now, return_date=now + timedelta(days=2),
+        pickup_location='Nairobi', return_location='Nairobi', driver_name='Bench',
+        driver_email='bench@example.com', driver_phone='+254700000000', license_number='DL-1',
+        base_price=Decimal('100.00'), total_price=Decimal('100.00'),
+    )
+
+
+def run_inserts(threads, per_thread, user_id, reference_factory):
+    from django.db import IntegrityError, connection
+    from bookings.models import Booking
+
+    failures = []
+
+    def worker():
+        failed = 0
+        try:
+            for _ in range(per_thread):
+                try:
+                    # bulk_create skips Booking.save() and the post_save notification
+                    Booking.objects.bulk_create([
+                        Booking(booking_reference=reference_factory(), **booking_kwargs(user_id))
+                    ])
+                except IntegrityError:
+                    failed += 1
+        finally:
+            failures.append(failed)
+            connection.close()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return threads * per_thread / elapsed, sum(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--bookings', type=int, default=200, help='Bookings per thread')
+    args = parser.parse_args()
+
+    setup_django()
+    from bookings.references import next_reference, reset_reference_cache
+
+    print_table(
+        ['bookings', 'P(random collision)'],
+        [(f'{n:,}', f'{collision_probability(n):.4%}') for n in (10_000, 100_000, 1_000_000, 5_000_000)],
+    )
+    print()
+
+    with throwaway_database():
+        from users.models import User
+
+        user = User.objects.create_user(email='bench@example.com', password=None)
+        rows = []
+        for label, factory in (('random (old)', random_reference), ('counter blocks', next_reference)):
+            reset_reference_cache()
+            rate, failed = run_inserts(args.threads, args.bookings, user.id, factory)
+            rows.append((label, f'{rate:,.0f}', failed))
+
+        start = time.perf_counter()
+        for _ in range(10_000):
+            next_reference()
+        generate = 10_000 / (time.perf_counter() - start)
+        rows.append(('counter blocks, no insert', f'{generate:,.0f}', 0))
+
+        print_table(['generator', f'inserts/s ({args.threads} threads)', 'failed inserts'], rows)
+
+
+if __name__ == '__main__':
+    main()
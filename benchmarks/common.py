@@ -0,0 +1,72 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run benchmarks from the project root as modules, e.g.:
+    python -m benchmarks.serialization
+"""
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "lexuBackend.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmark-only-secret-key")
+    import django
+    django.setup()
+
+
+def timed(func, repeat=5):
+    """Run func repeat times and return (median seconds, last result)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list, e.g. fraction=0.95"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+@contextmanager
+def throwaway_database():
+    """
+    Create a test database for the duration of the block: a temporary
+    SQLite file (so worker threads share it), or test_<NAME> on PostgreSQL.
+    """
+    from django.db import connection
+
+    test_name = None
+    if connection.vendor == 'sqlite':
+        handle, test_name = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        connection.settings_dict['TEST']['NAME'] = test_name
+        connection.settings_dict['OPTIONS']['timeout'] = 30
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        if test_name and os.path.exists(test_name):
+            os.remove(test_name)
+
+
+def print_table(headers, rows):
+    widths = [
+        max(len(str(header)), *(len(str(row[i])) for row in rows))
+        for i, header in enumerate(headers)
+    ]
+    line = '  '.join(str(h).ljust(w) for h, w in zip(headers, widths))
+    print(line)
+    print('-' * len(line))
+    for row in rows:
+        print('  '.join(str(c).ljust(w) for c, w in zip(row, widths)))
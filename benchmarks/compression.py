@@ -0,0 +1,77 @@
+"""
+Measure bytes saved by CompressionMiddleware on the major endpoints'
+payloads: uncompressed vs gzip vs padded gzip (credentialed requests)
+vs brotli (anonymous requests).
+
+    python -m benchmarks.compression [--rows 1000]
+
+The synthetic rows are more repetitive than production data, so treat the
+ratios as an upper bound.
+"""
+import argparse
+from datetime import timedelta
+
+from benchmarks.common import setup_django, print_table
+
+
+def build_notifications(rows):
+    from django.utils import timezone
+    from notifications.models import Notification
+
+    now = timezone.now()
+    return [
+        Notification(
+            id=i + 1, user_id=1, title='New Booking Received',
+            message=f'New booking #LX-{i:06d} from Jane Wanjiku. Vehicle: {i % 50 + 1}, '
+                    f'Dates: {now} to {now + timedelta(days=3)}. Total: $2847.00',
+            notification_type='BOOKING_NEW', priority='HIGH',
+            link='https://example.com/#/admin/bookings', created_at=now - timedelta(hours=i),
+        )
+        for i in range(rows)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000,
+                        help='rows in the unpaginated booking and notification lists')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.utils.text import compress_string
+    from lexuBackend.middleware import CompressionMiddleware, brotli
+    from lexuBackend.renderers import ORJSONRenderer
+    from bookings.serializers import BookingListSerializer, BookingSerializer
+    from fleet.serializers import VehicleListSerializer
+    from notifications.serializers import NotificationSerializer
+    from benchmarks.serialization import build_bookings, build_vehicles
+
+    bookings = build_bookings(args.rows)
+    endpoints = [
+        ('GET /api/vehicles/ (page of 10)', VehicleListSerializer(build_vehicles(10), many=True).data),
+        ('GET /api/vehicles/?page_size=100', VehicleListSerializer(build_vehicles(100), many=True).data),
+        (f'GET /api/bookings/ (staff, {args.rows})', BookingListSerializer(bookings, many=True).data),
+        (f'GET /api/bookings/?fields=... ({args.rows}, full)', BookingSerializer(bookings, many=True).data),
+        (f'GET /api/notifications/ (staff, {args.rows})', NotificationSerializer(build_notifications(args.rows), many=True).data),
+    ]
+
+    def pct(size, raw):
+        return f'{size} ({100 - size * 100 / raw:.0f}% saved)'
+
+    rows = []
+    for name, data in endpoints:
+        body = ORJSONRenderer().render(data)
+        raw = len(body)
+        gzip_size = len(compress_string(body))
+        padded_size = len(compress_string(body, max_random_bytes=CompressionMiddleware.max_random_bytes))
+        brotli_size = (
+            pct(len(brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)), raw)
+            if brotli else 'n/a'
+        )
+        rows.append((name, raw, pct(gzip_size, raw), pct(padded_size, raw), brotli_size))
+    print_table(('endpoint', 'raw bytes', 'gzip', 'gzip + padding', 'brotli'), rows)
+
+
+if __name__ == '__main__':
+    main()
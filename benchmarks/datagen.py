@@ -0,0 +1,50 @@
+"""
+Seed a database with benchmark data: N vehicles with galleries, M
+customers plus one staff user, and K bookings with their notifications.
+
+    python -m benchmarks.datagen [--vehicles 200] [--users 500] \\
+        [--bookings 5000] [--seed 0]
+
+This seeds the database configured in settings (SQLite by default, or
+PostgreSQL when DB_HOST is set); the load runner seeds a throwaway test
+database with the same function instead. Rows come from
+bookings/seeding.py, the generator behind `manage.py seed`, so the same
+--seed produces the same rows. Use `manage.py seed` for large volumes.
+"""
+import argparse
+
+from benchmarks.common import setup_django, print_table
+
+# The single staff user seed() creates
+STAFF_EMAIL = 'seed-staff0@example.com'
+
+
+def seed(vehicles=200, users=500, bookings=5000, seed=0):
+    """Seed the default database in this process and return the row counts written"""
+    from bookings import seeding
+
+    return seeding.seed(vehicles=vehicles, bookings=bookings, customers=users, staff=1, seed=seed, workers=1)
+
+
+def add_size_arguments(parser):
+    parser.add_argument('--vehicles', type=int, default=200)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--bookings', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    counts = seed(args.vehicles, args.users, args.bookings, args.seed)
+    print(f'Seeded {connection.settings_dict["NAME"]} ({connection.vendor})')
+    print_table(['table', 'rows'], [(name, f'{rows:,}') for name, rows in counts.items()])
+
+
+if __name__ == '__main__':
+    main()
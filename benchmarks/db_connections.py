@@ -0,0 +1,87 @@
+"""
+Measure per-request connection overhead against a PostgreSQL server for
+the three connection modes in settings.py:
+
+- per-request: CONN_MAX_AGE=0, a new (TLS) connection for every request
+- persistent:  CONN_MAX_AGE>0 with CONN_HEALTH_CHECKS
+- pool:        psycopg pool (OPTIONS['pool'])
+
+Each simulated request runs the same connection bookkeeping Django does on
+request_started/request_finished plus one small query.
+
+    DB_HOST=localhost DB_SSLMODE=disable DB_PASSWORD=postgres \\
+        python -m benchmarks.db_connections [--requests 200]
+
+Point it at a stand-in Postgres, e.g.
+    docker run --rm -p 5432:5432 -e POSTGRES_PASSWORD=postgres postgres:16
+"""
+import argparse
+import copy
+import statistics
+import time
+
+from benchmarks.common import setup_django, print_table
+
+
+def run_mode(base_settings, requests, conn_max_age, pool):
+    from django.db.utils import ConnectionHandler
+
+    db = copy.deepcopy(base_settings)
+    db['CONN_MAX_AGE'] = conn_max_age
+    db['CONN_HEALTH_CHECKS'] = conn_max_age > 0
+    db['OPTIONS'] = {k: v for k, v in db.get('OPTIONS', {}).items() if k != 'pool'}
+    if pool:
+        db['OPTIONS']['pool'] = {'min_size': 1, 'max_size': 2}
+
+    handler = ConnectionHandler({'default': db})
+    connection = handler['default']
+    timings = []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            # request_started / request_finished both call close_old_connections()
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            connection.close_if_unusable_or_obsolete()
+            timings.append(time.perf_counter() - start)
+    finally:
+        connection.close()
+        if pool:
+            connection.close_pool()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    base = settings.DATABASES['default']
+    if base['ENGINE'] != 'django.db.backends.postgresql':
+        raise SystemExit('Set DB_HOST (and DB_* credentials) to benchmark against PostgreSQL.')
+
+    modes = [
+        ('per-request (CONN_MAX_AGE=0)', 0, False),
+        ('persistent (CONN_MAX_AGE=600)', 600, False),
+        ('pool (psycopg_pool)', 0, True),
+    ]
+    rows = []
+    for name, conn_max_age, pool in modes:
+        timings = sorted(run_mode(base, args.requests, conn_max_age, pool))
+        rows.append((
+            name,
+            f'{statistics.median(timings) * 1000:.2f} ms',
+            f'{timings[int(len(timings) * 0.95) - 1] * 1000:.2f} ms',
+            f'{args.requests / sum(timings):.0f}',
+        ))
+    print(f'{args.requests} sequential requests against {base["HOST"]}:{base["PORT"]}')
+    print_table(('mode', 'p50', 'p95', 'req/s'), rows)
+
+
+if __name__ == '__main__':
+    main()
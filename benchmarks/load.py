@@ -0,0 +1,225 @@
+"""
+Load-test the booking and fleet APIs and compare against a saved baseline.
+
+Seeds a throwaway database (see benchmarks/datagen.py), then runs each
+scenario in benchmarks/scenarios.py with --concurrency worker threads,
+each making --iterations visits. Requests run in-process through the
+full middleware and view stack. For every endpoint it reports
+- req/s: requests per second of request time times the concurrency,
+  i.e. the rate the endpoint sustains on its own at that concurrency,
+- p50/p95/p99 latency and the number of unexpected status codes.
+
+    python -m benchmarks.load [--scenarios browse,book] [--iterations 50] \\
+        [--concurrency 1] [--output results.json] [--baseline baseline.json]
+
+With --baseline the run fails (exit status 1) when any endpoint's p95 is
+more than --tolerance slower, or its req/s more than --tolerance lower,
+than the baseline. Compare runs made on the same machine, database and
+data sizes; --output of one run is the --baseline of the next.
+
+Throttle rates are lifted for the run, since every simulated client
+shares one IP address.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from benchmarks.common import setup_django, percentile, print_table, throwaway_database
+from benchmarks.datagen import STAFF_EMAIL, add_size_arguments, seed
+from benchmarks.scenarios import SCENARIOS, Session
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def __call__(self, name, seconds, ok):
+        with self.lock:
+            self.timings[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+
+def ignore(name, seconds, ok):
+    pass
+
+
+def make_session(data, rng, record, signed_in_as):
+    from rest_framework_simplejwt.tokens import AccessToken
+    from users.models import User
+
+    token = None
+    if signed_in_as == 'staff':
+        token = AccessToken.for_user(User.objects.get(email=STAFF_EMAIL))
+    elif signed_in_as == 'customer':
+        token = AccessToken.for_user(User.objects.get(id=rng.choice(data['customer_ids'])))
+    return Session(data, rng, record, token=str(token) if token else None)
+
+
+def run_scenario(name, data, args):
+    from django.db import connection
+
+    flow, signed_in_as = SCENARIOS[name]
+    recorder = Recorder()
+
+    def worker(index):
+        try:
+            rng = random.Random(f'{args.seed}-{name}-{index}')
+            session = make_session(data, rng, recorder, signed_in_as)
+            for _ in range(args.iterations):
+                flow(session)
+        finally:
+            connection.close()
+
+    warmup = make_session(data, random.Random(f'{args.seed}-{name}-warmup'), ignore, signed_in_as)
+    for _ in range(args.warmup):
+        flow(warmup)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(args.concurrency)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    endpoints = {}
+    for endpoint, timings in recorder.timings.items():
+        timings.sort()
+        endpoints[endpoint] = {
+            'requests': len(timings),
+            'errors': recorder.errors[endpoint],
+            'req_s': round(len(timings) * args.concurrency / sum(timings), 1),
+            'p50_ms': round(percentile(timings, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(timings, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 2),
+        }
+    return {
+        'visits_s': round(args.iterations * args.concurrency / elapsed, 1),
+        'endpoints': endpoints,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return (rows, regressions) comparing p95 and req/s per endpoint"""
+    rows = []
+    regressions = []
+    for scenario, result in results['scenarios'].items():
+        base_endpoints = baseline.get('scenarios', {}).get(scenario, {}).get('endpoints', {})
+        for endpoint, stats in result['endpoints'].items():
+            base = base_endpoints.get(endpoint)
+            if base is None:
+                continue
+            p95_change = stats['p95_ms'] / base['p95_ms'] - 1 if base['p95_ms'] else 0.0
+            rate_change = stats['req_s'] / base['req_s'] - 1 if base['req_s'] else 0.0
+            regressed = p95_change > tolerance or rate_change < -tolerance
+            label = f'{scenario}/{endpoint}'
+            rows.append((label, f'{p95_change:+.0%}', f'{rate_change:+.0%}', 'REGRESSED' if regressed else 'ok'))
+            if regressed:
+                regressions.append(label)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_size_arguments(parser)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f'Comma-separated, from: {", ".join(SCENARIOS)}')
+    parser.add_argument('--iterations', type=int, default=50, help='Visits per worker per scenario')
+    parser.add_argument('--warmup', type=int, default=5, help='Unrecorded visits before each scenario')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'unknown scenario(s): {", ".join(sorted(unknown))}')
+
+    setup_django()
+    import django
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import override_settings, setup_test_environment
+    from django.utils import timezone
+
+    # testserver host, in-memory email backend
+    setup_test_environment()
+    no_throttling = override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}})
+
+    with throwaway_database(), no_throttling:
+        from django.db.models import Max
+
+        from bookings.models import Booking
+        from users.models import User
+        from fleet.models import Vehicle
+
+        counts = seed(args.vehicles, args.users, args.bookings, args.seed)
+        now = timezone.now()
+        last_return = Booking.objects.aggregate(last=Max('return_date'))['last']
+        data = {
+            'now': now,
+            # The book scenario creates bookings after every seeded one
+            'bookable_from': max(now, last_return or now),
+            'vehicle_ids': list(Vehicle.objects.values_list('id', flat=True)),
+            'customer_ids': list(User.objects.filter(is_staff=False).values_list('id', flat=True)),
+        }
+        results = {
+            'meta': {
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'concurrency': args.concurrency,
+                'iterations': args.iterations,
+                'seed': args.seed,
+                'rows': counts,
+                'timestamp': timezone.now().isoformat(timespec='seconds'),
+            },
+            'scenarios': {name: run_scenario(name, data, args) for name in scenarios},
+        }
+
+    rows = []
+    for scenario, result in results['scenarios'].items():
+        for endpoint, stats in result['endpoints'].items():
+            rows.append((
+                scenario, endpoint, stats['requests'], stats['errors'], f'{stats["req_s"]:,.1f}',
+                f'{stats["p50_ms"]:.1f}', f'{stats["p95_ms"]:.1f}', f'{stats["p99_ms"]:.1f}',
+            ))
+    print(f'{connection.vendor}, {args.concurrency} worker(s) x {args.iterations} visits, '
+          + ', '.join(f'{count:,} {table}' for table, count in counts.items()))
+    print_table(['scenario', 'endpoint', 'requests', 'errors', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms'], rows)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f'\nWrote {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        comparison, regressions = compare(results, baseline, args.tolerance)
+        print(f'\nAgainst {args.baseline} (tolerance {args.tolerance:.0%})')
+        mismatched = [
+            key for key in ('database', 'concurrency', 'rows')
+            if baseline.get('meta', {}).get(key) != results['meta'][key]
+        ]
+        if mismatched:
+            print(f'Warning: baseline differs in {", ".join(mismatched)}; the numbers are not comparable')
+        print_table(['endpoint', 'p95', 'req/s', 'result'], comparison or [('-', '-', '-', 'no shared endpoints')])
+        if regressions:
+            print(f'\n{len(regressions)} endpoint(s) regressed: {", ".join(regressions)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
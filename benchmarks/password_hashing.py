@@ -0,0 +1,62 @@
+"""
+Compare login cost for the hashers in PASSWORD_HASHERS.
+
+For each hasher this measures verify() calls per second (one login each)
+on a single thread, then on --threads threads to show how throughput
+scales across cores when the hash releases the GIL.
+
+    python -m benchmarks.password_hashing [--threads 4] [--logins 20]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import setup_django, timed, print_table
+
+PASSWORD = 'correct horse battery staple'
+
+
+def logins_per_second(hasher, encoded, logins, threads):
+    def run():
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(lambda _: hasher.verify(PASSWORD, encoded), range(logins)))
+        assert all(results)
+
+    seconds, _ = timed(run, repeat=3)
+    return logins / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--logins', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.hashers import get_hashers
+
+    rows = []
+    for hasher in get_hashers():
+        if hasher.algorithm == 'pbkdf2_sha1':
+            continue
+        start = time.perf_counter()
+        encoded = hasher.encode(PASSWORD, hasher.salt())
+        single_ms = (time.perf_counter() - start) * 1000
+        one = logins_per_second(hasher, encoded, args.logins, 1)
+        many = logins_per_second(hasher, encoded, args.logins, args.threads)
+        rows.append((
+            hasher.algorithm,
+            f'{single_ms:.1f}',
+            f'{one:.1f}',
+            f'{many:.1f}',
+            f'{many / one:.2f}x',
+        ))
+
+    print_table(
+        ['hasher', 'hash ms', 'logins/s (1 thread)', f'logins/s ({args.threads} threads)', 'scaling'],
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
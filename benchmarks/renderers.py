@@ -0,0 +1,66 @@
+"""
+Compare DRF's stdlib JSONRenderer with the orjson-backed ORJSONRenderer on
+large booking and vehicle list responses, and check both produce identical
+bytes.
+
+    python -m benchmarks.renderers [--rows 5000]
+"""
+import argparse
+
+from benchmarks.common import setup_django, timed, print_table
+
+
+def raw_booking_rows(bookings):
+    """Unserialised dicts with datetime/Decimal values, like UserDetailView builds"""
+    return [
+        {
+            'id': booking.id,
+            'booking_reference': booking.booking_reference,
+            'pickup_date': booking.pickup_date,
+            'return_date': booking.return_date,
+            'total_price': booking.total_price,
+            'status': booking.status,
+            'created_at': booking.created_at,
+        }
+        for booking in bookings
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from lexuBackend.renderers import ORJSONRenderer
+    from bookings.serializers import BookingSerializer
+    from fleet.serializers import VehicleSerializer
+    from benchmarks.serialization import build_bookings, build_vehicles
+
+    bookings = build_bookings(args.rows)
+    payloads = [
+        ('bookings (BookingSerializer)', BookingSerializer(bookings, many=True).data),
+        ('vehicles (VehicleSerializer)', VehicleSerializer(build_vehicles(args.rows), many=True).data),
+        ('bookings (raw datetime/Decimal)', raw_booking_rows(bookings)),
+    ]
+
+    rows = []
+    for name, data in payloads:
+        stdlib_seconds, stdlib_bytes = timed(lambda: JSONRenderer().render(data), args.repeat)
+        orjson_seconds, orjson_bytes = timed(lambda: ORJSONRenderer().render(data), args.repeat)
+        rows.append((
+            name,
+            f'{len(stdlib_bytes) / 1024:.1f} KiB',
+            f'{stdlib_seconds * 1000:.1f} ms',
+            f'{orjson_seconds * 1000:.1f} ms',
+            f'{stdlib_seconds / orjson_seconds:.1f}x',
+            'yes' if stdlib_bytes == orjson_bytes else 'NO',
+        ))
+    print(f'{args.rows} rows per response, median of {args.repeat} runs')
+    print_table(('payload', 'size', 'json', 'orjson', 'speedup', 'identical'), rows)
+
+
+if __name__ == '__main__':
+    main()
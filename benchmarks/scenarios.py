@@ -0,0 +1,116 @@
+"""
+User flows for the load runner. Each scenario is one visit: a function
+taking a Session and making a few requests through it.
+
+- browse:       anonymous fleet browsing (list, filters, facets, detail, calendar)
+- availability: a signed-in customer checking dates on several vehicles
+- book:         a customer checking a vehicle, booking it and viewing their bookings
+- admin:        the staff dashboard (all bookings, notifications, users, fleet counts)
+"""
+import itertools
+import time
+from datetime import timedelta
+
+CATEGORIES = ['Sports', 'SUV', 'Sedan', 'Electric']
+
+
+class Session:
+    """
+    One simulated client. Requests go through Django's test client, so
+    they run the full middleware and view stack in-process. Every request
+    is timed and recorded under an endpoint name.
+    """
+
+    def __init__(self, data, rng, record, token=None):
+        from django.test import Client
+
+        self.data = data
+        self.rng = rng
+        self.record = record
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        self.client = Client(headers=headers)
+
+    def request(self, name, method, path, expected=(200,), **kwargs):
+        start = time.perf_counter()
+        response = getattr(self.client, method)(path, **kwargs)
+        self.record(name, time.perf_counter() - start, response.status_code in expected)
+        return response
+
+    def get(self, name, path, data=None):
+        return self.request(name, 'get', path, data=data)
+
+    def post(self, name, path, data=None, expected=(200, 201)):
+        return self.request(name, 'post', path, expected=expected, data=data, content_type='application/json')
+
+    def vehicle_id(self):
+        return self.rng.choice(self.data['vehicle_ids'])
+
+    def future_dates(self, max_days=14):
+        pickup = self.data['now'] + timedelta(days=self.rng.randint(1, 300))
+        return pickup, pickup + timedelta(days=self.rng.randint(1, max_days))
+
+
+def browse(session):
+    session.get('vehicle-list', '/api/vehicles/')
+    session.get('vehicle-list-filtered', '/api/vehicles/', {
+        'category': session.rng.choice(CATEGORIES), 'ordering': 'price_per_day', 'page_size': 24,
+    })
+    session.get('vehicle-facets', '/api/vehicles/facets/')
+    vehicle_id = session.vehicle_id()
+    session.get('vehicle-detail', f'/api/vehicles/{vehicle_id}/')
+    session.get('vehicle-booked-dates', f'/api/vehicles/{vehicle_id}/booked-dates/')
+
+
+def availability(session):
+    for _ in range(3):
+        pickup, ret = session.future_dates()
+        session.get('vehicle-availability', f'/api/vehicles/{session.vehicle_id()}/availability/', {
+            'pickup_date': pickup.isoformat(), 'return_date': ret.isoformat(),
+        })
+
+
+# Booked windows start after the last seeded return date and move forward
+# for every booking, so runs never conflict with each other or the seed.
+_booking_slots = itertools.count()
+
+
+def book(session):
+    vehicle_id = session.vehicle_id()
+    pickup = session.data['bookable_from'] + timedelta(days=1 + 3 * next(_booking_slots))
+    ret = pickup + timedelta(days=2)
+    session.get('vehicle-availability', f'/api/vehicles/{vehicle_id}/availability/', {
+        'pickup_date': pickup.isoformat(), 'return_date': ret.isoformat(),
+    })
+    session.post('booking-create', '/api/bookings/', {
+        'vehicle_id': vehicle_id,
+        'pickup_date': pickup.isoformat(),
+        'return_date': ret.isoformat(),
+        'pickup_location': 'Nairobi CBD',
+        'return_location': 'Nairobi CBD',
+        'driver_name': 'Load Test',
+        'driver_email': 'loadtest@example.com',
+        'driver_phone': '+254700000000',
+        'license_number': 'DL-00000000',
+        'base_price': '400.00',
+        'total_price': '400.00',
+    })
+    session.get('booking-list-own', '/api/bookings/')
+    session.get('notification-unread-count', '/api/notifications/unread-count/')
+
+
+def admin(session):
+    session.get('booking-list-all', '/api/bookings/')
+    session.get('notification-list', '/api/notifications/')
+    session.get('notification-unread-count', '/api/notifications/unread-count/')
+    session.get('user-list', '/api/auth/users/')
+    session.get('vehicle-count', '/api/vehicles/count/')
+    session.post('notification-mark-all-read', '/api/notifications/mark-all-read/')
+
+
+# name: (flow, signed in as)
+SCENARIOS = {
+    'browse': (browse, None),
+    'availability': (availability, 'customer'),
+    'book': (book, 'customer'),
+    'admin': (admin, 'staff'),
+}
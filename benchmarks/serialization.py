@@ -0,0 +1,108 @@
+"""
+Compare payload size and serialisation time of the full and lean list
+serializers for fleet and bookings, per 1,000 rows.
+
+    python -m benchmarks.serialization [--rows 1000]
+
+Instances are built in memory so the numbers measure serialisation and
+rendering only, not the database.
+"""
+import argparse
+from datetime import timedelta
+from decimal import Decimal
+
+from benchmarks.common import setup_django, timed, print_table
+
+
+def build_vehicles(rows):
+    from django.utils import timezone
+    from fleet.models import Vehicle, VehicleImage
+
+    now = timezone.now()
+    vehicles = []
+    for i in range(rows):
+        vehicle = Vehicle(
+            id=i + 1, make='Lamborghini', model=f'Huracan {i}', year=2022,
+            category='Sports', price_per_day=Decimal('899.00'),
+            image=f'https://cdn.example.com/vehicles/{i}/primary.jpg',
+            transmission='Automatic', seats=2, engine='5.2L V10', horsepower=631,
+            zero_to_sixty='2.9s', top_speed='202 mph', current_status='AVAILABLE',
+            created_at=now,
+        )
+        vehicle.gallery_count = 6
+        # Stand-in for prefetch_related('images') so the full serializer has a gallery
+        vehicle._prefetched_objects_cache = {'images': [
+            VehicleImage(url=f'https://cdn.example.com/vehicles/{i}/{n}.jpg', position=n)
+            for n in range(6)
+        ]}
+        vehicles.append(vehicle)
+    return vehicles
+
+
+def build_bookings(rows):
+    from django.utils import timezone
+    from bookings.models import Booking
+
+    now = timezone.now()
+    return [
+        Booking(
+            id=i + 1, user_id=1, vehicle_id=i % 50 + 1,
+            pickup_date=now, return_date=now + timedelta(days=3),
+            pickup_location='Nairobi CBD', return_location='JKIA Terminal 1A',
+            driver_name='Jane Wanjiku', driver_email='jane@example.com',
+            driver_phone='+254700000000', license_number='DL-12345678',
+            license_image=f'licenses/user_1/license_{i}.png',
+            enhancements='["gps", "child_seat"]', base_price=Decimal('2697.00'),
+            enhancements_price=Decimal('150.00'), total_price=Decimal('2847.00'),
+            booking_reference=f'LX-{i:06d}', created_at=now, updated_at=now,
+        )
+        for i in range(rows)
+    ]
+
+
+def measure(serializer_class, instances, repeat):
+    from rest_framework.renderers import JSONRenderer
+
+    renderer = JSONRenderer()
+
+    def run():
+        return renderer.render(serializer_class(instances, many=True).data)
+
+    seconds, payload = timed(run, repeat)
+    return len(payload), seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from bookings.serializers import BookingSerializer, BookingListSerializer
+    from fleet.serializers import VehicleSerializer, VehicleListSerializer
+
+    vehicles = build_vehicles(args.rows)
+    bookings = build_bookings(args.rows)
+
+    cases = [
+        ('VehicleSerializer', VehicleSerializer, vehicles),
+        ('VehicleListSerializer', VehicleListSerializer, vehicles),
+        ('BookingSerializer', BookingSerializer, bookings),
+        ('BookingListSerializer', BookingListSerializer, bookings),
+    ]
+    rows = []
+    for name, serializer_class, instances in cases:
+        size, seconds = measure(serializer_class, instances, args.repeat)
+        scale = 1000 / args.rows
+        rows.append((
+            name,
+            f'{size * scale / 1024:.1f} KiB',
+            f'{seconds * scale * 1000:.1f} ms',
+        ))
+    print(f'Per 1,000 rows (measured on {args.rows}, median of {args.repeat} runs)')
+    print_table(('serializer', 'payload', 'time'), rows)
+
+
+if __name__ == '__main__':
+    main()
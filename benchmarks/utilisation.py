@@ -0,0 +1,89 @@
+"""
+Fleet utilisation report: a per-booking Python loop against the
+vectorised fleet/analytics.py on the same seeded data.
+
+"loop" is the straightforward version: iterate over Booking rows, mark
+every hour of every booking in a per-vehicle set, then count per category
+and hour. Both compute the same hourly booked-vehicle counts; the
+benchmark checks they agree.
+
+    python -m benchmarks.utilisation [--bookings 200000] [--days 365]
+
+Seeds a throwaway database with bookings/seeding.py.
+"""
+import argparse
+import time
+
+from benchmarks.common import setup_django, print_table, throwaway_database
+
+
+def loop_counts(start, hours):
+    """Booked vehicles per category and hour, one booking and hour at a time"""
+    from datetime import timedelta
+    from bookings.models import Booking
+    from fleet.analytics import OCCUPYING_STATUSES
+    from fleet.models import Vehicle
+
+    categories = dict(Vehicle.objects.values_list('id', 'category'))
+    end = start + timedelta(hours=hours)
+    booked_hours = {vehicle_id: set() for vehicle_id in categories}
+    bookings = Booking.objects.filter(
+        status__in=OCCUPYING_STATUSES, pickup_date__lt=end, return_date__gt=start
+    ).only('vehicle_id', 'pickup_date', 'return_date')
+    for booking in bookings.iterator(chunk_size=2000):
+        if booking.vehicle_id not in booked_hours:
+            continue
+        hour = int((booking.pickup_date - start).total_seconds() // 3600)
+        while hour < hours and start + timedelta(hours=hour) < booking.return_date:
+            if hour >= 0:
+                booked_hours[booking.vehicle_id].add(hour)
+            hour += 1
+
+    counts = {category: [0] * hours for category in set(categories.values())}
+    for vehicle_id, vehicle_hours in booked_hours.items():
+        row = counts[categories[vehicle_id]]
+        for hour in vehicle_hours:
+            row[hour] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--bookings', type=int, default=200_000)
+    parser.add_argument('--vehicles', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=365)
+    args = parser.parse_args()
+
+    setup_django()
+    from datetime import timedelta
+    from django.db import connection
+    from django.utils import timezone
+    from bookings import seeding
+    from fleet.analytics import category_occupancy
+
+    with throwaway_database():
+        seeding.seed(vehicles=args.vehicles, bookings=args.bookings, customers=1000, staff=1,
+                     workers=seeding.default_workers(), history_days=args.days)
+        start = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=args.days)
+        hours = args.days * 24
+
+        started = time.perf_counter()
+        expected = loop_counts(start, hours)
+        loop_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        categories, _, booked = category_occupancy(start, hours)
+        vectorised_s = time.perf_counter() - started
+
+        actual = {category: booked[index].tolist() for index, category in enumerate(categories)}
+        assert actual == expected, 'loop and vectorised counts differ'
+
+    print(f'{args.bookings:,} bookings, {args.vehicles:,} vehicles, {args.days} days on {connection.vendor}\n')
+    print_table(['implementation', 'seconds', 'speed-up'], [
+        ('loop', f'{loop_s:.2f}', '1.0x'),
+        ('vectorised', f'{vectorised_s:.2f}', f'{loop_s / vectorised_s:.1f}x'),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,24 @@
 from django.contrib import admin
+
+from lexuBackend.paginators import EstimatedCountPaginator
+
 from .models import Booking
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
+    """
+    Kept responsive on millions of rows: no unfiltered COUNT(*) per page,
+    estimated counts on PostgreSQL, and every filter and search backed by
+    an index (see Booking.Meta.indexes and migration 0004).
+    Search matches references, emails and license numbers exactly and
+    driver names by substring.
+    """
     list_display = ['booking_reference', 'driver_name', 'driver_email', 'vehicle_id', 'pickup_date', 'status', 'payment_status', 'created_at']
     list_filter = ['status', 'payment_status', 'created_at']
-    search_fields = ['booking_reference', 'driver_name', 'driver_email', 'license_number']
+    search_fields = ['=booking_reference', '=driver_email', '=license_number', 'driver_name']
+    search_help_text = 'Exact booking reference, email or license number, or part of the driver name'
     readonly_fields = ['booking_reference', 'created_at', 'updated_at']
+    raw_id_fields = ['user']
+    date_hierarchy = 'created_at'
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
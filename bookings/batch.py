@@ -0,0 +1,82 @@
+"""
+Conflict checks for batch booking creation.
+
+All requested intervals are checked against existing bookings with one
+query: active bookings of the requested vehicles that overlap the
+batch's overall date span. The per-item overlap test then runs in memory,
+together with the check for items of the batch that overlap each other.
+
+Items with a pickup branch must also find their vehicle at that branch
+(fleet/locations.py): one available_at query per distinct branch and
+window, however many vehicles share it.
+"""
+from collections import defaultdict
+
+from fleet.locations import available_at
+from fleet.models import Vehicle
+
+from .models import Booking
+
+ACTIVE_STATUSES = ['PENDING', 'CONFIRMED', 'ACTIVE']
+
+
+def _overlaps(start, end, other_start, other_end):
+    return start < other_end and end > other_start
+
+
+def find_conflicts(items):
+    """
+    items: list of (index, validated_data). Returns {index: error message}
+    for items that overlap an existing booking or an earlier item of the
+    batch for the same vehicle.
+    """
+    if not items:
+        return {}
+
+    existing = defaultdict(list)
+    rows = Booking.objects.filter(
+        vehicle_id__in={data['vehicle_id'] for _, data in items},
+        status__in=ACTIVE_STATUSES,
+        pickup_date__lt=max(data['return_date'] for _, data in items),
+        return_date__gt=min(data['pickup_date'] for _, data in items),
+    ).order_by().values_list('vehicle_id', 'pickup_date', 'return_date')
+    for vehicle_id, pickup_date, return_date in rows:
+        existing[vehicle_id].append((pickup_date, return_date))
+
+    conflicts = {}
+    accepted = defaultdict(list)
+    for index, data in items:
+        vehicle_id, start, end = data['vehicle_id'], data['pickup_date'], data['return_date']
+        if any(_overlaps(start, end, *interval) for interval in existing[vehicle_id]):
+            conflicts[index] = 'This vehicle is not available for the selected dates.'
+        elif any(_overlaps(start, end, *interval) for interval in accepted[vehicle_id]):
+            conflicts[index] = 'Overlaps another booking of the same vehicle in this batch.'
+        else:
+            accepted[vehicle_id].append((start, end))
+    return conflicts
+
+
+def find_branch_conflicts(items):
+    """
+    items: list of (index, validated_data). Returns {index: error message}
+    for items whose vehicle isn't expected at their pickup_branch.
+    """
+    groups = defaultdict(list)
+    for index, data in items:
+        if data.get('pickup_branch') is None:
+            continue
+        return_branch = data.get('return_branch')
+        key = (data['pickup_branch'].id, return_branch.id if return_branch else None,
+               data['pickup_date'], data['return_date'])
+        groups[key].append((index, data['vehicle_id']))
+
+    conflicts = {}
+    for (pickup_branch, return_branch, pickup_date, return_date), group in groups.items():
+        at_branch = set(available_at(
+            Vehicle.objects.filter(pk__in={vehicle_id for _, vehicle_id in group}),
+            [pickup_branch], pickup_date, return_date, return_branch,
+        ).values_list('id', flat=True))
+        for index, vehicle_id in group:
+            if vehicle_id not in at_branch:
+                conflicts[index] = 'This vehicle is not available at the selected pickup branch for these dates.'
+    return conflicts
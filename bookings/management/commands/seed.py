@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bookings import seeding
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with deterministic synthetic vehicles (with galleries), users, '
+        'bookings and notifications for local performance work'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vehicles', type=int, default=2000)
+        parser.add_argument('--bookings', type=int, default=200_000)
+        parser.add_argument('--users', type=int, default=5000, help='Customers to create')
+        parser.add_argument('--staff', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--history-days', type=int, default=730)
+        parser.add_argument('--future-days', type=int, default=180)
+        parser.add_argument(
+            '--workers', type=int,
+            help='Writer processes (default: CPU count on PostgreSQL, 1 on SQLite, which allows one writer at a time)',
+        )
+
+    def handle(self, *args, **options):
+        if User.objects.filter(email__startswith='seed-').exists():
+            raise CommandError('This database has already been seeded; seed a fresh database instead')
+
+        workers = options['workers'] or seeding.default_workers()
+        self.stdout.write(
+            f'Seeding {connection.settings_dict["NAME"]} ({connection.vendor}) '
+            f'with seed {options["seed"]} using {workers} process(es)...'
+        )
+        started = time.perf_counter()
+        try:
+            counts = seeding.seed(
+                vehicles=options['vehicles'], bookings=options['bookings'], customers=options['users'],
+                staff=options['staff'], seed=options['seed'], workers=workers,
+                history_days=options['history_days'], future_days=options['future_days'],
+                progress=lambda message: self.stdout.write(
+                    f'  {message} ({time.perf_counter() - started:.0f}s)'
+                ),
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        total = sum(counts.values())
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {total:,} rows in {elapsed:.0f}s ({total / max(elapsed, 0.001):,.0f} rows/s); '
+            f'every seeded user has the password "{seeding.PASSWORD}"'
+        ))
@@ -0,0 +1,52 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:50
+
+import bookings.models
+from django.db import migrations, models
+
+# Must match bookings.references.BLOCK_SIZE / SEQUENCE_NAME
+BLOCK_SIZE = 100
+SEQUENCE_NAME = 'bookings_reference_seq'
+
+
+def create_reference_counter(apps, schema_editor):
+    """PostgreSQL hands out reference blocks from a sequence, other backends from a counter row"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE SEQUENCE IF NOT EXISTS {SEQUENCE_NAME} INCREMENT BY {BLOCK_SIZE} MINVALUE 0 START WITH 0'
+        )
+    else:
+        ReferenceCounter = apps.get_model('bookings', 'ReferenceCounter')
+        ReferenceCounter.objects.get_or_create(name='booking', defaults={'value': 0})
+
+
+def drop_reference_counter(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP SEQUENCE IF EXISTS {SEQUENCE_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_booking_license_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferenceCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='pickup_date',
+            field=bookings.models.AwareDateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='return_date',
+            field=bookings.models.AwareDateTimeField(),
+        ),
+        migrations.RunPython(create_reference_counter, drop_reference_counter),
+    ]
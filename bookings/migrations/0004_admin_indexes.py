@@ -0,0 +1,66 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:00
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+TRIGRAM_INDEX_NAME = 'booking_driver_name_trgm_idx'
+
+
+def _trigram_index():
+    from django.contrib.postgres.indexes import GinIndex, OpClass
+    from django.db.models.functions import Upper
+
+    # Admin icontains search compares UPPER(driver_name) LIKE UPPER('%term%')
+    return GinIndex(OpClass(Upper('driver_name'), name='gin_trgm_ops'), name=TRIGRAM_INDEX_NAME)
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    Booking = apps.get_model('bookings', 'Booking')
+    schema_editor.add_index(Booking, _trigram_index())
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Booking = apps.get_model('bookings', 'Booking')
+    schema_editor.remove_index(Booking, _trigram_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_reference_counter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['-created_at'], name='bookings_bo_created_7d6386_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', '-created_at'], name='bookings_bo_status_eb4fb1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['payment_status', '-created_at'], name='bookings_bo_payment_122286_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(django.db.models.functions.text.Upper('booking_reference'), name='booking_reference_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(django.db.models.functions.text.Upper('driver_email'), name='booking_driver_email_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(django.db.models.functions.text.Upper('license_number'), name='booking_license_upper_idx'),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_admin_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['vehicle_id', 'status'], name='bookings_bo_vehicle_fba60e_idx'),
+        ),
+    ]
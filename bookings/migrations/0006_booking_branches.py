@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_vehicle_status_index'),
+        ('fleet', '0007_location'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='pickup_branch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='fleet.location'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='return_branch',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='fleet.location'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['return_branch', 'return_date'], name='bookings_bo_return__71c5cf_idx'),
+        ),
+    ]
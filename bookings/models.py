@@ -1,8 +1,10 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
+from .references import next_reference
 
 User = get_user_model()
 
@@ -83,6 +85,14 @@ class Booking(models.Model):
     return_date = AwareDateTimeField()
     pickup_location = models.CharField(max_length=200)
     return_location = models.CharField(max_length=200)
+    # Branches for location-aware availability; the free-text fields above
+    # stay for display and older bookings
+    pickup_branch = models.ForeignKey(
+        'fleet.Location', on_delete=models.PROTECT, blank=True, null=True, related_name='+'
+    )
+    return_branch = models.ForeignKey(
+        'fleet.Location', on_delete=models.PROTECT, blank=True, null=True, related_name='+', db_index=False
+    )
     
     # Driver information
     driver_name = models.CharField(max_length=200)
@@ -114,16 +124,39 @@ class Booking(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Admin changelist: default ordering, date hierarchy and filters
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['payment_status', '-created_at']),
+            # Admin exact-match search (iexact compares UPPER(column));
+            # driver_name has a trigram index on PostgreSQL, see migration 0004
+            models.Index(Upper('booking_reference'), name='booking_reference_upper_idx'),
+            models.Index(Upper('driver_email'), name='booking_driver_email_upper_idx'),
+            models.Index(Upper('license_number'), name='booking_license_upper_idx'),
+            # Per-vehicle lookups: availability checks and fleet/status.py
+            models.Index(fields=['vehicle_id', 'status']),
+            # Vehicles arriving at a branch, see fleet/locations.py
+            models.Index(fields=['return_branch', 'return_date']),
+        ]
 
     def __str__(self):
         return f"{self.booking_reference} - {self.driver_name}"
 
     def save(self, *args, **kwargs):
         if not self.booking_reference:
-            # Generate booking reference
-            import random
-            import string
-            prefix = 'LX'
-            random_chars = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-            self.booking_reference = f"{prefix}-{random_chars}"
+            # Unique by construction, see bookings/references.py
+            self.booking_reference = next_reference()
         super().save(*args, **kwargs)
+
+
+class ReferenceCounter(models.Model):
+    """
+    Block counter for booking references on databases without sequences
+    (PostgreSQL uses bookings_reference_seq instead).
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
@@ -0,0 +1,167 @@
+"""
+Collision-free booking references.
+
+A reference is 'LX-' followed by five Crockford base32 characters and one
+Luhn mod 32 check character, e.g. LX-7KQ2MX. The five characters encode a
+unique counter value, so two bookings never get the same reference.
+
+Counter values are handed out in blocks of BLOCK_SIZE per process:
+- PostgreSQL: nextval() on bookings_reference_seq, which counts in steps
+  of BLOCK_SIZE. Sequences are non-transactional, so concurrent workers
+  never wait on each other and a rolled-back block is never reused.
+- Other backends: an UPDATE on the ReferenceCounter row. The block is used
+  inside the allocating transaction and only kept for later bookings once
+  that transaction commits, so a rollback can't leak a block another
+  process then also receives.
+
+Each counter value's low 25 bits are permuted, so consecutive bookings
+don't get consecutive-looking references. Values from 2**25 on get
+extra leading characters rather than wrapping.
+
+Older references were 'LX-' plus six random characters from A-Z0-9, so
+a generated reference can match one. One query per block skips any
+value whose reference an existing booking already has.
+"""
+import os
+import threading
+
+from django.db import connections, router, transaction
+from django.db.models import F
+
+BLOCK_SIZE = 100
+SEQUENCE_NAME = 'bookings_reference_seq'
+COUNTER_NAME = 'booking'
+PREFIX = 'LX'
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'  # Crockford base32
+BASE = len(ALPHABET)
+BODY_LENGTH = 5
+BODY_BITS = 25
+BODY_MASK = (1 << BODY_BITS) - 1
+# Odd multiplier and XOR mask: a bijection on 25-bit values
+PERMUTE_MULTIPLIER = 0x1C8E2B5
+PERMUTE_XOR = 0x15A3C6E
+
+_lock = threading.Lock()
+_block = {'pid': None, 'values': []}
+
+
+def _permute(value):
+    return ((value * PERMUTE_MULTIPLIER) & BODY_MASK) ^ PERMUTE_XOR
+
+
+def _base32(value, length=0):
+    chars = []
+    while value or len(chars) < length:
+        value, digit = divmod(value, BASE)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def check_character(body):
+    """Luhn mod 32 check character for a base32 string"""
+    factor = 2
+    total = 0
+    for char in reversed(body):
+        addend = factor * ALPHABET.index(char)
+        total += addend // BASE + addend % BASE
+        factor = 1 if factor == 2 else 2
+    return ALPHABET[-total % BASE]
+
+
+def encode_reference(value):
+    """Encode a counter value as 'LX-' + base32 body + check character"""
+    high, low = divmod(value, 1 << BODY_BITS)
+    body = (_base32(high) if high else '') + _base32(_permute(low), BODY_LENGTH)
+    return f'{PREFIX}-{body}{check_character(body)}'
+
+
+def is_valid_reference(reference):
+    """True if reference is well formed and its check character matches (catches typos)"""
+    prefix, _, code = (reference or '').upper().partition('-')
+    if prefix != PREFIX or len(code) <= BODY_LENGTH or any(c not in ALPHABET for c in code):
+        return False
+    return check_character(code[:-1]) == code[-1]
+
+
+def _allocate_block(alias):
+    """
+    Reserve BLOCK_SIZE counter values on the given database; returns the
+    first value and whether the reservation is undone by a rollback.
+    """
+    from .models import ReferenceCounter
+
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT nextval(%s)', [SEQUENCE_NAME])
+            return cursor.fetchone()[0], False
+
+    counters = ReferenceCounter.objects.using(alias)
+    with transaction.atomic(using=alias):
+        if not counters.filter(name=COUNTER_NAME).update(value=F('value') + BLOCK_SIZE):
+            counters.get_or_create(name=COUNTER_NAME, defaults={'value': 0})
+            counters.filter(name=COUNTER_NAME).update(value=F('value') + BLOCK_SIZE)
+        return counters.get(name=COUNTER_NAME).value - BLOCK_SIZE, True
+
+
+def _free_values(alias, start):
+    """Values of the block starting at start whose reference no booking has yet"""
+    from .models import Booking
+
+    values = range(start, start + BLOCK_SIZE)
+    taken = set(
+        Booking.objects.using(alias).filter(
+            booking_reference__in=[encode_reference(v) for v in values]
+        ).order_by().values_list('booking_reference', flat=True)
+    )
+    return [v for v in values if encode_reference(v) not in taken]
+
+
+def _take_cached(count):
+    with _lock:
+        if _block['pid'] != os.getpid():
+            # Forked worker: the parent's block is not ours to use
+            _block['pid'] = os.getpid()
+            _block['values'] = []
+        values = _block['values']
+        taken = values[:count]
+        del values[:count]
+    return taken
+
+
+def _adopt(values):
+    """Keep the unused values of a block for later bookings"""
+    with _lock:
+        if _block['pid'] == os.getpid():
+            _block['values'].extend(values)
+
+
+def next_references(count):
+    """Return count new, unique booking references"""
+    from .models import Booking
+
+    alias = router.db_for_write(Booking)
+    values = _take_cached(count)
+    while len(values) < count:
+        start, transactional = _allocate_block(alias)
+        free = _free_values(alias, start)
+        needed = count - len(values)
+        values.extend(free[:needed])
+        leftover = free[needed:]
+        if leftover and transactional:
+            transaction.on_commit(lambda leftover=leftover: _adopt(leftover), using=alias)
+        elif leftover:
+            _adopt(leftover)
+    return [encode_reference(v) for v in values]
+
+
+def next_reference():
+    return next_references(1)[0]
+
+
+def reset_reference_cache():
+    """Forget the cached block (tests that flush the database)"""
+    with _lock:
+        _block['pid'] = None
+        _block['values'] = []
@@ -0,0 +1,323 @@
+"""
+Synthetic data for reproducing production volumes locally; used by
+`manage.py seed` and the benchmarks.
+
+Rows are generated in fixed-size chunks, each with its own random
+generator derived from the seed and the chunk number. The same seed and
+sizes therefore produce the same rows (relative to the time of seeding)
+however many processes write them. Chunks are written with bulk_create,
+one transaction per batch, which skips save() and post_save: seeding
+sends no notifications or emails.
+
+Bookings of a vehicle follow each other along a timeline from
+history_days ago to future_days ahead, and stop there: asking for more
+bookings than fit the window creates fewer. Short rentals are most common,
+gaps shrink in the December and July-August peaks, and a cancelled
+booking leaves its slot free, so cancelled bookings overlap later ones.
+Past bookings are completed, current ones active and future ones pending
+or confirmed; each was created 1-60 days before its pickup. Every booking
+gets a matching notification for its customer; bookings created within
+NOTIFICATION_RETENTION_DAYS also notify each staff user. Vehicles are
+parked at a Location per LOCATIONS entry in turn; bookings only get
+free-text locations, so they never move vehicles between branches.
+"""
+import multiprocessing
+import os
+import random
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.db.models import F, Value
+from django.utils import timezone
+
+PASSWORD = 'seed-password'
+CUSTOMER_EMAIL = 'seed-user{}@example.com'
+STAFF_EMAIL = 'seed-staff{}@example.com'
+
+VEHICLES_PER_CHUNK = 50
+BATCH_SIZE = 2000
+
+MAKES = {
+    'Sports': [('Porsche', '911'), ('Lamborghini', 'Huracan'), ('Ferrari', 'Roma'), ('McLaren', '720S')],
+    'SUV': [('Toyota', 'Land Cruiser'), ('Range Rover', 'Sport'), ('Mercedes', 'G-Class')],
+    'Sedan': [('Mercedes', 'E-Class'), ('BMW', '5 Series'), ('Audi', 'A6'), ('Toyota', 'Camry')],
+    'Electric': [('Tesla', 'Model S'), ('Porsche', 'Taycan'), ('BMW', 'iX')],
+    'Convertible': [('Mercedes', 'SL'), ('BMW', 'Z4'), ('Porsche', 'Boxster')],
+}
+PRICE_RANGES = {
+    'Sports': (600, 1500), 'SUV': (150, 600), 'Sedan': (80, 300), 'Electric': (150, 700), 'Convertible': (250, 900),
+}
+LOCATIONS = ['Nairobi CBD', 'JKIA Terminal 1A', 'Westlands', 'Karen', 'Mombasa Airport', 'Kisumu']
+TIERS = ['SILVER'] * 6 + ['GOLD'] * 3 + ['PLATINUM', 'BLACK']
+# Rental length in days and relative frequency
+RENTAL_DAYS = [1, 2, 3, 4, 5, 7, 10, 14, 21]
+RENTAL_WEIGHTS = [18, 22, 18, 10, 8, 10, 6, 5, 3]
+SEASON = {12: 1.8, 7: 1.5, 8: 1.6, 4: 1.2}  # month: demand multiplier
+CANCELLED_SHARE = 0.08
+
+
+def _bulk_create(model, objs):
+    for start in range(0, len(objs), BATCH_SIZE):
+        with transaction.atomic():
+            model.objects.bulk_create(objs[start:start + BATCH_SIZE])
+
+
+def _restore_created_at(bookings, leads, now):
+    """
+    bulk_create stamps created_at with the current time (auto_now_add).
+    Set the generated values back: lead days before pickup, or now.
+    One UPDATE per lead time, since most bookings share one.
+    """
+    from bookings.models import Booking
+
+    by_lead = defaultdict(list)
+    for booking, lead in zip(bookings, leads):
+        by_lead[lead].append(booking.pk)
+    for lead, ids in sorted(by_lead.items(), key=lambda item: item[0] or 0):
+        created_at = Value(now) if lead is None else F('pickup_date') - timedelta(days=lead)
+        for start in range(0, len(ids), BATCH_SIZE):
+            Booking.objects.filter(pk__in=ids[start:start + BATCH_SIZE]).update(created_at=created_at)
+
+
+def _chunk_rng(seed, kind, chunk):
+    return random.Random(f'{seed}-{kind}-{chunk}')
+
+
+def seed_users(customers, staff, seed):
+    """Create the customers and staff users (password PASSWORD, hashed once); returns their ids"""
+    from users.models import User
+
+    rng = _chunk_rng(seed, 'users', 0)
+    password = make_password(PASSWORD)
+    users = [
+        User(
+            email=CUSTOMER_EMAIL.format(i), password=password, first_name='Seed', last_name=str(i),
+            membership_tier=rng.choice(TIERS), points=rng.randrange(0, 5000),
+            phone_number=f'+2547{i:08d}', license_number=f'DL-{i:08d}',
+        )
+        for i in range(customers)
+    ]
+    users += [User(email=STAFF_EMAIL.format(i), password=password, is_staff=True) for i in range(staff)]
+    _bulk_create(User, users)
+    seeded = User.objects.filter(email__startswith='seed-').order_by('id')
+    return (
+        list(seeded.filter(is_staff=False).values_list('id', flat=True)),
+        list(seeded.filter(is_staff=True).values_list('id', flat=True)),
+    )
+
+
+def seed_locations():
+    """Create a branch per LOCATIONS entry (kept if it exists); returns their ids"""
+    from fleet.models import Location
+
+    return [Location.objects.get_or_create(name=name)[0].id for name in LOCATIONS]
+
+
+def seed_vehicle_chunk(task):
+    """Create one chunk of vehicles with 3-8 gallery images each; returns [(number, id, price_per_day)]"""
+    from fleet.models import Vehicle, VehicleImage
+
+    seed, chunk, count, location_ids = task
+    rng = _chunk_rng(seed, 'vehicles', chunk)
+    vehicles = []
+    for i in range(count):
+        number = chunk * VEHICLES_PER_CHUNK + i
+        category = rng.choice(list(MAKES))
+        make, model = rng.choice(MAKES[category])
+        vehicles.append(Vehicle(
+            make=make, model=f'{model} #{number}', year=rng.randint(2017, 2025), category=category,
+            price_per_day=Decimal(rng.randrange(*PRICE_RANGES[category])),
+            image=f'https://cdn.example.com/seed/{number}/0.jpg',
+            transmission=rng.choice(['Automatic'] * 4 + ['Manual']),
+            seats=rng.choice([2, 2, 4, 5, 5, 7]), engine=f'{rng.choice([2.0, 3.0, 4.0, 5.2])}L',
+            horsepower=rng.randint(150, 750), zero_to_sixty=f'{rng.uniform(2.8, 9.5):.1f}s',
+            top_speed=f'{rng.randint(120, 210)} mph',
+            current_location_id=location_ids[number % len(location_ids)],
+        ))
+    with transaction.atomic():
+        # PostgreSQL and SQLite return the new primary keys
+        Vehicle.objects.bulk_create(vehicles)
+        VehicleImage.objects.bulk_create([
+            VehicleImage(
+                vehicle=vehicle, url=f'https://cdn.example.com/seed/{chunk * VEHICLES_PER_CHUNK + i}/{n}.jpg',
+                position=n, width=1600, height=900,
+            )
+            for i, vehicle in enumerate(vehicles)
+            for n in range(rng.randint(3, 8))
+        ])
+    return [(chunk * VEHICLES_PER_CHUNK + i, v.id, v.price_per_day) for i, v in enumerate(vehicles)]
+
+
+def _booking_status(rng, pickup, ret, now):
+    if ret < now:
+        return 'COMPLETED', 'PAID'
+    if pickup <= now:
+        return 'ACTIVE', 'PENDING'
+    return rng.choice(['PENDING', 'CONFIRMED', 'CONFIRMED']), 'PENDING'
+
+
+def _notification_for(booking, user_id, notification_type, created_at, now):
+    from notifications.models import Notification
+
+    return Notification(
+        user_id=user_id, title=f'Booking {booking.booking_reference}',
+        message=f'{booking.driver_name}: {booking.pickup_date:%d %b} to {booking.return_date:%d %b}',
+        notification_type=notification_type, link=f'/bookings/{booking.booking_reference}',
+        is_read=created_at < now - timedelta(days=7), created_at=created_at,
+    )
+
+
+def seed_booking_chunk(task):
+    """Create the bookings and notifications for one chunk of vehicles; returns (bookings, notifications)"""
+    from bookings.models import Booking
+    from bookings.references import next_references
+    from notifications.models import Notification
+
+    seed, chunk, vehicles, count, customer_ids, staff_ids, now, history_days, future_days = task
+    rng = _chunk_rng(seed, 'bookings', chunk)
+    start, end = now - timedelta(days=history_days), now + timedelta(days=future_days)
+    mean_rental = sum(d * w for d, w in zip(RENTAL_DAYS, RENTAL_WEIGHTS)) / sum(RENTAL_WEIGHTS)
+    per_vehicle = count / max(len(vehicles), 1)
+    # Free days between rentals so each vehicle's bookings roughly fill the window
+    mean_gap = max((end - start).days / max(per_vehicle, 1) - mean_rental, 0.25)
+    notify_since = now - timedelta(days=getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90))
+
+    bookings = []
+    leads = []
+    for index, (vehicle_id, price_per_day) in enumerate(vehicles):
+        cursor = start
+        share = int(per_vehicle * (index + 1)) - int(per_vehicle * index)
+        for _ in range(share):
+            cursor += timedelta(days=rng.expovariate(1 / mean_gap) / SEASON.get(cursor.month, 1.0))
+            pickup = cursor.replace(hour=rng.choice([8, 9, 10, 12, 14, 16]), minute=0, second=0, microsecond=0)
+            if pickup < cursor:
+                pickup += timedelta(days=1)
+            days = rng.choices(RENTAL_DAYS, RENTAL_WEIGHTS)[0]
+            ret = pickup + timedelta(days=days)
+            if ret > end:
+                break
+            if rng.random() < CANCELLED_SHARE:
+                status, payment_status = 'CANCELLED', rng.choice(['PENDING', 'REFUNDED'])
+            else:
+                status, payment_status = _booking_status(rng, pickup, ret, now)
+                cursor = ret
+            base_price = price_per_day * days
+            extras = Decimal(rng.choice([0, 0, 0, 25, 50, 120]) * days)
+            # Bookings are made 1-60 days before pickup, and not in the future
+            lead = rng.randint(1, 60)
+            if pickup - timedelta(days=lead) > now:
+                lead = None
+            leads.append(lead)
+            bookings.append(Booking(
+                user_id=rng.choice(customer_ids), vehicle_id=vehicle_id, pickup_date=pickup, return_date=ret,
+                pickup_location=rng.choice(LOCATIONS), return_location=rng.choice(LOCATIONS),
+                driver_name=f'Driver {rng.randrange(100000)}', driver_email='driver@example.com',
+                driver_phone=f'+2547{rng.randrange(10 ** 8):08d}', license_number=f'DL-{rng.randrange(10 ** 8):08d}',
+                enhancements='["gps"]' if extras else '[]', base_price=base_price,
+                enhancements_price=extras, total_price=base_price + extras,
+                payment_status=payment_status, status=status,
+                created_at=now if lead is None else pickup - timedelta(days=lead),
+            ))
+
+    for booking, reference in zip(bookings, next_references(len(bookings))):
+        booking.booking_reference = reference
+
+    notifications = []
+    for booking in bookings:
+        booked_at = booking.created_at
+        customer_type = 'BOOKING_CANCELLED' if booking.status == 'CANCELLED' else 'BOOKING_CONFIRMED'
+        notifications.append(_notification_for(booking, booking.user_id, customer_type, booked_at, now))
+        if booked_at >= notify_since:
+            notifications += [
+                _notification_for(booking, staff_id, 'BOOKING_NEW', booked_at, now) for staff_id in staff_ids
+            ]
+
+    _bulk_create(Booking, bookings)
+    _restore_created_at(bookings, leads, now)
+    _bulk_create(Notification, notifications)
+    return len(bookings), len(notifications)
+
+
+def _init_worker():
+    import django
+
+    django.setup()
+    # Never share the parent's database connections
+    connections.close_all()
+
+
+def _chunk_counts(total, size):
+    return [min(size, total - start) for start in range(0, total, size)]
+
+
+def seed(vehicles=2000, bookings=200_000, customers=5000, staff=2, seed=0, workers=1,
+         history_days=730, future_days=180, progress=None):
+    """
+    Seed the default database. workers > 1 writes chunks from that many
+    processes. progress, if given, is called with a message per finished
+    phase. Returns the number of rows created per table.
+    """
+    from fleet.pricing import rebuild_occupancy
+    from fleet.status import refresh_vehicle_status
+
+    now = timezone.now()
+    report = progress or (lambda message: None)
+    customer_ids, staff_ids = seed_users(customers, staff, seed)
+    report(f'{len(customer_ids) + len(staff_ids):,} users')
+    location_ids = seed_locations()
+
+    pool = None
+    if workers > 1:
+        connections.close_all()
+        method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        pool = multiprocessing.get_context(method).Pool(workers, initializer=_init_worker)
+    run = pool.imap if pool else map
+    try:
+        vehicle_tasks = [
+            (seed, chunk, count, location_ids)
+            for chunk, count in enumerate(_chunk_counts(vehicles, VEHICLES_PER_CHUNK))
+        ]
+        # Chunks may finish in any order; bookings follow the vehicle numbers, not ids
+        created = sorted(row for chunk in run(seed_vehicle_chunk, vehicle_tasks) for row in chunk)
+        vehicle_count = len(created)
+        report(f'{vehicle_count:,} vehicles')
+
+        fleet = [(vehicle_id, price) for _, vehicle_id, price in created]
+        chunks = [fleet[start:start + VEHICLES_PER_CHUNK] for start in range(0, len(fleet), VEHICLES_PER_CHUNK)]
+        if bookings and not (chunks and customer_ids):
+            raise ValueError('Seeding bookings needs at least one vehicle and one customer')
+        booking_tasks = [
+            (seed, chunk, vehicle_chunk, int(bookings * (chunk + 1) / len(chunks)) - int(bookings * chunk / len(chunks)),
+             customer_ids, staff_ids, now, history_days, future_days)
+            for chunk, vehicle_chunk in enumerate(chunks)
+        ]
+        booking_count = notification_count = 0
+        for created_bookings, created_notifications in run(seed_booking_chunk, booking_tasks):
+            booking_count += created_bookings
+            notification_count += created_notifications
+        report(f'{booking_count:,} bookings, {notification_count:,} notifications')
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    # bulk_create sends no signals; derive every vehicle's status in one
+    # UPDATE and the pricing occupancy per category
+    refresh_vehicle_status(now=now)
+    rebuild_occupancy()
+    report('vehicle statuses and occupancy')
+
+    return {
+        'users': len(customer_ids) + len(staff_ids),
+        'vehicles': vehicle_count,
+        'bookings': booking_count,
+        'notifications': notification_count,
+    }
+
+
+def default_workers():
+    return 1 if connections['default'].vendor == 'sqlite' else os.cpu_count() or 1
@@ -1,11 +1,12 @@
 from rest_framework import serializers
+from lexuBackend.serializers import SparseFieldsMixin
 from .models import Booking
 from django.utils import timezone
 from datetime import datetime
 import json
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # Explicitly define datetime fields to ensure proper handling
     pickup_date = serializers.DateTimeField()
     return_date = serializers.DateTimeField()
@@ -14,12 +15,17 @@ class BookingSerializer(serializers.ModelSerializer):
         model = Booking
         fields = [
             'id', 'user', 'vehicle_id', 'pickup_date', 'return_date',
-            'pickup_location', 'return_location', 'driver_name', 'driver_email',
+            'pickup_location', 'return_location', 'pickup_branch', 'return_branch', 'driver_name', 'driver_email',
             'driver_phone', 'license_number', 'license_image', 'enhancements', 'base_price',
             'enhancements_price', 'total_price', 'payment_status', 'payment_method',
             'status', 'booking_reference', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'user', 'booking_reference', 'created_at', 'updated_at']
+        # Default to the branch names, see validate()
+        extra_kwargs = {
+            'pickup_location': {'required': False},
+            'return_location': {'required': False},
+        }
 
     def to_internal_value(self, data):
         """Convert naive datetimes to aware datetimes before validation"""
@@ -108,6 +114,18 @@ class BookingSerializer(serializers.ModelSerializer):
             return timezone.make_aware(value, timezone.get_current_timezone())
         return value
 
+    def validate(self, attrs):
+        """Fill in the free-text locations from the branches when they are left out"""
+        attrs = super().validate(attrs)
+        if self.partial:
+            return attrs
+        for branch, location in (('pickup_branch', 'pickup_location'), ('return_branch', 'return_location')):
+            if not attrs.get(location):
+                if not attrs.get(branch):
+                    raise serializers.ValidationError({location: 'This field is required.'})
+                attrs[location] = attrs[branch].name
+        return attrs
+
     def validate_enhancements(self, value):
         if value:
             try:
@@ -132,4 +150,38 @@ class BookingSerializer(serializers.ModelSerializer):
                 return_date, timezone.get_current_timezone()
             )
         
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+
+class BookingListSerializer(serializers.ModelSerializer):
+    """
+    Lightweight representation for booking tables.
+    Omits driver contact details, license data and pricing breakdown.
+    """
+
+    class Meta:
+        model = Booking
+        fields = [
+            'id', 'booking_reference', 'vehicle_id', 'driver_name', 'pickup_date',
+            'return_date', 'total_price', 'status', 'payment_status', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class BookingBatchSerializer(serializers.Serializer):
+    """
+    Envelope for POST /api/bookings/batch/. Each entry of `bookings` is
+    validated separately with BookingSerializer so partial mode can report
+    per-item errors.
+    """
+    MODE_CHOICES = [
+        ('atomic', 'All or nothing'),
+        ('partial', 'Create the valid bookings, report the rest'),
+    ]
+
+    mode = serializers.ChoiceField(choices=MODE_CHOICES, default='atomic')
+    bookings = serializers.ListField(
+        child=serializers.DictField(),
+        min_length=1,
+        max_length=50,
+    )
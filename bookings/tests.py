@@ -1,3 +1,358 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from fleet.models import Location, Vehicle
+from notifications.models import Notification
+from users.models import User
+
+from . import references, seeding
+from .models import Booking, ReferenceCounter
+from .references import (
+    BLOCK_SIZE, check_character, encode_reference, is_valid_reference, next_references, reset_reference_cache,
+)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Safe reads on the fleet/availability endpoints go to the replica alias"""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='driver@example.com', password='pass')
+        self.vehicle = Vehicle.objects.create(
+            make='Porsche', model='911', year=2023, category='Sports', price_per_day='500.00'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def queries_by_alias(self, method, path, **kwargs):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = getattr(self.client, method)(path, **kwargs)
+        return response, len(primary), len(replica)
+
+    def booking_payload(self):
+        return {
+            'vehicle_id': self.vehicle.id,
+            'pickup_date': '2030-01-01T10:00:00Z',
+            'return_date': '2030-01-03T10:00:00Z',
+            'pickup_location': 'Nairobi',
+            'return_location': 'Nairobi',
+            'driver_name': 'Driver',
+            'driver_email': 'driver@example.com',
+            'driver_phone': '0700000000',
+            'license_number': 'DL-1',
+            'base_price': '1000.00',
+            'total_price': '1000.00',
+        }
+
+    def test_vehicle_list_reads_from_replica(self):
+        response, primary, replica = self.queries_by_alias('get', '/api/vehicles/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_booked_dates_reads_from_replica(self):
+        response, primary, replica = self.queries_by_alias(
+            'get', f'/api/vehicles/{self.vehicle.id}/booked-dates/'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_booking_creation_pins_user_to_primary(self):
+        response, _, replica = self.queries_by_alias(
+            'post', '/api/bookings/', data=self.booking_payload(), format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(replica, 0)
+
+        response, primary, replica = self.queries_by_alias(
+            'get', f'/api/vehicles/{self.vehicle.id}/booked-dates/'
+        )
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+        self.assertEqual(len(response.data['bookings']), 1)
+
+        # Other users are not pinned
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email='other@example.com', password='pass'))
+        self.client = other
+        _, primary, replica = self.queries_by_alias('get', '/api/vehicles/')
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+class BatchBookingTests(TestCase):
+    """Batch creation checks all intervals in one query and writes in one transaction"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='corporate@example.com', password='pass')
+        self.vehicles = [
+            Vehicle.objects.create(
+                make='Toyota', model='Prado', year=2022, category='SUV', price_per_day='100.00'
+            )
+            for _ in range(3)
+        ]
+        Booking.objects.create(
+            user=self.user, vehicle_id=self.vehicles[0].id,
+            pickup_date=datetime(2030, 1, 2, 10, tzinfo=dt_timezone.utc),
+            return_date=datetime(2030, 1, 4, 10, tzinfo=dt_timezone.utc), pickup_location='Nairobi', return_location='Nairobi',
+            driver_name='Existing', driver_email='existing@example.com', driver_phone='0700000000',
+            license_number='DL-0', base_price='200.00', total_price='200.00', status='CONFIRMED',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def item(self, vehicle, pickup='2030-01-01T10:00:00Z', return_date='2030-01-03T10:00:00Z'):
+        return {
+            'vehicle_id': vehicle.id,
+            'pickup_date': pickup,
+            'return_date': return_date,
+            'pickup_location': 'Nairobi',
+            'return_location': 'Nairobi',
+            'driver_name': 'Corporate',
+            'driver_email': 'corporate@example.com',
+            'driver_phone': '0700000000',
+            'license_number': 'DL-1',
+            'base_price': '200.00',
+            'total_price': '200.00',
+        }
+
+    def post(self, bookings, mode='atomic'):
+        return self.client.post(
+            '/api/bookings/batch/', {'mode': mode, 'bookings': bookings}, format='json'
+        )
+
+    def test_atomic_batch_creates_all(self):
+        response = self.post([self.item(self.vehicles[1]), self.item(self.vehicles[2])])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['created']), 2)
+        references = {b['booking_reference'] for b in response.data['created']}
+        self.assertEqual(len(references), 2)
+        self.assertEqual(Booking.objects.count(), 3)
+
+    def test_atomic_batch_rejects_on_any_conflict(self):
+        response = self.post([
+            self.item(self.vehicles[1]),
+            self.item(self.vehicles[0]),
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e['index'] for e in response.data['errors']], [1])
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_partial_batch_skips_conflicts(self):
+        response = self.post([
+            self.item(self.vehicles[0]),
+            self.item(self.vehicles[1]),
+            self.item(self.vehicles[1], '2030-01-02T10:00:00Z', '2030-01-05T10:00:00Z'),
+            {'vehicle_id': self.vehicles[2].id},
+        ], mode='partial')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([b['vehicle_id'] for b in response.data['created']], [self.vehicles[1].id])
+        self.assertEqual([e['index'] for e in response.data['errors']], [0, 2, 3])
+
+    def test_conflict_check_is_one_query(self):
+        items = [
+            self.item(vehicle, f'2030-02-{day:02d}T10:00:00Z', f'2030-02-{day + 1:02d}T09:00:00Z')
+            for day in range(1, 11)
+            for vehicle in self.vehicles
+        ]
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.post(items)
+        self.assertEqual(response.status_code, 201)
+        selects = [q['sql'] for q in queries if 'FROM "bookings_booking"' in q['sql'] and 'INSERT' not in q['sql']]
+        # The interval check plus the legacy-reference check of the allocated block
+        self.assertEqual(len(selects), 2)
+        self.assertEqual(Booking.objects.count(), 31)
+
+    def test_pickup_branch_is_checked(self):
+        cbd, mombasa = Location.objects.bulk_create([Location(name='Nairobi CBD'), Location(name='Mombasa')])
+        Vehicle.objects.filter(pk=self.vehicles[1].pk).update(current_location=cbd)
+        Vehicle.objects.filter(pk=self.vehicles[2].pk).update(current_location=mombasa)
+        items = [{**self.item(vehicle), 'pickup_branch': cbd.id, 'return_branch': cbd.id} for vehicle in self.vehicles[1:]]
+        response = self.post(items, mode='partial')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([b['vehicle_id'] for b in response.data['created']], [self.vehicles[1].id])
+        self.assertEqual(response.data['errors'], [{
+            'index': 1, 'errors': {'error': 'This vehicle is not available at the selected pickup branch for these dates.'},
+        }])
+        later = [{**item, 'pickup_date': '2030-03-01T10:00:00Z', 'return_date': '2030-03-03T10:00:00Z'} for item in items]
+        response = self.post(later)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e['index'] for e in response.data['errors']], [1])
+
+    def test_empty_batch_is_rejected(self):
+        self.assertEqual(self.post([]).status_code, 400)
+
+
+class BookingReferenceTests(TestCase):
+    """References are unique across blocks and carry a check character that catches typos"""
+
+    def setUp(self):
+        reset_reference_cache()
+        self.addCleanup(reset_reference_cache)
+
+    def counter(self):
+        return ReferenceCounter.objects.get(name=references.COUNTER_NAME).value
+
+    def test_check_character_rejects_single_character_errors(self):
+        reference = encode_reference(12345)
+        self.assertTrue(is_valid_reference(reference))
+        self.assertTrue(is_valid_reference(reference.lower()))
+        self.assertEqual(reference[-1], check_character(reference[3:-1]))
+        for position in range(3, len(reference)):
+            for char in references.ALPHABET:
+                if char != reference[position]:
+                    typo = reference[:position] + char + reference[position + 1:]
+                    self.assertFalse(is_valid_reference(typo), typo)
+
+    def test_malformed_references(self):
+        body = encode_reference(7)[3:]
+        for reference in (None, '', body, f'XX-{body}', 'LX-12', f'LX-{body[:-2]}U{body[-1]}'):
+            self.assertFalse(is_valid_reference(reference), reference)
+
+    def test_encoding(self):
+        self.assertRegex(encode_reference(0), r'^LX-[0-9A-HJKMNP-TV-Z]{6}$')
+        # The permutation hides the counter order but stays one-to-one
+        sample = range(0, 200_000, 7)
+        self.assertEqual(len({references._permute(value) for value in sample}), len(sample))
+        self.assertNotEqual(encode_reference(1)[3:8], '00001')
+        # Values past 25 bits get extra leading characters rather than wrapping
+        big = encode_reference(1 << references.BODY_BITS)
+        self.assertEqual(len(big), len(encode_reference(0)) + 1)
+        self.assertTrue(is_valid_reference(big))
+        self.assertNotEqual(big[4:], encode_reference(0)[3:])
+
+    def test_unique_across_blocks(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = next_references(BLOCK_SIZE + 10)
+        self.assertEqual(self.counter(), 2 * BLOCK_SIZE)
+        # The rest of the second block was adopted once the allocation committed
+        with self.assertNumQueries(0):
+            second = next_references(BLOCK_SIZE - 10)
+        third = next_references(1)
+        self.assertEqual(self.counter(), 3 * BLOCK_SIZE)
+        generated = first + second + third
+        self.assertEqual(len(set(generated)), 2 * BLOCK_SIZE + 1)
+        self.assertTrue(all(is_valid_reference(reference) for reference in generated))
+
+    def test_uncommitted_block_is_not_reused(self):
+        first = next_references(1)
+        # The transaction never commits, so the block's leftovers are dropped
+        second = next_references(1)
+        self.assertEqual(self.counter(), 2 * BLOCK_SIZE)
+        self.assertNotEqual(first, second)
+
+    def test_reset_forgets_cached_values(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            next_references(1)
+        reset_reference_cache()
+        next_references(1)
+        self.assertEqual(self.counter(), 2 * BLOCK_SIZE)
+
+    def test_skips_legacy_references(self):
+        user = User.objects.create_user(email='legacy@example.com', password=None)
+        when = datetime(2030, 1, 1, tzinfo=dt_timezone.utc)
+        for value in (0, 1):
+            Booking.objects.create(
+                user=user, vehicle_id=1, booking_reference=encode_reference(value), pickup_date=when,
+                return_date=when, pickup_location='Nairobi', return_location='Nairobi', driver_name='Legacy',
+                driver_email='legacy@example.com', driver_phone='0700000000', license_number='DL-1',
+                base_price='100.00', total_price='100.00',
+            )
+        self.assertEqual(next_references(2), [encode_reference(2), encode_reference(3)])
+
+
+class BookingAdminTests(TestCase):
+    """The changelist skips the unfiltered COUNT(*) and builds its date hierarchy from MIN/MAX"""
+
+    def setUp(self):
+        admin = User.objects.create_superuser(email='admin@example.com', password=None)
+        for created_at in (datetime(2024, 5, 1, tzinfo=dt_timezone.utc), datetime(2026, 2, 1, tzinfo=dt_timezone.utc)):
+            booking = Booking.objects.create(
+                user=admin, vehicle_id=1, pickup_date=created_at, return_date=created_at,
+                pickup_location='Nairobi', return_location='Nairobi', driver_name='Jane Wanjiku',
+                driver_email='jane@example.com', driver_phone='0700000000', license_number='DL-1',
+                base_price='100.00', total_price='100.00',
+            )
+            Booking.objects.filter(pk=booking.pk).update(created_at=created_at)
+        self.client.force_login(admin)
+
+    def test_changelist(self):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get('/admin/bookings/booking/')
+        self.assertEqual(response.status_code, 200)
+        counts = [q['sql'] for q in queries if 'COUNT(' in q['sql']]
+        self.assertEqual(len(counts), 1)
+        # 2025 has no bookings but lies between the first and last one
+        for year in ('2024', '2025', '2026'):
+            self.assertContains(response, f'?created_at__year={year}')
+        self.assertFalse(any('DISTINCT' in q['sql'] for q in queries))
+
+    def test_search(self):
+        response = self.client.get('/admin/bookings/booking/', {'q': 'wanjiku'})
+        self.assertEqual(response.context['cl'].result_count, 2)
+        response = self.client.get('/admin/bookings/booking/', {'q': 'jane@'})
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+
+class SeedingTests(TestCase):
+    """bookings/seeding.py keeps to its window, never double-books and is reproducible"""
+    now = datetime(2030, 6, 1, 12, tzinfo=dt_timezone.utc)
+
+    def seed(self, seed=0, bookings=300):
+        # More bookings than 4 vehicles can take in 90 days
+        with mock.patch.object(seeding.timezone, 'now', return_value=self.now):
+            return seeding.seed(vehicles=4, bookings=bookings, customers=5, staff=1, seed=seed,
+                                history_days=60, future_days=30)
+
+    def rows(self):
+        """Bookings with vehicles and users by name, since ids differ between runs"""
+        models = dict(Vehicle.objects.values_list('id', 'model'))
+        return sorted(
+            (models[vehicle_id], *row)
+            for vehicle_id, *row in Booking.objects.values_list(
+                'vehicle_id', 'user__email', 'pickup_date', 'return_date', 'total_price', 'status', 'created_at',
+            )
+        )
+
+    def clear(self):
+        for model in (Notification, Booking, Vehicle):
+            model.objects.all().delete()
+        User.objects.filter(email__startswith='seed-').delete()
+
+    def test_dates_stay_in_window(self):
+        created = self.seed()
+        self.assertLess(created['bookings'], 300)
+        self.assertEqual(Booking.objects.count(), created['bookings'])
+        self.assertFalse(Booking.objects.filter(pickup_date__lt=self.now - timedelta(days=60)).exists())
+        self.assertFalse(Booking.objects.filter(return_date__gt=self.now + timedelta(days=30)).exists())
+
+    def test_no_overlaps(self):
+        self.seed()
+        for vehicle in Vehicle.objects.all():
+            bookings = Booking.objects.filter(vehicle_id=vehicle.id).exclude(status='CANCELLED')
+            dates = list(bookings.order_by('pickup_date').values_list('pickup_date', 'return_date'))
+            self.assertTrue(dates)
+            for (_, previous_return), (pickup, _) in zip(dates, dates[1:]):
+                self.assertGreaterEqual(pickup, previous_return)
+
+    def test_same_seed_same_rows(self):
+        self.seed(bookings=40)
+        first = self.rows()
+        self.clear()
+        self.seed(bookings=40)
+        self.assertEqual(self.rows(), first)
+        self.clear()
+        self.seed(seed=1, bookings=40)
+        self.assertNotEqual(self.rows(), first)
@@ -1,12 +1,26 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, throttle_scope
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from datetime import datetime
 from .models import Booking
-from .serializers import BookingSerializer
+from .serializers import BookingSerializer, BookingListSerializer, BookingBatchSerializer
+from .batch import find_branch_conflicts, find_conflicts
+from .references import next_references
+from django.db import transaction
+from lexuBackend.routers import pin_to_primary, use_replica
+from lexuBackend.metrics import InstrumentedViewMixin
+from lexuBackend.serializers import requested_fields, only_requested
 from notifications.utils import send_booking_email_notification
+from notifications.signals import send_batch_booking_notification
+from fleet.status import refresh_vehicle_status
+from fleet.pricing import price_bookings, refresh_booking_occupancy
+from fleet.locations import available_at
+from fleet.models import Vehicle
+import logging
+
+logger = logging.getLogger(__name__)
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -14,37 +28,60 @@ class IsAdminOrReadOnly(permissions.BasePermission):
             return True
         return request.user and request.user.is_staff
 
-class BookingListCreateView(generics.ListCreateAPIView):
+class BookingListCreateView(InstrumentedViewMixin, generics.ListCreateAPIView):
+    """
+    GET returns full bookings. Clients narrow them with ?fields=a,b,c, or
+    ask for the lean BookingListSerializer table rows with ?summary=true.
+    """
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def wants_summary(self):
+        return (
+            self.request.method == 'GET'
+            and requested_fields(self.request) is None
+            and self.request.query_params.get('summary', '').lower() in ('1', 'true')
+        )
+
+    def get_serializer_class(self):
+        if self.wants_summary():
+            return BookingListSerializer
+        return super().get_serializer_class()
+
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
-            return Booking.objects.all()
-        return Booking.objects.filter(user=user)
+            queryset = Booking.objects.all()
+        else:
+            queryset = Booking.objects.filter(user=user)
+        if self.request.method != 'GET':
+            return queryset
+        if self.wants_summary():
+            return only_requested(queryset, BookingListSerializer.Meta.fields)
+        fields = requested_fields(self.request)
+        return queryset if fields is None else only_requested(queryset, fields)
     
     def create(self, request, *args, **kwargs):
-        print("=" * 50)
-        print("Incoming request data:", request.data)
-        print("=" * 50)
+        logger.debug('Booking request received', extra={'data': request.data})
         
         serializer = self.get_serializer(data=request.data)
         
         # This will show validation errors
         if not serializer.is_valid():
-            print("Validation errors:", serializer.errors)
+            logger.info('Booking validation failed', extra={'errors': serializer.errors})
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        print("Validated data:", serializer.validated_data)
+        logger.debug('Booking request validated', extra={'data': serializer.validated_data})
         
         # Check if vehicle is available for the requested dates
         vehicle_id = serializer.validated_data.get('vehicle_id')
         pickup_date = serializer.validated_data.get('pickup_date')
         return_date = serializer.validated_data.get('return_date')
         
-        print(f"Checking availability for vehicle {vehicle_id} from {pickup_date} to {return_date}")
+        logger.debug('Checking vehicle availability', extra={
+            'vehicle_id': vehicle_id, 'pickup_date': pickup_date, 'return_date': return_date,
+        })
         
         # Check for conflicting bookings (excluding cancelled bookings)
         conflicting_bookings = Booking.objects.filter(
@@ -61,8 +98,27 @@ class BookingListCreateView(generics.ListCreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # With a pickup branch, the vehicle must be there when the rental starts
+        pickup_branch = serializer.validated_data.get('pickup_branch')
+        if pickup_branch is not None:
+            return_branch = serializer.validated_data.get('return_branch')
+            at_branch = available_at(
+                Vehicle.objects.filter(pk=vehicle_id), [pickup_branch.id], pickup_date, return_date,
+                return_branch.id if return_branch else None,
+            )
+            if not at_branch.exists():
+                return Response(
+                    {'error': 'This vehicle is not available at the selected pickup branch for these dates.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        # Demand-based prices replace the submitted ones when enabled
+        price_bookings([serializer.validated_data])
+
         # Set the user from the request
         booking = serializer.save(user=request.user)
+        # Read-your-writes: keep this user's reads on the primary for a while
+        pin_to_primary(request)
         
         # Send email notification to admin
         from django.conf import settings
@@ -72,7 +128,76 @@ class BookingListCreateView(generics.ListCreateAPIView):
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
-class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BookingBatchCreateView(InstrumentedViewMixin, generics.GenericAPIView):
+    """
+    Create up to 50 bookings in one request (corporate/fleet customers).
+
+    mode=atomic (default): any invalid or conflicting booking rejects the
+    whole batch. mode=partial: valid bookings are created and the rest are
+    returned under `errors` with their index in the request.
+
+    All conflicts are checked with one query, plus one per pickup branch and
+    window for items that name a branch (see bookings/batch.py), the
+    bookings are priced together (fleet/pricing.py), inserted with one
+    bulk_create and staff get one aggregated notification and email.
+    """
+    serializer_class = BookingBatchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        batch = self.get_serializer(data=request.data)
+        batch.is_valid(raise_exception=True)
+        partial = batch.validated_data['mode'] == 'partial'
+
+        errors = {}
+        valid = []
+        for index, item in enumerate(batch.validated_data['bookings']):
+            serializer = BookingSerializer(data=item, context=self.get_serializer_context())
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                errors[index] = serializer.errors
+
+        with transaction.atomic():
+            conflicts = find_conflicts(valid)
+            conflicts.update(find_branch_conflicts([(index, data) for index, data in valid if index not in conflicts]))
+            for index, message in conflicts.items():
+                errors[index] = {'error': message}
+
+            error_list = [{'index': index, 'errors': errors[index]} for index in sorted(errors)]
+            to_create = [data for index, data in valid if index not in conflicts]
+            if (errors and not partial) or not to_create:
+                logger.info('Batch booking rejected', extra={'errors': error_list})
+                return Response(
+                    {'mode': batch.validated_data['mode'], 'created': [], 'errors': error_list},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            price_bookings(to_create)
+            bookings = [
+                Booking(user=request.user, booking_reference=reference, **data)
+                for reference, data in zip(next_references(len(to_create)), to_create)
+            ]
+            Booking.objects.bulk_create(bookings)
+            transaction.on_commit(lambda: send_batch_booking_notification(bookings))
+            # bulk_create sends no post_save, so refresh the booked vehicles and days here
+            transaction.on_commit(lambda: refresh_vehicle_status({booking.vehicle_id for booking in bookings}))
+            transaction.on_commit(lambda: refresh_booking_occupancy(
+                (booking.vehicle_id, booking.pickup_date, booking.return_date) for booking in bookings
+            ))
+
+        pin_to_primary(request)
+        logger.info('Batch booking created', extra={'booking_count': len(bookings), 'failed_count': len(error_list)})
+        return Response(
+            {
+                'mode': batch.validated_data['mode'],
+                'created': BookingListSerializer(bookings, many=True).data,
+                'errors': error_list,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+class BookingDetailView(InstrumentedViewMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -80,8 +205,13 @@ class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
-            return Booking.objects.all()
-        return Booking.objects.filter(user=user)
+            queryset = Booking.objects.all()
+        else:
+            queryset = Booking.objects.filter(user=user)
+        fields = requested_fields(self.request)
+        if fields is not None:
+            queryset = only_requested(queryset, fields)
+        return queryset
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
@@ -102,10 +232,12 @@ class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 @api_view(['GET'])
+@use_replica
 def get_vehicle_booked_dates(request, vehicle_id):
     """
     Get all booked dates for a vehicle (for calendar display).
     Returns a list of date ranges that are booked.
+    Served from a read replica when one is configured.
     """
     from django.utils.dateparse import parse_date
     
@@ -132,6 +264,7 @@ def get_vehicle_booked_dates(request, vehicle_id):
 
 
 @api_view(['GET'])
+@throttle_scope('availability')
 def check_vehicle_availability(request, vehicle_id):
     """
     Check if a vehicle is available for given dates.
@@ -1,10 +1,36 @@
 from django.contrib import admin
-from .models import Vehicle
+from .models import CategoryOccupancy, Location, Vehicle, VehicleImage
 
 # Register your models here.
 
+class VehicleImageInline(admin.TabularInline):
+    model = VehicleImage
+    extra = 0
+    fields = ('position', 'url', 'width', 'height')
+
 @admin.register(Vehicle)
 class VehicleAdmin(admin.ModelAdmin):
-    list_display = ('id', 'make', 'model', 'year', 'category', 'price_per_day', 'availability')
-    list_filter = ('category', 'availability')
+    inlines = [VehicleImageInline]
+    list_display = ('id', 'make', 'model', 'year', 'category', 'price_per_day', 'current_status', 'current_location')
+    list_filter = ('category', 'current_status', 'current_location')
+    list_select_related = ('current_location',)
     search_fields = ('make', 'model')
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'address', 'is_active')
+    list_filter = ('is_active',)
+    search_fields = ('name', 'address')
+
+@admin.register(CategoryOccupancy)
+class CategoryOccupancyAdmin(admin.ModelAdmin):
+    """Read-only view of the pricing cache (rebuilt by refresh_category_occupancy)"""
+    list_display = ('category', 'day', 'booked', 'updated_at')
+    list_filter = ('category',)
+    ordering = ('day', 'category')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,179 @@
+"""
+Fleet utilisation and demand forecasts per Vehicle.category.
+
+Bookings are loaded with one values_list() query into NumPy arrays and
+turned into a vehicle x hour occupancy bitmap with a difference array:
++1 in a booking's pickup hour, -1 in its return hour, then a cumulative
+sum along each vehicle's row. Everything after that (category totals,
+daily and rolling utilisation, the forecast) is array arithmetic, so the
+cost grows with vehicles x hours instead of bookings x booked hours.
+The bitmap is built VEHICLE_BLOCK vehicles at a time to bound memory on
+long ranges.
+
+Utilisation is the share of a category's vehicles booked in an hour,
+averaged per day. Pending, confirmed, active and completed bookings count;
+cancelled ones don't. Days are UTC.
+
+The forecast is seasonal-naive: each category's average utilisation per
+weekday over the last `weeks` weeks, but never below what is already
+booked for that day.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.utils import timezone
+
+from .models import Vehicle
+
+OCCUPYING_STATUSES = ['PENDING', 'CONFIRMED', 'ACTIVE', 'COMPLETED']
+VEHICLE_BLOCK = 256
+HOUR = 3600
+
+
+def _epoch_hours(values):
+    """Aware datetimes as float hours since the epoch"""
+    return np.fromiter((value.timestamp() for value in values), dtype=np.float64, count=len(values)) / HOUR
+
+
+def occupancy_matrix(vehicle_count, rows, first_hours, last_hours, hours):
+    """
+    Boolean (vehicle_count x hours) matrix, True where a vehicle is booked.
+
+    rows are the bookings' vehicle row numbers; first_hours/last_hours are
+    integer hour offsets with first <= last, already clipped to [0, hours].
+    A booking occupies the hours [first, last).
+    """
+    width = hours + 1
+    size = vehicle_count * width
+    diff = (
+        np.bincount(rows * width + first_hours, minlength=size)
+        - np.bincount(rows * width + last_hours, minlength=size)
+    ).reshape(vehicle_count, width)
+    return np.cumsum(diff[:, :hours], axis=1) > 0
+
+
+def rolling_mean(values, window):
+    """Trailing mean over the last `window` columns (fewer at the start)"""
+    totals = np.cumsum(values, axis=1)
+    rolled = totals.copy()
+    rolled[:, window:] -= totals[:, :-window]
+    return rolled / np.minimum(np.arange(1, values.shape[1] + 1), window)
+
+
+def weekday_forecast(history, horizon, weeks):
+    """
+    Repeat the per-weekday mean of the last `weeks` full weeks of history
+    (categories x days) for the `horizon` days after it.
+    """
+    weeks = min(weeks, history.shape[1] // 7)
+    if not weeks:
+        return np.repeat(history.mean(axis=1, keepdims=True), horizon, axis=1)
+    # The recent window ends the day before the forecast starts, so its
+    # day k % 7 falls on the same weekday as forecast day k
+    profile = history[:, -weeks * 7:].reshape(len(history), weeks, 7).mean(axis=1)
+    return np.tile(profile, -(-horizon // 7))[:, :horizon]
+
+
+def load_bookings(start, end):
+    """(vehicle_ids, pickup_hours, return_hours) of bookings overlapping [start, end)"""
+    from bookings.models import Booking
+
+    bookings = list(
+        Booking.objects.filter(status__in=OCCUPYING_STATUSES, pickup_date__lt=end, return_date__gt=start)
+        .values_list('vehicle_id', 'pickup_date', 'return_date')
+    )
+    if not bookings:
+        return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+    vehicle_ids, pickups, returns = zip(*bookings)
+    return np.array(vehicle_ids, dtype=np.int64), _epoch_hours(pickups), _epoch_hours(returns)
+
+
+def category_occupancy(start, hours):
+    """
+    (categories, fleet sizes, categories x hours array of booked vehicle
+    counts) for the hours starting at start.
+    """
+    vehicles = list(Vehicle.objects.order_by('id').values_list('id', 'category'))
+    vehicle_ids = np.array([vehicle_id for vehicle_id, _ in vehicles], dtype=np.int64)
+    categories, vehicle_categories = np.unique(
+        np.array([category for _, category in vehicles], dtype=object), return_inverse=True
+    )
+    booked = np.zeros((len(categories), hours), dtype=np.int64)
+    if not vehicles:
+        return categories, np.zeros(0, dtype=np.int64), booked
+
+    booking_vehicles, pickups, returns = load_bookings(start, start + timedelta(hours=hours))
+    # Bookings of deleted vehicles have no row
+    rows = np.searchsorted(vehicle_ids, booking_vehicles)
+    known = rows < len(vehicle_ids)
+    known[known] = vehicle_ids[rows[known]] == booking_vehicles[known]
+    offset = start.timestamp() / HOUR
+    first = np.clip(np.floor(pickups - offset), 0, hours).astype(np.int64)
+    last = np.clip(np.ceil(returns - offset), 0, hours).astype(np.int64)
+    keep = known & (first < last)
+    rows, first, last = rows[keep], first[keep], last[keep]
+
+    order = np.argsort(rows, kind='stable')
+    rows, first, last = rows[order], first[order], last[order]
+    for block_start in range(0, len(vehicle_ids), VEHICLE_BLOCK):
+        block_end = min(block_start + VEHICLE_BLOCK, len(vehicle_ids))
+        lo, hi = np.searchsorted(rows, [block_start, block_end])
+        bitmap = occupancy_matrix(block_end - block_start, rows[lo:hi] - block_start, first[lo:hi], last[lo:hi], hours)
+        block_categories = vehicle_categories[block_start:block_end]
+        for category in np.unique(block_categories):
+            booked[category] += bitmap[block_categories == category].sum(axis=0)
+    return categories, np.bincount(vehicle_categories, minlength=len(categories)), booked
+
+
+def fleet_utilisation(days=90, horizon=14, window=7, weeks=4, now=None):
+    """
+    Utilisation per category over the last `days` full days, its `window`-day
+    rolling mean, the average per hour of the day, and a `horizon`-day
+    forecast starting today.
+    """
+    if days < 1 or horizon < 0 or window < 1 or weeks < 1:
+        raise ValueError('days, window and weeks must be positive and horizon not negative')
+    now = now or timezone.now()
+    today = datetime.combine(now.astimezone(dt_timezone.utc).date(), time.min, tzinfo=dt_timezone.utc)
+    start = today - timedelta(days=days)
+    total_days = days + horizon
+
+    categories, fleet_sizes, booked = category_occupancy(start, total_days * 24)
+    hourly = booked / np.maximum(fleet_sizes, 1)[:, None]
+    daily = hourly.reshape(len(categories), total_days, 24).mean(axis=2)
+    history, booked_ahead = daily[:, :days], daily[:, days:]
+    rolling = rolling_mean(history, window)
+    forecast = np.maximum(weekday_forecast(history, horizon, weeks), booked_ahead)
+    hour_of_day = hourly[:, :days * 24].reshape(len(categories), days, 24).mean(axis=1)
+
+    history_dates = [(start + timedelta(days=day)).date().isoformat() for day in range(days)]
+    forecast_dates = [(today + timedelta(days=day)).date().isoformat() for day in range(horizon)]
+    results = []
+    for index, category in enumerate(categories):
+        results.append({
+            'category': category,
+            'vehicles': int(fleet_sizes[index]),
+            'utilisation': round(float(history[index].mean()), 4),
+            'hour_of_day': np.round(hour_of_day[index], 4).tolist(),
+            'daily': [
+                {'date': date, 'utilisation': value, 'rolling': mean}
+                for date, value, mean in zip(
+                    history_dates, np.round(history[index], 4).tolist(), np.round(rolling[index], 4).tolist()
+                )
+            ],
+            'forecast': [
+                {'date': date, 'utilisation': value, 'booked': already}
+                for date, value, already in zip(
+                    forecast_dates, np.round(forecast[index], 4).tolist(), np.round(booked_ahead[index], 4).tolist()
+                )
+            ],
+        })
+    return {
+        'start': history_dates[0],
+        'today': today.date().isoformat(),
+        'days': days,
+        'horizon': horizon,
+        'window': window,
+        'weeks': weeks,
+        'categories': results,
+    }
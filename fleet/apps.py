@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class FleetConfig(AppConfig):
     name = 'fleet'
+
+    def ready(self):
+        # Booking lifecycle events keep Vehicle.current_status up to date
+        import fleet.signals  # noqa: F401
@@ -0,0 +1,87 @@
+"""
+Where vehicles are, and which are free at a branch.
+
+Vehicle.current_location is where the vehicle is parked now. It moves to
+the return branch of its latest completed booking (fleet/signals.py
+calls refresh_vehicle_location when a booking completes), so one-way
+rentals carry the vehicle to another branch.
+
+For a future window the vehicle is expected at the return branch of its
+last pending, confirmed or active booking ending before the window, and
+otherwise at current_location. available_at() answers "free at these
+branches from X to Y" in one query. The candidates come from two indexes:
+vehicles parked at the branches (Vehicle (current_location, id)) and
+vehicles with a booking that drops them there (Booking (return_branch,
+return_date)). Each candidate's expected location and conflicts are then
+checked with correlated subqueries on Booking (vehicle_id, status).
+
+Bookings without branches (free-text locations only) don't move vehicles.
+A vehicle whose location is unknown (current_location NULL, e.g. every
+vehicle that predates branches, and no drop-off before the window) may be
+at any branch, so it is offered everywhere until a completed one-way
+rental or an edit gives it a location.
+"""
+from django.db.models import BigIntegerField, Exists, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Vehicle
+
+OCCUPYING_STATUSES = ['PENDING', 'CONFIRMED', 'ACTIVE']
+
+
+def location_at(when):
+    """Expression for the Location id where a Vehicle is expected to be at `when`"""
+    from bookings.models import Booking
+
+    last_drop = Booking.objects.filter(
+        vehicle_id=OuterRef('pk'), status__in=OCCUPYING_STATUSES,
+        return_date__lte=when, return_branch__isnull=False,
+    ).order_by('-return_date').values('return_branch')[:1]
+    return Coalesce(Subquery(last_drop), F('current_location'), output_field=BigIntegerField())
+
+
+def available_at(queryset, location_ids, pickup_date, return_date, return_location_id=None):
+    """
+    Restrict a Vehicle queryset to vehicles expected at one of location_ids
+    (or at an unknown location) at pickup_date with no booking overlapping
+    [pickup_date, return_date).
+
+    With return_location_id (a one-way rental), vehicles whose next booking
+    after the window starts at a different branch are excluded too, since
+    the rental would leave them in the wrong place.
+    """
+    from bookings.models import Booking
+
+    location_ids = list(location_ids)
+    bookings = Booking.objects.filter(vehicle_id=OuterRef('pk'), status__in=OCCUPYING_STATUSES)
+    arriving = Booking.objects.filter(
+        return_branch__in=location_ids, return_date__lte=pickup_date, status__in=OCCUPYING_STATUSES,
+    ).values('vehicle_id')
+    queryset = (
+        queryset.filter(
+            Q(current_location__in=location_ids) | Q(current_location__isnull=True) | Q(id__in=arriving)
+        )
+        .alias(location_at=location_at(pickup_date))
+        .filter(Q(location_at__in=location_ids) | Q(location_at__isnull=True))
+        .exclude(Exists(bookings.filter(pickup_date__lt=return_date, return_date__gt=pickup_date)))
+    )
+    if return_location_id is None:
+        return queryset
+
+    # No next booking, or one without a branch, can't be stranded
+    next_pickup = bookings.filter(pickup_date__gte=return_date).order_by('pickup_date').values('pickup_branch')[:1]
+    return queryset.alias(
+        next_pickup=Coalesce(Subquery(next_pickup), Value(return_location_id), output_field=BigIntegerField())
+    ).filter(next_pickup=return_location_id)
+
+
+def refresh_vehicle_location(vehicle_ids):
+    """Move vehicles to the return branch of their latest completed booking that has one"""
+    from bookings.models import Booking
+
+    last_return = Booking.objects.filter(
+        vehicle_id=OuterRef('pk'), status='COMPLETED', return_branch__isnull=False,
+    ).order_by('-return_date').values('return_branch')[:1]
+    return Vehicle.objects.filter(pk__in=list(vehicle_ids)).update(
+        current_location=Coalesce(Subquery(last_return), F('current_location'), output_field=BigIntegerField())
+    )
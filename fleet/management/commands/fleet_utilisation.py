@@ -0,0 +1,42 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fleet.analytics import fleet_utilisation
+
+
+class Command(BaseCommand):
+    help = 'Report utilisation and a demand forecast per vehicle category (see fleet/analytics.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help='Full days of history to analyse')
+        parser.add_argument('--horizon', type=int, default=14, help='Days to forecast, starting today')
+        parser.add_argument('--window', type=int, default=7, help='Rolling mean window in days')
+        parser.add_argument('--weeks', type=int, default=4, help='Weeks of history behind the forecast')
+        parser.add_argument('--json', action='store_true', help='Print the full report as JSON')
+
+    def handle(self, *args, **options):
+        try:
+            report = fleet_utilisation(
+                days=options['days'], horizon=options['horizon'],
+                window=options['window'], weeks=options['weeks'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f'{report["start"]} to {report["today"]} ({report["days"]} days), '
+            f'forecast for {report["horizon"]} days'
+        )
+        self.stdout.write(f'{"category":<16}{"vehicles":>9}{"utilisation":>13}{"last " + str(report["window"]) + "d":>10}{"forecast":>10}')
+        for row in report['categories']:
+            recent = row['daily'][-1]['rolling']
+            forecast = row['forecast']
+            expected = sum(day['utilisation'] for day in forecast) / len(forecast) if forecast else 0.0
+            self.stdout.write(
+                f'{row["category"]:<16}{row["vehicles"]:>9}{row["utilisation"]:>13.1%}{recent:>10.1%}{expected:>10.1%}'
+            )
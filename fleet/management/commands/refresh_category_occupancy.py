@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from fleet.pricing import rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the per-category daily occupancy used for dynamic pricing '
+        '(run nightly, see fleet/pricing.py)'
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild_occupancy()
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {rows} category-day occupancy row(s)'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from fleet.status import refresh_vehicle_status
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute every vehicle\'s current status from its bookings '
+        '(run every few minutes from cron, see fleet/status.py)'
+    )
+
+    def handle(self, *args, **options):
+        changed = refresh_vehicle_status()
+        self.stdout.write(self.style.SUCCESS(f'Updated the status of {changed} vehicle(s)'))
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:32
+
+from django.db import migrations, models
+
+SEARCH_INDEX_NAME = 'fleet_vehicle_search_idx'
+
+
+def _search_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    # Must match the expression used by fleet.search.search_vehicles
+    return GinIndex(
+        SearchVector('make', 'model', 'category', 'engine', config='simple'),
+        name=SEARCH_INDEX_NAME,
+    )
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Vehicle = apps.get_model('fleet', 'Vehicle')
+    schema_editor.add_index(Vehicle, _search_index())
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Vehicle = apps.get_model('fleet', 'Vehicle')
+    schema_editor.remove_index(Vehicle, _search_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0002_vehicle_gallery'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['category', 'price_per_day'], name='fleet_vehic_categor_02a617_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['transmission'], name='fleet_vehic_transmi_7e89e7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['price_per_day'], name='fleet_vehic_price_p_8b51cb_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
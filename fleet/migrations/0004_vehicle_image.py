@@ -0,0 +1,93 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:32
+
+import base64
+import binascii
+import django.db.models.deletion
+import io
+import json
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def image_dimensions(src):
+    """
+    Return {'width', 'height'} for inline data: URIs.
+    Copy of fleet.models.image_dimensions as of this migration.
+    """
+    if not src or not src.startswith('data:image/') or ',' not in src:
+        return {}
+    try:
+        from PIL import Image
+        data = base64.b64decode(src.split(',', 1)[1])
+        with Image.open(io.BytesIO(data)) as img:
+            width, height = img.size
+    except (binascii.Error, ValueError, OSError, ImportError):
+        return {}
+    return {'width': width, 'height': height}
+
+
+def backfill_gallery(apps, schema_editor):
+    """Copy the JSON gallery column into VehicleImage rows"""
+    Vehicle = apps.get_model('fleet', 'Vehicle')
+    VehicleImage = apps.get_model('fleet', 'VehicleImage')
+
+    images = []
+    for vehicle_id, gallery in Vehicle.objects.values_list('id', 'gallery').iterator():
+        try:
+            urls = json.loads(gallery or '[]')
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(urls, list):
+            continue
+        for position, url in enumerate(u for u in urls if isinstance(u, str) and u):
+            images.append(VehicleImage(
+                vehicle_id=vehicle_id, url=url, position=position, **image_dimensions(url)
+            ))
+        if len(images) >= BATCH_SIZE:
+            VehicleImage.objects.bulk_create(images)
+            images = []
+    VehicleImage.objects.bulk_create(images)
+
+
+def restore_gallery(apps, schema_editor):
+    """Write VehicleImage rows back into the JSON gallery column"""
+    Vehicle = apps.get_model('fleet', 'Vehicle')
+    VehicleImage = apps.get_model('fleet', 'VehicleImage')
+
+    galleries = {}
+    for vehicle_id, url in VehicleImage.objects.order_by('vehicle_id', 'position', 'id').values_list('vehicle_id', 'url'):
+        galleries.setdefault(vehicle_id, []).append(url)
+    for vehicle_id, urls in galleries.items():
+        Vehicle.objects.filter(id=vehicle_id).update(gallery=json.dumps(urls))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0003_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehicleImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.TextField()),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='fleet.vehicle')),
+            ],
+            options={
+                'ordering': ['position', 'id'],
+                'indexes': [models.Index(fields=['vehicle', 'position'], name='fleet_vehic_vehicle_28df5b_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_gallery, restore_gallery),
+        migrations.RemoveField(
+            model_name='vehicle',
+            name='gallery',
+        ),
+    ]
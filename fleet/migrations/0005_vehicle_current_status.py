@@ -0,0 +1,52 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:07
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Exists, OuterRef, Q, Value, When
+from django.utils import timezone
+
+
+def compute_current_status(apps, schema_editor):
+    # Mirrors fleet.status.status_expression, with the historical models
+    Vehicle = apps.get_model('fleet', 'Vehicle')
+    Booking = apps.get_model('bookings', 'Booking')
+    now = timezone.now()
+    soon = now + timedelta(hours=getattr(settings, 'VEHICLE_RESERVED_SOON_HOURS', 48))
+    upcoming = ['PENDING', 'CONFIRMED']
+    bookings = Booking.objects.filter(vehicle_id=OuterRef('pk'))
+    on_rent = bookings.filter(
+        Q(status='ACTIVE') | Q(status__in=upcoming, pickup_date__lte=now, return_date__gt=now)
+    )
+    reserved_soon = bookings.filter(status__in=upcoming, pickup_date__gt=now, pickup_date__lte=soon)
+    Vehicle.objects.update(current_status=Case(
+        When(Exists(on_rent), then=Value('ON_RENT')),
+        When(Exists(reserved_soon), then=Value('RESERVED_SOON')),
+        default=Value('AVAILABLE'),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0004_vehicle_image'),
+        ('bookings', '0005_vehicle_status_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='current_status',
+            field=models.CharField(choices=[('AVAILABLE', 'Available'), ('ON_RENT', 'On rent'), ('RESERVED_SOON', 'Reserved soon')], default='AVAILABLE', editable=False, max_length=20),
+        ),
+        migrations.RunPython(compute_current_status, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='vehicle',
+            name='availability',
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['current_status', '-created_at'], name='fleet_vehic_current_d5754f_idx'),
+        ),
+    ]
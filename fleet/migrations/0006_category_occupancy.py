@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0005_vehicle_current_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+                ('booked', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category', 'day'), name='category_occupancy_unique')],
+            },
+        ),
+    ]
@@ -1,35 +1,125 @@
 from django.db import models
-import json
+import base64
+import binascii
+import io
+
+class Location(models.Model):
+    """A branch where vehicles are picked up and returned"""
+    name = models.CharField(max_length=200, unique=True)
+    address = models.CharField(max_length=300, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
 
 class Vehicle(models.Model):
+    AVAILABLE = 'AVAILABLE'
+    ON_RENT = 'ON_RENT'
+    RESERVED_SOON = 'RESERVED_SOON'
+    STATUS_CHOICES = [
+        (AVAILABLE, 'Available'),
+        (ON_RENT, 'On rent'),
+        (RESERVED_SOON, 'Reserved soon'),
+    ]
+
     make = models.CharField(max_length=100)
     model = models.CharField(max_length=100)
     year = models.IntegerField()
     category = models.CharField(max_length=50)
     price_per_day = models.DecimalField(max_digits=10, decimal_places=2)
     image = models.TextField(blank=True, null=True)
-    gallery = models.TextField(blank=True, default='[]')  # Store as JSON array
     transmission = models.CharField(max_length=50, default='Automatic')
     seats = models.IntegerField(default=2)
     engine = models.CharField(max_length=100, blank=True, null=True)
     horsepower = models.IntegerField(default=0)
     zero_to_sixty = models.CharField(max_length=50, blank=True, null=True)
     top_speed = models.CharField(max_length=50, blank=True, null=True)
-    availability = models.CharField(max_length=50, default='Available')
+    # Derived from bookings by fleet/status.py, never edited by hand
+    current_status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=AVAILABLE, editable=False)
+    # Where the vehicle is parked; moved to the return branch when a booking
+    # completes (fleet/locations.py). Indexed with id below.
+    current_location = models.ForeignKey(
+        Location, on_delete=models.SET_NULL, blank=True, null=True, related_name='vehicles', db_index=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'price_per_day']),
+            models.Index(fields=['transmission']),
+            models.Index(fields=['price_per_day']),
+            models.Index(fields=['current_status', '-created_at']),
+            # Vehicles at a branch, see fleet/locations.py
+            models.Index(fields=['current_location', 'id']),
+        ]
+
     def __str__(self):
         return f"{self.make} {self.model}"
 
     def get_gallery_list(self):
-        """Return gallery as a list of strings"""
-        if not self.gallery:
-            return []
-        try:
-            return json.loads(self.gallery)
-        except json.JSONDecodeError:
-            return []
+        """Return gallery as a list of strings (uses prefetched images when available)"""
+        return [image.url for image in self.images.all()]
 
     def set_gallery_list(self, gallery_list):
-        """Set gallery from a list of strings"""
-        self.gallery = json.dumps(gallery_list)
\ No newline at end of file
+        """Replace the gallery with the given list of image URLs"""
+        self.images.all().delete()
+        VehicleImage.objects.bulk_create([
+            VehicleImage(vehicle=self, url=url, position=position, **image_dimensions(url))
+            for position, url in enumerate(gallery_list)
+        ])
+        getattr(self, '_prefetched_objects_cache', {}).pop('images', None)
+
+
+def image_dimensions(src):
+    """
+    Return {'width', 'height'} for inline data: URIs.
+    Remote URLs are not fetched, so their dimensions are left empty.
+    """
+    if not src or not src.startswith('data:image/') or ',' not in src:
+        return {}
+    try:
+        from PIL import Image
+        data = base64.b64decode(src.split(',', 1)[1])
+        with Image.open(io.BytesIO(data)) as img:
+            width, height = img.size
+    except (binascii.Error, ValueError, OSError, ImportError):
+        return {}
+    return {'width': width, 'height': height}
+
+
+class VehicleImage(models.Model):
+    """Gallery image for a vehicle, ordered by position"""
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='images')
+    url = models.TextField()
+    position = models.PositiveIntegerField(default=0)
+    width = models.PositiveIntegerField(blank=True, null=True)
+    height = models.PositiveIntegerField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['position', 'id']
+        indexes = [
+            models.Index(fields=['vehicle', 'position']),
+        ]
+
+    def __str__(self):
+        return f"{self.vehicle_id} #{self.position}"
+
+
+class CategoryOccupancy(models.Model):
+    """Vehicles of a category booked on a day, maintained by fleet/pricing.py"""
+    category = models.CharField(max_length=50)
+    day = models.DateField()
+    booked = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'day'], name='category_occupancy_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.category} {self.day}: {self.booked}"
@@ -0,0 +1,212 @@
+"""
+Demand-aware pricing.
+
+CategoryOccupancy holds, per vehicle category and day, how many of the
+category's vehicles have a pending, confirmed or active booking. Rows
+cover today up to PRICING_HORIZON_DAYS ahead. When a booking is saved or
+deleted only the days it touches are recomputed (fleet/signals.py), so a
+quote reads a few indexed rows instead of scanning bookings.
+`manage.py refresh_category_occupancy` rebuilds the whole horizon and
+drops past days; run it nightly. The rebuild also repairs what the
+signals can't see, e.g. the old days of a booking moved to new dates.
+
+A rental's multiplier comes from its busiest day: the first PRICING_TIERS
+entry whose occupancy threshold that day reaches. With
+DYNAMIC_PRICING_ENABLED off, quotes use the plain price_per_day and
+bookings keep the prices they were submitted with.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import CategoryOccupancy, Vehicle
+
+# Same statuses as the booking conflict checks
+OCCUPYING_STATUSES = ['PENDING', 'CONFIRMED', 'ACTIVE']
+CENTS = Decimal('0.01')
+
+
+def booked_days(pickup_date, return_date):
+    """First and last day a rental occupies; a return at midnight doesn't occupy that day"""
+    first = timezone.localdate(pickup_date)
+    last = timezone.localdate(return_date - timedelta(microseconds=1))
+    return first, max(first, last)
+
+
+def rental_days(pickup_date, return_date):
+    """Days charged: started 24-hour periods, at least one"""
+    return max(1, math.ceil((return_date - pickup_date).total_seconds() / 86400))
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def refresh_occupancy(category, first_day, last_day):
+    """
+    Recompute the CategoryOccupancy rows of category for first_day to
+    last_day (clamped to the pricing horizon); returns the number of rows
+    written.
+
+    The range's rows are created if missing and locked (in day order)
+    before the bookings are read, so overlapping refreshes of a category
+    run one after the other and the last one to write has seen every
+    booking committed before it. Without the lock a refresh could read,
+    lose the race to a newer one and then overwrite its count.
+    """
+    from bookings.models import Booking
+
+    today = timezone.localdate()
+    first_day = max(first_day, today)
+    last_day = min(last_day, today + timedelta(days=settings.PRICING_HORIZON_DAYS))
+    if first_day > last_day:
+        return 0
+    days = [first_day + timedelta(days=n) for n in range((last_day - first_day).days + 1)]
+
+    with transaction.atomic():
+        CategoryOccupancy.objects.bulk_create(
+            [CategoryOccupancy(category=category, day=day) for day in days], batch_size=1000, ignore_conflicts=True,
+        )
+        list(
+            CategoryOccupancy.objects.select_for_update()
+            .filter(category=category, day__range=(first_day, last_day))
+            .order_by('day').values_list('id', flat=True)
+        )
+
+        bookings = Booking.objects.filter(
+            vehicle_id__in=Vehicle.objects.filter(category=category).values('id'),
+            status__in=OCCUPYING_STATUSES,
+            pickup_date__lt=_day_start(last_day + timedelta(days=1)),
+            return_date__gt=_day_start(first_day),
+        ).values_list('vehicle_id', 'pickup_date', 'return_date')
+        vehicles_per_day = defaultdict(set)
+        for vehicle_id, pickup_date, return_date in bookings:
+            start, end = booked_days(pickup_date, return_date)
+            day = max(start, first_day)
+            while day <= min(end, last_day):
+                vehicles_per_day[day].add(vehicle_id)
+                day += timedelta(days=1)
+
+        CategoryOccupancy.objects.bulk_create(
+            [CategoryOccupancy(category=category, day=day, booked=len(vehicles_per_day[day])) for day in days],
+            batch_size=1000, update_conflicts=True,
+            unique_fields=['category', 'day'], update_fields=['booked', 'updated_at'],
+        )
+    return len(days)
+
+
+def refresh_booking_occupancy(rentals):
+    """Refresh the days touched by (vehicle_id, pickup_date, return_date) rentals"""
+    rentals = list(rentals)
+    categories = dict(
+        Vehicle.objects.filter(id__in={vehicle_id for vehicle_id, _, _ in rentals}).values_list('id', 'category')
+    )
+    ranges = {}
+    for vehicle_id, pickup_date, return_date in rentals:
+        category = categories.get(vehicle_id)
+        if category is None:
+            continue
+        first, last = booked_days(pickup_date, return_date)
+        if category in ranges:
+            first, last = min(first, ranges[category][0]), max(last, ranges[category][1])
+        ranges[category] = (first, last)
+    for category, (first, last) in ranges.items():
+        refresh_occupancy(category, first, last)
+
+
+def rebuild_occupancy():
+    """Recompute every category's horizon and drop past and orphaned rows; returns rows written"""
+    today = timezone.localdate()
+    categories = set(Vehicle.objects.order_by().values_list('category', flat=True).distinct())
+    CategoryOccupancy.objects.filter(day__lt=today).delete()
+    CategoryOccupancy.objects.exclude(category__in=categories).delete()
+    last_day = today + timedelta(days=settings.PRICING_HORIZON_DAYS)
+    return sum(refresh_occupancy(category, today, last_day) for category in sorted(categories))
+
+
+def demand_multiplier(occupancy):
+    """Price multiplier for the share (0-1) of a category's vehicles booked"""
+    for threshold, multiplier in settings.PRICING_TIERS:
+        if occupancy >= threshold:
+            return Decimal(multiplier)
+    return Decimal('1')
+
+
+def quote_prices(rentals):
+    """
+    Price (vehicle_id, pickup_date, return_date) rentals. Returns one quote
+    dict per rental, or None where the vehicle doesn't exist.
+
+    Makes at most three queries however many rentals are priced: the
+    vehicles, their categories' fleet sizes and the occupancy rows.
+    """
+    rentals = list(rentals)
+    vehicles = Vehicle.objects.filter(id__in={vehicle_id for vehicle_id, _, _ in rentals})
+    vehicles = {vehicle.id: vehicle for vehicle in vehicles.only('id', 'category', 'price_per_day')}
+    dynamic = settings.DYNAMIC_PRICING_ENABLED and bool(vehicles)
+
+    fleet_sizes = {}
+    occupancy = {}
+    if dynamic:
+        categories = {vehicle.category for vehicle in vehicles.values()}
+        fleet_sizes = dict(
+            Vehicle.objects.filter(category__in=categories).order_by()
+            .values_list('category').annotate(count=Count('id'))
+        )
+        spans = [booked_days(pickup_date, return_date) for _, pickup_date, return_date in rentals]
+        rows = CategoryOccupancy.objects.filter(
+            category__in=categories,
+            day__range=(min(first for first, _ in spans), max(last for _, last in spans)),
+        ).values_list('category', 'day', 'booked')
+        occupancy = {(category, day): booked for category, day, booked in rows}
+
+    quotes = []
+    for vehicle_id, pickup_date, return_date in rentals:
+        vehicle = vehicles.get(vehicle_id)
+        if vehicle is None:
+            quotes.append(None)
+            continue
+        peak = 0.0
+        if dynamic:
+            first, last = booked_days(pickup_date, return_date)
+            booked = max(
+                occupancy.get((vehicle.category, first + timedelta(days=n)), 0)
+                for n in range((last - first).days + 1)
+            )
+            peak = min(1.0, booked / fleet_sizes[vehicle.category])
+        multiplier = demand_multiplier(peak)
+        daily_rate = (vehicle.price_per_day * multiplier).quantize(CENTS)
+        days = rental_days(pickup_date, return_date)
+        quotes.append({
+            'vehicle_id': vehicle.id,
+            'category': vehicle.category,
+            'days': days,
+            'price_per_day': vehicle.price_per_day,
+            'occupancy': round(peak, 4),
+            'multiplier': multiplier,
+            'daily_rate': daily_rate,
+            'base_price': daily_rate * days,
+        })
+    return quotes
+
+
+def price_bookings(items):
+    """
+    With DYNAMIC_PRICING_ENABLED, set base_price and total_price of
+    validated booking data (dicts, changed in place) from quote_prices.
+    Bookings of unknown vehicles keep their submitted prices.
+    """
+    if not settings.DYNAMIC_PRICING_ENABLED or not items:
+        return
+    quotes = quote_prices((item['vehicle_id'], item['pickup_date'], item['return_date']) for item in items)
+    for item, quote in zip(items, quotes):
+        if quote is None:
+            continue
+        item['base_price'] = quote['base_price']
+        item['total_price'] = quote['base_price'] + item.get('enhancements_price', Decimal('0'))
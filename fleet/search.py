@@ -0,0 +1,201 @@
+"""
+Server-side filtering, search and facet counts for the fleet listing.
+"""
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection
+from django.db.models import Case, Count, Q, Value, When
+
+SEARCH_FIELDS = ('make', 'model', 'category', 'engine')
+
+# Allowed values for ?ordering= (prefix with '-' for descending)
+ORDERING_FIELDS = ('price_per_day', 'year', 'seats', 'horsepower', 'make', 'created_at')
+
+# (label, min inclusive, max exclusive) - None means unbounded
+PRICE_BUCKETS = [
+    ('0-100', None, Decimal('100')),
+    ('100-250', Decimal('100'), Decimal('250')),
+    ('250-500', Decimal('250'), Decimal('500')),
+    ('500+', Decimal('500'), None),
+]
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _split(value):
+    """Split a comma-separated query param into non-empty values"""
+    return [v.strip() for v in value.split(',') if v.strip()]
+
+
+def _parse_decimal(value):
+    try:
+        return Decimal(value)
+    except (InvalidOperation, TypeError):
+        return None
+
+
+def _parse_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def split_ids(value):
+    """Comma-separated integer ids, ignoring invalid ones"""
+    return [number for number in map(_parse_int, _split(value or '')) if number is not None]
+
+
+def _iexact_any(field, values):
+    query = Q()
+    for value in values:
+        query |= Q(**{f'{field}__iexact': value})
+    return query
+
+
+def search_vehicles(queryset, term):
+    """
+    Full-text search over make/model/category/engine.
+
+    On PostgreSQL this uses a prefix tsquery against the same tsvector
+    expression as the GIN index created in fleet/migrations/0003.
+    Other backends fall back to matching every word as a substring of
+    any search field.
+    """
+    tokens = _TOKEN_RE.findall(term or '')
+    if not tokens:
+        return queryset
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchVector
+
+        query = SearchQuery(
+            ' & '.join(f'{token}:*' for token in tokens),
+            config='simple',
+            search_type='raw',
+        )
+        return queryset.alias(
+            search=SearchVector(*SEARCH_FIELDS, config='simple')
+        ).filter(search=query)
+
+    for token in tokens:
+        match = Q()
+        for field in SEARCH_FIELDS:
+            match |= Q(**{f'{field}__icontains': token})
+        queryset = queryset.filter(match)
+    return queryset
+
+
+def filter_vehicles(queryset, params):
+    """
+    Apply the fleet query params to a Vehicle queryset.
+
+    Supported params:
+    - category, transmission: comma-separated, case-insensitive
+    - seats: exact seat count, min_seats: minimum seat count
+    - min_price, max_price: price_per_day range (inclusive)
+    - status: comma-separated current_status values (e.g. AVAILABLE)
+    - q: free-text search (see search_vehicles)
+
+    Invalid values are ignored, same as the existing limit param.
+    """
+    category = params.get('category')
+    if category:
+        queryset = queryset.filter(_iexact_any('category', _split(category)))
+
+    transmission = params.get('transmission')
+    if transmission:
+        queryset = queryset.filter(_iexact_any('transmission', _split(transmission)))
+
+    seats = _parse_int(params.get('seats'))
+    if seats is not None:
+        queryset = queryset.filter(seats=seats)
+
+    min_seats = _parse_int(params.get('min_seats'))
+    if min_seats is not None:
+        queryset = queryset.filter(seats__gte=min_seats)
+
+    min_price = _parse_decimal(params.get('min_price'))
+    if min_price is not None:
+        queryset = queryset.filter(price_per_day__gte=min_price)
+
+    max_price = _parse_decimal(params.get('max_price'))
+    if max_price is not None:
+        queryset = queryset.filter(price_per_day__lte=max_price)
+
+    status = params.get('status')
+    if status:
+        queryset = queryset.filter(current_status__in=[value.upper() for value in _split(status)])
+
+    return search_vehicles(queryset, params.get('q'))
+
+
+def order_vehicles(queryset, ordering):
+    """Apply a whitelisted ?ordering= value, ignoring unknown fields"""
+    fields = [
+        field for field in _split(ordering or '')
+        if field.lstrip('-') in ORDERING_FIELDS
+    ]
+    if not fields:
+        return queryset
+    return queryset.order_by(*fields, '-created_at')
+
+
+def _price_bucket_expression():
+    whens = []
+    for label, low, high in PRICE_BUCKETS:
+        condition = Q()
+        if low is not None:
+            condition &= Q(price_per_day__gte=low)
+        if high is not None:
+            condition &= Q(price_per_day__lt=high)
+        whens.append(When(condition, then=Value(label)))
+    return Case(*whens, default=Value(PRICE_BUCKETS[-1][0]))
+
+
+def vehicle_facets(queryset):
+    """
+    Count vehicles per category, transmission and price bucket.
+
+    All three facets come from a single GROUP BY over
+    (category, transmission, price_bucket) which is rolled up here.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(price_bucket=_price_bucket_expression())
+        .values('category', 'transmission', 'price_bucket')
+        .annotate(count=Count('id'))
+    )
+
+    categories = {}
+    transmissions = {}
+    prices = {label: 0 for label, _, _ in PRICE_BUCKETS}
+    total = 0
+    for row in rows:
+        count = row['count']
+        total += count
+        categories[row['category']] = categories.get(row['category'], 0) + count
+        transmissions[row['transmission']] = transmissions.get(row['transmission'], 0) + count
+        prices[row['price_bucket']] += count
+
+    return {
+        'total': total,
+        'category': [
+            {'value': value, 'count': count}
+            for value, count in sorted(categories.items())
+        ],
+        'transmission': [
+            {'value': value, 'count': count}
+            for value, count in sorted(transmissions.items())
+        ],
+        'price': [
+            {
+                'label': label,
+                'min': low,
+                'max': high,
+                'count': prices[label],
+            }
+            for label, low, high in PRICE_BUCKETS
+        ],
+    }
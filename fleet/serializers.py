@@ -1,26 +1,59 @@
 from rest_framework import serializers
-from .models import Vehicle
-import json
+from lexuBackend.serializers import SparseFieldsMixin
+from .models import Location, Vehicle
 
-class VehicleSerializer(serializers.ModelSerializer):
-    gallery = serializers.JSONField(required=False)
+
+class VehicleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    gallery = serializers.ListField(child=serializers.CharField(), required=False, write_only=True)
+    # Display label of current_status, which is derived from bookings
+    availability = serializers.CharField(source='get_current_status_display', read_only=True)
 
     class Meta:
         model = Vehicle
         fields = '__all__'
 
     def to_representation(self, instance):
-        """Convert JSON string back to list for frontend"""
+        """Return the gallery as a list of URLs for the frontend"""
         ret = super().to_representation(instance)
-        ret['gallery'] = instance.get_gallery_list()
+        if 'gallery' in self.fields:
+            ret['gallery'] = instance.get_gallery_list()
         return ret
 
     def create(self, validated_data):
-        if 'gallery' in validated_data:
-            validated_data['gallery'] = json.dumps(validated_data['gallery'])
-        return super().create(validated_data)
+        gallery = validated_data.pop('gallery', None)
+        vehicle = super().create(validated_data)
+        if gallery is not None:
+            vehicle.set_gallery_list(gallery)
+        return vehicle
 
     def update(self, instance, validated_data):
-        if 'gallery' in validated_data:
-            validated_data['gallery'] = json.dumps(validated_data['gallery'])
-        return super().update(instance, validated_data)
\ No newline at end of file
+        gallery = validated_data.pop('gallery', None)
+        vehicle = super().update(instance, validated_data)
+        if gallery is not None:
+            vehicle.set_gallery_list(gallery)
+        return vehicle
+
+
+class VehicleListSerializer(serializers.ModelSerializer):
+    """
+    Lightweight representation for the fleet grid: the primary image plus
+    the number of gallery images instead of the full gallery.
+    Expects the queryset to be annotated with gallery_count.
+    """
+    gallery_count = serializers.IntegerField(read_only=True)
+    availability = serializers.CharField(source='get_current_status_display', read_only=True)
+
+    class Meta:
+        model = Vehicle
+        fields = [
+            'id', 'make', 'model', 'year', 'category', 'price_per_day', 'image',
+            'transmission', 'seats', 'horsepower', 'current_status',
+            'availability', 'current_location', 'gallery_count'
+        ]
+        read_only_fields = fields
+
+
+class LocationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Location
+        fields = ['id', 'name', 'address']
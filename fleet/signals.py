@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bookings.models import Booking
+
+from .locations import refresh_vehicle_location
+from .pricing import refresh_booking_occupancy
+from .status import refresh_vehicle_status
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def booking_changed_handler(sender, instance, **kwargs):
+    """
+    Once the booking change is committed, refresh the booked vehicle's
+    status and the pricing occupancy of the days it covers. A completed
+    booking also moves the vehicle to its return branch.
+    """
+    vehicle_id = instance.vehicle_id
+    rental = (vehicle_id, instance.pickup_date, instance.return_date)
+    transaction.on_commit(lambda: refresh_vehicle_status([vehicle_id]))
+    transaction.on_commit(lambda: refresh_booking_occupancy([rental]))
+    if instance.status == 'COMPLETED':
+        transaction.on_commit(lambda: refresh_vehicle_location([vehicle_id]))
@@ -0,0 +1,61 @@
+"""
+Vehicle.current_status, derived from bookings.
+
+- ON_RENT: an ACTIVE booking (picked up, not yet completed), or a pending
+  or confirmed booking whose rental period includes now
+- RESERVED_SOON: a pending or confirmed booking starts within
+  VEHICLE_RESERVED_SOON_HOURS
+- AVAILABLE: otherwise
+
+The status is stored on the vehicle so fleet lists can filter on it
+without touching bookings. Booking saves and deletes refresh their
+vehicle (fleet/signals.py). Time alone also changes the status, e.g. a
+reservation coming within the window or a rental period ending, so
+`manage.py refresh_vehicle_status` sweeps the whole fleet and should run
+every few minutes from cron. The sweep also corrects anything the
+signals miss, such as bulk updates or a booking moved to another vehicle.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Case, Exists, F, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from .models import Vehicle
+
+UPCOMING_STATUSES = ['PENDING', 'CONFIRMED']
+
+
+def status_expression(now=None):
+    """SQL expression computing a Vehicle's current status from its bookings"""
+    from bookings.models import Booking
+
+    now = now or timezone.now()
+    soon = now + timedelta(hours=getattr(settings, 'VEHICLE_RESERVED_SOON_HOURS', 48))
+    bookings = Booking.objects.filter(vehicle_id=OuterRef('pk'))
+    on_rent = bookings.filter(
+        Q(status='ACTIVE')
+        | Q(status__in=UPCOMING_STATUSES, pickup_date__lte=now, return_date__gt=now)
+    )
+    reserved_soon = bookings.filter(status__in=UPCOMING_STATUSES, pickup_date__gt=now, pickup_date__lte=soon)
+    return Case(
+        When(Exists(on_rent), then=Value(Vehicle.ON_RENT)),
+        When(Exists(reserved_soon), then=Value(Vehicle.RESERVED_SOON)),
+        default=Value(Vehicle.AVAILABLE),
+    )
+
+
+def refresh_vehicle_status(vehicle_ids=None, now=None):
+    """
+    Recompute current_status for the given vehicles (all if None) in one
+    UPDATE that only touches rows whose status changed; returns that count.
+    """
+    vehicles = Vehicle.objects.all()
+    if vehicle_ids is not None:
+        vehicles = vehicles.filter(pk__in=list(vehicle_ids))
+    status = status_expression(now)
+    return (
+        vehicles.alias(new_status=status)
+        .exclude(current_status=F('new_status'))
+        .update(current_status=status)
+    )
@@ -1,3 +1,479 @@
-from django.test import TestCase
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookings.models import Booking
+from users.models import User
+
+from .analytics import fleet_utilisation
+from .locations import available_at
+from .models import CategoryOccupancy, Location, Vehicle
+from . import pricing
+from .pricing import quote_prices, rebuild_occupancy, refresh_occupancy
+from .status import refresh_vehicle_status
+
+
+class VehicleSearchTests(TestCase):
+    """Listing filters, search, the ordering whitelist and facet counts"""
+
+    def setUp(self):
+        specs = [
+            ('porsche', 'Porsche', '911', 'Sports', '500.00', 'Manual', 2, '3.0L Twin-Turbo Flat-6', 443, 2023),
+            ('prado', 'Toyota', 'Land Cruiser Prado', 'SUV', '120.00', 'Automatic', 7, 'V6', 275, 2022),
+            ('tesla', 'Tesla', 'Model S', 'Electric', '250.00', 'Automatic', 5, 'Dual Motor', 670, 2024),
+            ('camry', 'Toyota', 'Camry', 'Sedan', '80.00', 'Automatic', 5, '2.5L', 203, 2021),
+        ]
+        self.ids = {}
+        for key, make, model, category, price, transmission, seats, engine, horsepower, year in specs:
+            self.ids[key] = Vehicle.objects.create(
+                make=make, model=model, category=category, price_per_day=price, transmission=transmission,
+                seats=seats, engine=engine, horsepower=horsepower, year=year,
+            ).id
+        self.client = APIClient()
+
+    def listed(self, **params):
+        response = self.client.get('/api/vehicles/', params)
+        self.assertEqual(response.status_code, 200)
+        names = {vehicle_id: key for key, vehicle_id in self.ids.items()}
+        return [names[row['id']] for row in response.data['results']]
+
+    def filtered(self, **params):
+        return sorted(self.listed(**params))
+
+    def test_filters(self):
+        self.assertEqual(self.filtered(category='suv, Sports'), ['porsche', 'prado'])
+        self.assertEqual(self.filtered(transmission='manual'), ['porsche'])
+        self.assertEqual(self.filtered(seats='5'), ['camry', 'tesla'])
+        self.assertEqual(self.filtered(min_seats='5'), ['camry', 'prado', 'tesla'])
+        self.assertEqual(self.filtered(min_price='100', max_price='250'), ['prado', 'tesla'])
+        self.assertEqual(self.filtered(category='SUV,Sedan', max_price='100'), ['camry'])
+        # Invalid values are ignored
+        self.assertEqual(self.filtered(seats='two', max_price='cheap'), ['camry', 'porsche', 'prado', 'tesla'])
+
+        Vehicle.objects.filter(pk=self.ids['tesla']).update(current_status=Vehicle.ON_RENT)
+        self.assertEqual(self.filtered(status='available'), ['camry', 'porsche', 'prado'])
+        self.assertEqual(self.filtered(status='ON_RENT,RESERVED_SOON'), ['tesla'])
+
+    def test_search(self):
+        self.assertEqual(self.filtered(q='toyota'), ['camry', 'prado'])
+        # Every word must match, each in any of make, model, category and engine
+        self.assertEqual(self.filtered(q='Toyota cam'), ['camry'])
+        self.assertEqual(self.filtered(q='twin-turbo'), ['porsche'])
+        self.assertEqual(self.filtered(q='electric'), ['tesla'])
+        self.assertEqual(self.filtered(q='toyota electric'), [])
+        self.assertEqual(self.filtered(q='  '), ['camry', 'porsche', 'prado', 'tesla'])
+
+    def test_ordering_whitelist(self):
+        default = self.listed()
+        self.assertEqual(self.listed(ordering='price_per_day'), ['camry', 'prado', 'tesla', 'porsche'])
+        self.assertEqual(self.listed(ordering='-horsepower'), ['tesla', 'porsche', 'prado', 'camry'])
+        self.assertEqual(self.listed(ordering='make,-year'), ['porsche', 'tesla', 'prado', 'camry'])
+        # Unknown fields are dropped, so they can't order by (and probe) other columns
+        self.assertEqual(self.listed(ordering='engine,-year'), ['tesla', 'porsche', 'prado', 'camry'])
+        self.assertEqual(self.listed(ordering='current_location__name'), default)
+        self.assertEqual(self.listed(ordering='images__url'), default)
+
+    def test_facets_follow_filters(self):
+        facets = self.client.get('/api/vehicles/facets/').data
+        self.assertEqual(facets['total'], 4)
+        self.assertEqual(facets['category'], [
+            {'value': 'Electric', 'count': 1}, {'value': 'SUV', 'count': 1},
+            {'value': 'Sedan', 'count': 1}, {'value': 'Sports', 'count': 1},
+        ])
+        self.assertEqual(facets['transmission'], [{'value': 'Automatic', 'count': 3}, {'value': 'Manual', 'count': 1}])
+        self.assertEqual([(bucket['label'], bucket['count']) for bucket in facets['price']],
+                         [('0-100', 1), ('100-250', 1), ('250-500', 1), ('500+', 1)])
+
+        with self.assertNumQueries(1):
+            facets = self.client.get('/api/vehicles/facets/', {'q': 'toyota', 'min_price': '100'}).data
+        self.assertEqual(facets['total'], 1)
+        self.assertEqual(facets['category'], [{'value': 'SUV', 'count': 1}])
+        self.assertEqual(facets['transmission'], [{'value': 'Automatic', 'count': 1}])
+        self.assertEqual([bucket['count'] for bucket in facets['price']], [0, 1, 0, 0])
+
+
+class VehicleStatusTests(TestCase):
+    """current_status follows the vehicle's bookings and can be filtered on"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='driver@example.com', password=None)
+        self.vehicle = Vehicle.objects.create(
+            make='Porsche', model='911', year=2023, category='Sports', price_per_day='500.00'
+        )
+        self.now = timezone.now()
+
+    def book(self, starts_in, days=2, status='CONFIRMED'):
+        pickup = self.now + starts_in
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                user=self.user, vehicle_id=self.vehicle.id, status=status,
+                pickup_date=pickup, return_date=pickup + timedelta(days=days),
+                pickup_location='Nairobi', return_location='Nairobi', driver_name='Driver',
+                driver_email='driver@example.com', driver_phone='0700000000', license_number='DL-1',
+                base_price='100.00', total_price='100.00',
+            )
+
+    def status(self):
+        self.vehicle.refresh_from_db()
+        return self.vehicle.current_status
+
+    def test_booking_changes_update_status(self):
+        self.assertEqual(self.status(), Vehicle.AVAILABLE)
+        booking = self.book(timedelta(hours=12))
+        self.assertEqual(self.status(), Vehicle.RESERVED_SOON)
+
+        booking.status = 'ACTIVE'
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(self.status(), Vehicle.ON_RENT)
+
+        booking.status = 'COMPLETED'
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(self.status(), Vehicle.AVAILABLE)
+
+    def test_far_future_and_cancelled_bookings_leave_vehicle_available(self):
+        self.book(timedelta(days=30))
+        self.book(timedelta(hours=-1), status='CANCELLED')
+        self.assertEqual(self.status(), Vehicle.AVAILABLE)
+
+    def test_sweep_picks_up_the_passage_of_time(self):
+        self.book(timedelta(days=3))
+        self.assertEqual(self.status(), Vehicle.AVAILABLE)
+        self.assertEqual(refresh_vehicle_status(now=self.now + timedelta(days=2)), 1)
+        self.assertEqual(self.status(), Vehicle.RESERVED_SOON)
+        self.assertEqual(refresh_vehicle_status(now=self.now + timedelta(days=4)), 1)
+        self.assertEqual(self.status(), Vehicle.ON_RENT)
+        # Nothing changed since the last sweep
+        self.assertEqual(refresh_vehicle_status(now=self.now + timedelta(days=4)), 0)
+
+        Vehicle.objects.update(current_status=Vehicle.AVAILABLE)
+        call_command('refresh_vehicle_status', stdout=StringIO())
+        self.assertEqual(self.status(), Vehicle.AVAILABLE)
+
+    def test_list_filters_and_labels_status(self):
+        other = Vehicle.objects.create(make='Toyota', model='Prado', year=2022, category='SUV', price_per_day='120.00')
+        self.book(timedelta(hours=-1), status='ACTIVE')
+        response = APIClient().get('/api/vehicles/', {'status': 'available'})
+        self.assertEqual([v['id'] for v in response.data['results']], [other.id])
+        self.assertEqual(response.data['results'][0]['availability'], 'Available')
+
+        response = APIClient().get('/api/vehicles/', {'status': 'ON_RENT', 'fields': 'id,availability'})
+        self.assertEqual(response.data['results'], [{'id': self.vehicle.id, 'availability': 'On rent'}])
+
+
+class FleetUtilisationTests(TestCase):
+    """Occupancy, rolling utilisation and forecast per category"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='driver@example.com', password=None)
+        self.suvs = [
+            Vehicle.objects.create(make='Toyota', model=f'Prado {i}', year=2022, category='SUV', price_per_day='120.00')
+            for i in range(2)
+        ]
+        self.sports = Vehicle.objects.create(make='Porsche', model='911', year=2023, category='Sports', price_per_day='500.00')
+        self.today = datetime(2030, 1, 15, tzinfo=dt_timezone.utc)
+
+    def book(self, vehicle, start_day, days, status='CONFIRMED'):
+        pickup = self.today + timedelta(days=start_day)
+        Booking.objects.create(
+            user=self.user, vehicle_id=vehicle.id, status=status,
+            pickup_date=pickup, return_date=pickup + timedelta(days=days),
+            pickup_location='Nairobi', return_location='Nairobi', driver_name='Driver',
+            driver_email='driver@example.com', driver_phone='0700000000', license_number='DL-1',
+            base_price='100.00', total_price='100.00',
+        )
+
+    def report(self, **options):
+        now = self.today + timedelta(hours=12)
+        return {row['category']: row for row in fleet_utilisation(now=now, **options)['categories']}
+
+    def test_daily_utilisation_and_rolling_mean(self):
+        self.book(self.suvs[0], -2, 1)
+        # Overlaps the first booking: the vehicle is counted once
+        self.book(self.suvs[0], -2, 0.5)
+        self.book(self.suvs[1], -1, 0.5)
+        self.book(self.suvs[1], -3, 1, status='CANCELLED')
+        # A vehicle that has since been deleted
+        self.book(Vehicle(id=9999), -2, 1)
+
+        suv = self.report(days=14, horizon=7, window=7)['SUV']
+        self.assertEqual(suv['vehicles'], 2)
+        self.assertEqual([day['utilisation'] for day in suv['daily'][-3:]], [0.0, 0.5, 0.25])
+        self.assertEqual(suv['daily'][-1]['date'], '2030-01-14')
+        self.assertEqual(suv['daily'][-1]['rolling'], round(0.75 / 7, 4))
+        self.assertEqual(suv['utilisation'], round(0.75 / 14, 4))
+        # Both SUVs are booked at midnight on one of the 14 days
+        self.assertEqual(suv['hour_of_day'][0], round(1 / 14, 4))
+
+    def test_forecast_repeats_weekdays_and_respects_bookings(self):
+        # Busy every Monday (2030-01-14 is one) for the last two weeks
+        for day in (-8, -1):
+            self.book(self.sports, day, 1)
+        self.book(self.suvs[0], 2, 1)
+        report = self.report(days=14, horizon=8, weeks=2)
+        sports = [day['utilisation'] for day in report['Sports']['forecast']]
+        self.assertEqual(sports, [0.0] * 6 + [1.0, 0.0])
+        suv = report['SUV']['forecast']
+        self.assertEqual((suv[2]['utilisation'], suv[2]['booked']), (0.5, 0.5))
+
+    def test_endpoint_is_staff_only(self):
+        client = APIClient()
+        self.assertEqual(client.get('/api/vehicles/utilisation/').status_code, 401)
+        client.force_authenticate(User.objects.create_user(email='staff@example.com', password=None, is_staff=True))
+        response = client.get('/api/vehicles/utilisation/', {'days': '9999', 'horizon': 'x'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['days'], response.data['horizon']), (730, 14))
+        self.assertEqual([row['category'] for row in response.data['categories']], ['SUV', 'Sports'])
+
+
+@override_settings(DYNAMIC_PRICING_ENABLED=True)
+class DynamicPricingTests(TestCase):
+    """The occupancy cache follows bookings and drives the quote multiplier"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='driver@example.com', password=None)
+        self.suvs = [
+            Vehicle.objects.create(make='Toyota', model=f'Prado {i}', year=2022, category='SUV', price_per_day='100.00')
+            for i in range(4)
+        ]
+        self.pickup = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=10)
+
+    def book(self, vehicle, days=2, offset=0):
+        pickup = self.pickup + timedelta(days=offset)
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                user=self.user, vehicle_id=vehicle.id, pickup_date=pickup, return_date=pickup + timedelta(days=days),
+                pickup_location='Nairobi', return_location='Nairobi', driver_name='Driver',
+                driver_email='driver@example.com', driver_phone='0700000000', license_number='DL-1',
+                base_price='200.00', total_price='200.00',
+            )
+
+    def occupancy(self):
+        return dict(CategoryOccupancy.objects.filter(booked__gt=0).values_list('day', 'booked'))
+
+    def quote(self, days=2):
+        return quote_prices([(self.suvs[0].id, self.pickup, self.pickup + timedelta(days=days))])[0]
+
+    def test_bookings_update_occupancy(self):
+        booking = self.book(self.suvs[0])
+        self.book(self.suvs[1], offset=1)
+        day = self.pickup.date()
+        self.assertEqual(self.occupancy(), {day: 1, day + timedelta(days=1): 2, day + timedelta(days=2): 2,
+                                            day + timedelta(days=3): 1})
+        booking.status = 'CANCELLED'
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(self.occupancy(), {day + timedelta(days=n): 1 for n in (1, 2, 3)})
+
+    def test_multiplier_follows_busiest_day(self):
+        self.assertEqual((self.quote()['multiplier'], self.quote()['base_price']), (Decimal('1'), Decimal('200.00')))
+        self.book(self.suvs[1], offset=1)
+        self.book(self.suvs[2], offset=1)
+        quote = self.quote()
+        self.assertEqual((quote['occupancy'], quote['multiplier']), (0.5, Decimal('1.10')))
+        self.assertEqual((quote['daily_rate'], quote['base_price']), (Decimal('110.00'), Decimal('220.00')))
+        self.book(self.suvs[3], offset=2)
+        self.assertEqual(self.quote()['multiplier'], Decimal('1.25'))
+        # Outside the busy days
+        later = quote_prices([(self.suvs[0].id, self.pickup + timedelta(days=5), self.pickup + timedelta(days=6))])
+        self.assertEqual(later[0]['multiplier'], Decimal('1'))
+
+    def test_quotes_take_three_queries(self):
+        rentals = [(vehicle.id, self.pickup, self.pickup + timedelta(days=n + 1)) for n, vehicle in enumerate(self.suvs)]
+        with CaptureQueriesContext(connection) as queries:
+            quotes = quote_prices(rentals + [(9999, self.pickup, self.pickup + timedelta(days=1))])
+        self.assertEqual(len(queries), 3)
+        self.assertEqual([quote['days'] for quote in quotes[:-1]], [1, 2, 3, 4])
+        self.assertIsNone(quotes[-1])
+
+    def test_booking_and_quote_endpoints_use_dynamic_price(self):
+        for vehicle in self.suvs[1:3]:
+            self.book(vehicle)
+        client = APIClient()
+        dates = {'pickup_date': self.pickup.isoformat(), 'return_date': (self.pickup + timedelta(days=3)).isoformat()}
+        response = client.get(f'/api/vehicles/{self.suvs[0].id}/quote/', dates)
+        self.assertEqual(response.data['base_price'], Decimal('330.00'))
+        self.assertEqual(client.get(f'/api/vehicles/{self.suvs[0].id}/quote/', {'pickup_date': 'x'}).status_code, 400)
+        self.assertEqual(client.get('/api/vehicles/9999/quote/', dates).status_code, 404)
+
+        client.force_authenticate(self.user)
+        response = client.post('/api/bookings/', {
+            'vehicle_id': self.suvs[0].id, **dates, 'pickup_location': 'Nairobi', 'return_location': 'Nairobi',
+            'driver_name': 'Driver', 'driver_email': 'driver@example.com', 'driver_phone': '0700000000',
+            'license_number': 'DL-1', 'base_price': '1.00', 'enhancements_price': '50.00', 'total_price': '1.00',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual((response.data['base_price'], response.data['total_price']), ('330.00', '380.00'))
+
+    def test_rebuild_drops_past_days(self):
+        self.book(self.suvs[0])
+        CategoryOccupancy.objects.create(category='SUV', day=timezone.localdate() - timedelta(days=1), booked=3)
+        CategoryOccupancy.objects.filter(booked__gt=0, day__gte=timezone.localdate()).update(booked=0)
+        call_command('refresh_category_occupancy', stdout=StringIO())
+        self.assertEqual(self.occupancy(), {self.pickup.date(): 1, self.pickup.date() + timedelta(days=1): 1,
+                                            self.pickup.date() + timedelta(days=2): 1})
+
+
+class OccupancyRaceTests(TransactionTestCase):
+    """Overlapping refreshes of a category take turns on its occupancy rows"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='driver@example.com', password=None)
+        self.suvs = [
+            Vehicle.objects.create(make='Toyota', model=f'Prado {i}', year=2022, category='SUV', price_per_day='100.00')
+            for i in range(2)
+        ]
+        self.pickup = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=10)
+        self.day = timezone.localdate(self.pickup)
+
+    def insert_booking(self, vehicle):
+        # bulk_create sends no post_save, so only the test's refreshes run
+        Booking.objects.bulk_create([Booking(
+            user=self.user, vehicle_id=vehicle.id, pickup_date=self.pickup, return_date=self.pickup + timedelta(hours=4),
+            pickup_location='Nairobi', return_location='Nairobi', driver_name='Driver', booking_reference=f'LX-T{vehicle.id}',
+            driver_email='driver@example.com', driver_phone='0700000000', license_number='DL-1',
+            base_price='100.00', total_price='100.00', status='CONFIRMED',
+        )])
+
+    def test_rows_are_locked_before_bookings_are_read(self):
+        with CaptureQueriesContext(connection) as queries:
+            refresh_occupancy('SUV', self.day, self.day)
+        sql = [query['sql'] for query in queries]
+        lock = next(i for i, q in enumerate(sql) if q.startswith('SELECT') and 'fleet_categoryoccupancy' in q)
+        read = next(i for i, q in enumerate(sql) if 'bookings_booking' in q)
+        self.assertLess(lock, read)
+        if connection.features.has_select_for_update:
+            self.assertIn('FOR UPDATE', sql[lock])
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_overlapping_refreshes_keep_latest_count(self):
+        self.insert_booking(self.suvs[0])
+        counted, resume = threading.Event(), threading.Event()
+        booked_days = pricing.booked_days
+
+        def pause_slow_refresh(*args):
+            if threading.current_thread().name == 'slow':
+                counted.set()
+                resume.wait(10)
+            return booked_days(*args)
+
+        def refresh():
+            try:
+                refresh_occupancy('SUV', self.day, self.day)
+            finally:
+                connection.close()
+
+        with mock.patch.object(pricing, 'booked_days', pause_slow_refresh):
+            slow = threading.Thread(target=refresh, name='slow')
+            slow.start()
+            self.assertTrue(counted.wait(10))
+            # The slow refresh has counted one booking; a second one commits now
+            self.insert_booking(self.suvs[1])
+            fast = threading.Thread(target=refresh, name='fast')
+            fast.start()
+            fast.join(0.5)
+            self.assertTrue(fast.is_alive(), 'second refresh did not wait for the first')
+            resume.set()
+            slow.join(10)
+            fast.join(10)
+        self.assertEqual(CategoryOccupancy.objects.get(category='SUV', day=self.day).booked, 2)
+
+
+class LocationAvailabilityTests(TestCase):
+    """Vehicles follow completed one-way rentals and are searched by branch"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='driver@example.com', password=None)
+        self.cbd, self.airport, self.mombasa = Location.objects.bulk_create([
+            Location(name='Nairobi CBD'), Location(name='JKIA'), Location(name='Mombasa'),
+        ])
+        self.at_cbd = Vehicle.objects.create(make='Toyota', model='Prado', year=2022, category='SUV',
+                                             price_per_day='120.00', current_location=self.cbd)
+        self.at_airport = Vehicle.objects.create(make='Porsche', model='911', year=2023, category='Sports',
+                                                 price_per_day='500.00', current_location=self.airport)
+        self.start = timezone.now().replace(microsecond=0) + timedelta(days=10)
+
+    def book(self, vehicle, start_day, days, pickup, ret, status='CONFIRMED'):
+        pickup_date = self.start + timedelta(days=start_day)
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                user=self.user, vehicle_id=vehicle.id, status=status,
+                pickup_date=pickup_date, return_date=pickup_date + timedelta(days=days),
+                pickup_location=pickup.name, return_location=ret.name, pickup_branch=pickup, return_branch=ret,
+                driver_name='Driver', driver_email='driver@example.com', driver_phone='0700000000',
+                license_number='DL-1', base_price='100.00', total_price='100.00',
+            )
+
+    def available(self, locations, start_day=0, days=2, return_location=None):
+        pickup_date = self.start + timedelta(days=start_day)
+        vehicles = available_at(Vehicle.objects.order_by('id'), [location.id for location in locations],
+                                pickup_date, pickup_date + timedelta(days=days),
+                                return_location.id if return_location else None)
+        return list(vehicles.values_list('id', flat=True))
+
+    def test_one_way_rental_moves_vehicle(self):
+        booking = self.book(self.at_cbd, 0, 2, self.cbd, self.mombasa)
+        # Booked during the window, then expected in Mombasa
+        self.assertEqual(self.available([self.cbd, self.mombasa]), [])
+        self.assertEqual(self.available([self.cbd], start_day=3), [])
+        self.assertEqual(self.available([self.mombasa], start_day=3), [self.at_cbd.id])
+
+        booking.status = 'COMPLETED'
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.at_cbd.refresh_from_db()
+        self.assertEqual(self.at_cbd.current_location, self.mombasa)
+
+    def test_multi_branch_search_is_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.available([self.cbd, self.airport]), [self.at_cbd.id, self.at_airport.id])
+        self.book(self.at_airport, 1, 1, self.airport, self.airport)
+        self.assertEqual(self.available([self.cbd, self.airport]), [self.at_cbd.id])
+
+    def test_one_way_rental_must_not_strand_next_pickup(self):
+        self.book(self.at_cbd, 5, 1, self.cbd, self.cbd)
+        self.assertEqual(self.available([self.cbd], return_location=self.cbd), [self.at_cbd.id])
+        self.assertEqual(self.available([self.cbd], return_location=self.mombasa), [])
+        self.assertEqual(self.available([self.cbd]), [self.at_cbd.id])
+
+    def test_unknown_location_is_anywhere(self):
+        unplaced = Vehicle.objects.create(make='Nissan', model='X-Trail', year=2021, category='SUV',
+                                          price_per_day='90.00')
+        self.assertEqual(self.available([self.mombasa]), [unplaced.id])
+        self.assertEqual(self.available([self.cbd]), [self.at_cbd.id, unplaced.id])
+        # Once a drop-off places it, it is only offered there
+        self.book(unplaced, 0, 1, self.cbd, self.mombasa)
+        self.assertEqual(self.available([self.mombasa], start_day=2), [unplaced.id])
+        self.assertEqual(self.available([self.cbd], start_day=2), [self.at_cbd.id])
+
+    def test_endpoints(self):
+        client = APIClient()
+        self.assertEqual([row['name'] for row in client.get('/api/locations/').data],
+                         ['JKIA', 'Mombasa', 'Nairobi CBD'])
+        dates = {'pickup_date': self.start.isoformat(), 'return_date': (self.start + timedelta(days=2)).isoformat()}
+        response = client.get('/api/vehicles/available/', {'location': f'{self.airport.id},x', **dates})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.at_airport.id])
+        self.assertEqual(response.data['results'][0]['current_location'], self.airport.id)
+        self.assertEqual(client.get('/api/vehicles/available/', dates).status_code, 400)
+
+        client.force_authenticate(self.user)
+        booking = {
+            'vehicle_id': self.at_cbd.id, **dates, 'pickup_branch': self.airport.id, 'return_branch': self.cbd.id,
+            'driver_name': 'Driver', 'driver_email': 'driver@example.com', 'driver_phone': '0700000000',
+            'license_number': 'DL-1', 'base_price': '240.00', 'total_price': '240.00',
+        }
+        self.assertEqual(client.post('/api/bookings/', booking, format='json').status_code, 400)
+        response = client.post('/api/bookings/', {**booking, 'pickup_branch': self.cbd.id}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual((response.data['pickup_location'], response.data['return_location']),
+                         ('Nairobi CBD', 'Nairobi CBD'))
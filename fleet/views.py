@@ -5,8 +5,43 @@ from django.shortcuts import render
 from rest_framework import viewsets, permissions, pagination, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Vehicle
-from .serializers import VehicleSerializer
+from django.conf import settings
+from django.db.models import Count
+from django.http import Http404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from lexuBackend.routers import ReplicaReadMixin
+from lexuBackend.metrics import InstrumentedViewMixin
+from lexuBackend.serializers import requested_fields, only_requested
+from .models import Location, Vehicle
+from .serializers import LocationSerializer, VehicleSerializer, VehicleListSerializer
+from .search import filter_vehicles, order_vehicles, split_ids, vehicle_facets
+from .locations import available_at
+from .analytics import fleet_utilisation
+from .pricing import quote_prices
+
+# ?param=: (default, min, max) for the utilisation endpoint
+UTILISATION_PARAMS = {
+    'days': (90, 1, 730),
+    'horizon': (14, 0, 90),
+    'window': (7, 1, 90),
+    'weeks': (4, 1, 52),
+}
+
+
+def _parse_window(params):
+    """Aware (pickup_date, return_date) from the query params, or None if missing, invalid or empty"""
+    dates = []
+    for name in ('pickup_date', 'return_date'):
+        try:
+            value = parse_datetime(params.get(name) or '')
+        except ValueError:
+            value = None
+        if not value:
+            return None
+        dates.append(timezone.make_aware(value) if timezone.is_naive(value) else value)
+    pickup_date, return_date = dates
+    return (pickup_date, return_date) if return_date > pickup_date else None
 
 class StandardPagination(pagination.PageNumberPagination):
     page_size = 10
@@ -14,7 +49,7 @@ class StandardPagination(pagination.PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class VehicleViewSet(viewsets.ModelViewSet):
+class VehicleViewSet(InstrumentedViewMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     A ViewSet for viewing and editing fleet assets.
     Provides: 
@@ -24,11 +59,31 @@ class VehicleViewSet(viewsets.ModelViewSet):
     - PUT/PATCH /api/vehicles/{id}/ (Update)
     - DELETE /api/vehicles/{id}/ (Delete)
     - GET /api/vehicles/count/ (Get total count)
+    - GET /api/vehicles/facets/ (Counts per category/transmission/price bucket)
+    - GET /api/vehicles/utilisation/ (Staff: utilisation and forecast per category)
+    - GET /api/vehicles/{id}/quote/ (Price for ?pickup_date=&return_date=)
+    - GET /api/vehicles/available/ (Free at ?location= from ?pickup_date= to ?return_date=)
     
     Query Parameters:
     - limit: Number of results to return (e.g., ?limit=3)
     - page: Page number for pagination
     - page_size: Results per page
+    - category, transmission: Comma-separated filters (e.g., ?category=SUV,Sports)
+    - seats, min_seats: Exact / minimum seat count
+    - min_price, max_price: Price per day range
+    - status: Comma-separated current statuses (e.g., ?status=AVAILABLE),
+      one of AVAILABLE, ON_RENT, RESERVED_SOON
+    - q: Search make, model, category and engine
+    - ordering: One of price_per_day, year, seats, horsepower, make, created_at
+      (prefix with '-' for descending)
+    - fields: Comma-separated fields to return (e.g., ?fields=id,make,model,gallery)
+
+    /available/ takes the list parameters except limit, plus:
+    - location: Comma-separated Location ids to pick up from (required)
+    - pickup_date, return_date: ISO datetimes (required)
+    - return_location: Location id for one-way rentals
+
+    Safe requests are served from a read replica when one is configured.
     """
     queryset = Vehicle.objects.all().order_by('-created_at')
     serializer_class = VehicleSerializer
@@ -38,15 +93,53 @@ class VehicleViewSet(viewsets.ModelViewSet):
         """
         Custom permissions:
         - List/Retrieve: Allow Any (Potential customers need to see the fleet)
-        - Create/Update/Delete: Require Admin/Staff status
+        - Create/Update/Delete/Utilisation: Require Admin/Staff status
         """
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'utilisation']:
             return [permissions.IsAdminUser()]
         return [permissions.AllowAny()]
+
+    @property
+    def check_non_finite_floats(self):
+        """Utilisation and quotes are computed floats; see lexuBackend/renderers.py"""
+        return self.action in ['utilisation', 'quote']
+
+    def get_serializer_class(self):
+        """
+        List responses use the lean serializer (primary image and gallery count)
+        unless specific fields are requested with ?fields=
+        """
+        if self.action in ['list', 'available'] and requested_fields(self.request) is None:
+            return VehicleListSerializer
+        return super().get_serializer_class()
     
     def get_queryset(self):
-        """Optionally filter vehicles by limit parameter for featured collections"""
+        """Filter, search and order vehicles, then apply the optional limit for featured collections"""
         queryset = super().get_queryset()
+        if self.action in ['list', 'facets', 'available']:
+            params = self.request.query_params
+            queryset = order_vehicles(filter_vehicles(queryset, params), params.get('ordering'))
+        if self.action == 'available':
+            queryset = available_at(queryset, **self.availability_query)
+        if self.action == 'facets':
+            return queryset
+
+        fields = requested_fields(self.request)
+        if fields is not None:
+            if 'availability' in fields:
+                # availability is the display label of current_status
+                fields = fields | {'current_status'}
+            queryset = only_requested(queryset, fields)
+            if 'gallery' in fields:
+                queryset = queryset.prefetch_related('images')
+        elif self.action in ['list', 'available']:
+            queryset = only_requested(queryset, VehicleListSerializer.Meta.fields)
+            queryset = queryset.annotate(gallery_count=Count('images'))
+        else:
+            queryset = queryset.prefetch_related('images')
+
+        if self.action != 'list':
+            return queryset
         limit = self.request.query_params.get('limit')
         if limit:
             try:
@@ -62,3 +155,80 @@ class VehicleViewSet(viewsets.ModelViewSet):
         """Return total vehicle count for fleet size display"""
         count = Vehicle.objects.count()
         return Response({'count': count})
+
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        """Return filter counts for the current query in one grouped query"""
+        return Response(vehicle_facets(self.get_queryset()))
+
+    @action(detail=False, methods=['get'], url_path='utilisation')
+    def utilisation(self, request):
+        """
+        Utilisation per category over the last ?days= (default 90), its
+        ?window=-day rolling mean and a ?horizon=-day forecast from the
+        last ?weeks= weeks (see fleet/analytics.py). Out-of-range values
+        are clamped, invalid ones ignored.
+        """
+        options = {}
+        for name, (default, low, high) in UTILISATION_PARAMS.items():
+            try:
+                options[name] = min(max(int(request.query_params.get(name, default)), low), high)
+            except ValueError:
+                options[name] = default
+        return Response(fleet_utilisation(**options))
+
+    @action(detail=True, methods=['get'], url_path='quote')
+    def quote(self, request, pk=None):
+        """
+        Price a rental from ?pickup_date= to ?return_date= (ISO datetimes),
+        including the demand multiplier when dynamic pricing is enabled
+        """
+        window = _parse_window(request.query_params)
+        if window is None:
+            return Response({'error': 'Provide ISO pickup_date and a later return_date'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        pickup_date, return_date = window
+
+        try:
+            vehicle_id = int(pk)
+        except ValueError:
+            raise Http404
+        quote = quote_prices([(vehicle_id, pickup_date, return_date)])[0]
+        if quote is None:
+            raise Http404
+        return Response({**quote, 'dynamic_pricing': settings.DYNAMIC_PRICING_ENABLED})
+
+    @action(detail=False, methods=['get'], url_path='available')
+    def available(self, request):
+        """
+        Vehicles expected at one of the ?location= branches at pickup_date
+        and free until return_date, found with one query (see fleet/locations.py)
+        """
+        params = request.query_params
+        window = _parse_window(params)
+        location_ids = split_ids(params.get('location'))
+        return_location = split_ids(params.get('return_location'))
+        if window is None or not location_ids:
+            return Response({'error': 'Provide location ids, ISO pickup_date and a later return_date'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        self.availability_query = {
+            'location_ids': location_ids,
+            'pickup_date': window[0],
+            'return_date': window[1],
+            'return_location_id': return_location[0] if return_location else None,
+        }
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class LocationViewSet(InstrumentedViewMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Active branches for pickup and return.
+    - GET /api/locations/ (List)
+    - GET /api/locations/{id}/ (Retrieve)
+    Branches are managed in the admin.
+    """
+    queryset = Location.objects.filter(is_active=True)
+    serializer_class = LocationSerializer
+    permission_classes = [permissions.AllowAny]
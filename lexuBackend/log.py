@@ -0,0 +1,144 @@
+"""
+Structured, non-blocking logging.
+
+Request threads only put records on a bounded queue (QueuedStreamHandler);
+a QueueListener thread formats them as JSON lines and writes them to
+stdout. If the queue is full, records are dropped rather than blocking the
+request. RedactingFilter scrubs PII before records leave the request
+thread.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+# Keys whose values never reach the logs
+REDACTED_KEYS = {
+    'password', 'token', 'access', 'refresh', 'authorization', 'secret',
+    'email', 'driver_email', 'phone_number', 'driver_phone', 'driver_name',
+    'license_number', 'license_image', 'license_image_url',
+}
+REDACTED = '[REDACTED]'
+
+_EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def redact(value):
+    """Return a copy of value with PII keys masked, recursing into dicts and lists"""
+    if hasattr(value, 'lists') and hasattr(value, 'dict'):
+        # QueryDict: keep single values as scalars
+        value = value.dict()
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in REDACTED_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        return _EMAIL_RE.sub(REDACTED, value)
+    return value
+
+
+class RedactingFilter(logging.Filter):
+    """Mask PII in the message arguments and `extra` fields of a record"""
+
+    def filter(self, record):
+        if isinstance(record.args, dict):
+            record.args = redact(record.args)
+        elif record.args:
+            record.args = tuple(redact(arg) for arg in record.args)
+        if isinstance(record.msg, str):
+            record.msg = _EMAIL_RE.sub(REDACTED, record.msg)
+        for key in set(vars(record)) - _RECORD_ATTRS:
+            value = getattr(record, key)
+            setattr(record, key, REDACTED if key.lower() in REDACTED_KEYS else redact(value))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, extras and traceback"""
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key in set(vars(record)) - _RECORD_ATTRS:
+            payload[key] = getattr(record, key)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc_info'] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class QueuedStreamHandler(QueueHandler):
+    """
+    QueueHandler that owns its QueueListener and a stream handler writing to
+    stdout. The formatter set on this handler (e.g. by dictConfig) is used
+    by the listener thread.
+    """
+
+    def __init__(self, maxsize=10000, stream=None):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.dropped = 0
+        self._start_listener()
+        atexit.register(self._stop_listener)
+
+    def _start_listener(self):
+        self._pid = os.getpid()
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+
+    def _stop_listener(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        """
+        Merge args into the message and render the traceback here, since
+        args and exc_info may not survive the hand-off; extras are kept for
+        the JSON formatter.
+        """
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            # Forked (e.g. gunicorn --preload): the listener thread did not survive
+            self._start_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_log_levels(value):
+    """Parse 'bookings=DEBUG,notifications=WARNING' into {'bookings': 'DEBUG', ...}"""
+    levels = {}
+    for item in (value or '').split(','):
+        name, _, level = item.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
@@ -0,0 +1,267 @@
+"""
+Per-request instrumentation: query count, SQL time, serializer time and
+response size.
+
+MetricsMiddleware samples METRICS_SAMPLE_RATE of requests. For a sampled
+request it
+- counts queries and SQL time on every database alias,
+- adds a Server-Timing header (when METRICS_SERVER_TIMING is on),
+- records per-route histograms served by metrics_view in the Prometheus
+  text format.
+
+InstrumentedViewMixin adds the time DRF views spend in serializer.data.
+
+Histograms live in process memory, so each gunicorn worker reports its own
+series. Scrape every worker, or aggregate with a per-instance label.
+"""
+import random
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Counters collected while a sampled request is being handled"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed as a database execute_wrapper
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.sql_seconds += time.perf_counter() - start
+
+
+def current_metrics():
+    """Return the RequestMetrics of the current request, or None if not sampled"""
+    return _current.get()
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """Per-route histograms, keyed by (metric name, route, method)"""
+
+    METRICS = {
+        'http_request_duration_seconds': ('Request duration', DURATION_BUCKETS),
+        'http_request_db_queries': ('SQL queries per request', QUERY_COUNT_BUCKETS),
+        'http_request_db_seconds': ('SQL time per request', DURATION_BUCKETS),
+        'http_request_serializer_seconds': ('Serializer time per request', DURATION_BUCKETS),
+        'http_response_size_bytes': ('Response body size', SIZE_BUCKETS),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, route, method, values):
+        with self._lock:
+            for name, value in values.items():
+                key = (name, route, method)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(self.METRICS[name][1])
+                histogram.observe(value)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self):
+        """Render all histograms in the Prometheus text exposition format"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            lines = []
+            for name, (help_text, _) in self.METRICS.items():
+                series = [(key, h) for key, h in items if key[0] == name]
+                if not series:
+                    continue
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (_, route, method), histogram in series:
+                    labels = f'route="{_escape(route)}",method="{method}"'
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.total}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.total}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    if not match.route:
+        return match.view_name or 'unknown'
+    # Router URLs are regexes ending in $, e.g. api/vehicles/(?P<pk>[^/.]+)/$
+    return '/' + match.route.removesuffix('$')
+
+
+class MetricsMiddleware:
+    """
+    Record query count, SQL time, serializer time, duration and response
+    size for a sample of requests. Place it above CompressionMiddleware so
+    sizes are on-the-wire sizes.
+
+    Runs natively under ASGI too: unsampled requests pass straight through.
+    Sampled ones install the query counters on the thread that runs the
+    request's sync code (views, ORM), which costs two thread hops.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+        self.server_timing = getattr(settings, 'METRICS_SERVER_TIMING', False)
+
+    def sampled(self):
+        return self.sample_rate > 0 and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                _count_queries(stack, metrics)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.record(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                # Connections are per thread; sync views and the ORM run on
+                # the request's thread-sensitive executor thread
+                await sync_to_async(_count_queries)(stack, metrics)
+                try:
+                    response = await self.get_response(request)
+                finally:
+                    await sync_to_async(stack.close)()
+        finally:
+            _current.reset(token)
+        return self.record(request, response, metrics)
+
+    def record(self, request, response, metrics):
+        duration = time.perf_counter() - metrics.started
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(_route(request), request.method, {
+            'http_request_duration_seconds': duration,
+            'http_request_db_queries': metrics.query_count,
+            'http_request_db_seconds': metrics.sql_seconds,
+            'http_request_serializer_seconds': metrics.serializer_seconds,
+            'http_response_size_bytes': size,
+        })
+        if self.server_timing:
+            response.headers['Server-Timing'] = (
+                f'db;dur={metrics.sql_seconds * 1000:.1f};desc="{metrics.query_count} queries", '
+                f'serializer;dur={metrics.serializer_seconds * 1000:.1f}, '
+                f'total;dur={duration * 1000:.1f}'
+            )
+        return response
+
+
+def _count_queries(stack, metrics):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(metrics))
+
+
+class InstrumentedViewMixin:
+    """
+    DRF view mixin: time spent producing serializer.data, excluding SQL it
+    triggers (that is already counted as db time).
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        metrics = current_metrics()
+        if metrics is None:
+            return serializer
+
+        to_representation = serializer.to_representation
+
+        def timed_to_representation(instance):
+            start = time.perf_counter()
+            sql_before = metrics.sql_seconds
+            try:
+                return to_representation(instance)
+            finally:
+                elapsed = time.perf_counter() - start
+                metrics.serializer_seconds += elapsed - (metrics.sql_seconds - sql_before)
+
+        serializer.to_representation = timed_to_representation
+        return serializer
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Requires 'Authorization: Bearer <METRICS_TOKEN>'
+    or a staff session.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    authorized = (
+        (token and constant_time_compare(header, f'Bearer {token}'))
+        or (request.user.is_authenticated and request.user.is_staff)
+    )
+    if not authorized:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
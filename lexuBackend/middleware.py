@@ -0,0 +1,120 @@
+"""
+Project-wide middleware.
+"""
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_COMPRESSION_CONTENT_TYPES = [
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'text/javascript',
+    'image/svg+xml',
+]
+
+_accept_encoding_re = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*')
+
+
+def accepted_encodings(header):
+    """Return the set of content codings the client accepts (q > 0)"""
+    encodings = set()
+    for part in header.split(','):
+        match = _accept_encoding_re.fullmatch(part)
+        if not match:
+            continue
+        coding, quality = match.groups()
+        try:
+            if quality is not None and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        encodings.add(coding.lower())
+    return encodings
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with brotli or gzip.
+
+    - Only bodies of at least COMPRESSION_MIN_SIZE bytes whose content type
+      is listed in COMPRESSION_CONTENT_TYPES (default:
+      DEFAULT_COMPRESSION_CONTENT_TYPES) are compressed.
+    - Paths starting with an entry of COMPRESSION_EXEMPT_PATHS are never
+      compressed (token responses carry secrets).
+    - BREACH mitigation: responses to credentialed requests (Authorization
+      header, session or CSRF cookie) are gzip-only, with Django's random
+      gzip header padding ("Heal The Breach"), since brotli has no
+      equivalent. Anonymous responses may use brotli and are deterministic.
+
+    Place it above ConditionalGetMiddleware so ETags are computed on the
+    uncompressed body.
+    """
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.content_types = set(getattr(
+            settings, 'COMPRESSION_CONTENT_TYPES', DEFAULT_COMPRESSION_CONTENT_TYPES
+        ))
+        self.exempt_paths = tuple(getattr(settings, 'COMPRESSION_EXEMPT_PATHS', []))
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < self.min_size:
+            return response
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type not in self.content_types:
+            return response
+        if self.exempt_paths and request.path.startswith(self.exempt_paths):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encodings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        credentialed = self.is_credentialed(request)
+        if brotli is not None and 'br' in encodings and not credentialed:
+            compressed = brotli.compress(response.content, quality=self.brotli_quality)
+            encoding = 'br'
+        elif 'gzip' in encodings:
+            compressed = compress_string(
+                response.content,
+                max_random_bytes=self.max_random_bytes if credentialed else None,
+            )
+            encoding = 'gzip'
+        else:
+            return response
+
+        # Return the compressed content only if it's actually shorter.
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+
+        # The representation changed, so a strong ETag must become weak.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def is_credentialed(request):
+        return (
+            'HTTP_AUTHORIZATION' in request.META
+            or settings.SESSION_COOKIE_NAME in request.COOKIES
+            or settings.CSRF_COOKIE_NAME in request.COOKIES
+        )
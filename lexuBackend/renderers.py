@@ -0,0 +1,89 @@
+"""
+JSON renderer built on orjson.
+
+Produces byte-for-byte the same output as DRF's JSONRenderer for compact,
+unicode, strict responses (the project's configuration). Indented output
+(e.g. ?format=json with 'indent' in the Accept header) and anything
+orjson cannot encode fall back to the stdlib implementation.
+
+orjson writes float NaN and Infinity as null where strict JSON raises.
+Walking every payload for them would cost more than orjson saves, so only
+views that compute floats opt in by setting check_non_finite_floats; their
+data is checked and a non-finite value raises ValueError as before. Other
+views serialize model fields, which cannot hold NaN. Decimal('NaN') is
+always rejected (see orjson_default).
+"""
+import math
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+_default_encoder = encoders.JSONEncoder()
+
+ORJSON_OPTIONS = (
+    orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+)
+
+
+def _has_non_finite(data):
+    """True if a float NaN or Infinity appears anywhere in data's dicts, lists and tuples"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+def orjson_default(obj):
+    """Encode types orjson does not handle natively (Decimal, lazy strings, ...) the way DRF does"""
+    value = _default_encoder.default(obj)
+    if isinstance(value, float) and not math.isfinite(value):
+        # e.g. Decimal('NaN'); orjson would write null
+        raise ValueError('Out of range float values are not JSON compliant')
+    return value
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for rest_framework.renderers.JSONRenderer.
+    datetime/date/time/UUID are encoded natively by orjson; Decimal and
+    the other DRF extras go through the DRF encoder's default().
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=orjson_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        view = renderer_context.get('view')
+        if getattr(view, 'check_non_finite_floats', False) and _has_non_finite(data):
+            # Raises ValueError like the stdlib renderer
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same as JSONRenderer: escape U+2028/U+2029 so the output is a strict
+        # javascript subset.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
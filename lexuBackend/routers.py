@@ -0,0 +1,116 @@
+"""
+Database routing for read replicas.
+
+Reads go to a replica only inside replica_reads() (used by ReplicaReadMixin
+and the use_replica decorator), so everything else, including
+authentication and writes, keeps hitting the primary. A user who has just
+written something is pinned to the primary for REPLICA_PIN_SECONDS so they
+read their own writes despite replication lag.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import permissions
+
+PRIMARY_DB = 'default'
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class ReplicaRouter:
+    """Send reads to a random replica when replica reads are enabled for the current request"""
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if replicas and _use_replica.get():
+            return random.choice(replicas)
+        return PRIMARY_DB
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Every other alias is a copy of the primary
+        return db == PRIMARY_DB
+
+
+@contextmanager
+def replica_reads():
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def _pin_key(user):
+    return f'replica-pin:{user.pk}'
+
+
+def pin_to_primary(request):
+    """Read from the primary for the next REPLICA_PIN_SECONDS after a write by this user"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        cache.set(_pin_key(user), True, getattr(settings, 'REPLICA_PIN_SECONDS', 30))
+
+
+def is_pinned_to_primary(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return False
+    return bool(cache.get(_pin_key(user)))
+
+
+def can_read_from_replica(request):
+    return (
+        bool(replica_aliases())
+        and request.method in permissions.SAFE_METHODS
+        and not is_pinned_to_primary(request)
+    )
+
+
+class ReplicaReadMixin:
+    """
+    DRF view mixin: serve safe requests from a replica, and pin the user to
+    the primary after a successful write through the view.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if can_read_from_replica(request):
+            self._replica_token = _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _use_replica.reset(token)
+            self._replica_token = None
+        if request.method not in permissions.SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+def use_replica(view_func):
+    """
+    Decorator for @api_view functions (apply below @api_view so request.user
+    is available): run safe requests against a replica.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if can_read_from_replica(request):
+            with replica_reads():
+                return view_func(request, *args, **kwargs)
+        return view_func(request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,41 @@
+"""
+Shared serializer helpers for sparse fieldsets (?fields=a,b,c).
+"""
+
+
+def requested_fields(request):
+    """Return the set of field names requested with ?fields=, or None"""
+    if request is None or request.method != 'GET':
+        return None
+    value = request.query_params.get('fields')
+    if not value:
+        return None
+    fields = {name.strip() for name in value.split(',') if name.strip()}
+    return fields or None
+
+
+def only_requested(queryset, field_names):
+    """
+    Restrict a queryset to the concrete columns among field_names.
+    Unknown names (serializer-only fields) are ignored; the primary key
+    is always loaded.
+    """
+    opts = queryset.model._meta
+    concrete = {field.name for field in opts.concrete_fields}
+    columns = [name for name in field_names if name in concrete]
+    return queryset.only(opts.pk.name, *columns)
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin that drops every field not named in ?fields=.
+    Only applies to GET requests so write payloads are unaffected.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields is None:
+            return
+        for name in set(self.fields) - fields:
+            self.fields.pop(name)
@@ -57,9 +57,13 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'lexuBackend.metrics.MetricsMiddleware',
+    'lexuBackend.throttling.RateLimitHeadersMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'lexuBackend.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -68,6 +72,22 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'lexuBackend.urls'
 
+# Request instrumentation (lexuBackend.metrics)
+# Fraction of requests measured; the rest pay a single random() call
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '0.1'))
+# Add Server-Timing headers to sampled responses (exposes query counts)
+METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', str(DEBUG)).lower() in ('true', '1', 'yes')
+# Bearer token for the /metrics/ scrape endpoint (staff sessions also allowed)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Response compression (lexuBackend.middleware.CompressionMiddleware)
+# Compressed types: DEFAULT_COMPRESSION_CONTENT_TYPES in that module, or
+# set COMPRESSION_CONTENT_TYPES to replace them
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+# Token endpoints return secrets, never compress them
+COMPRESSION_EXEMPT_PATHS = ['/api/auth/login/', '/api/auth/token/']
+COMPRESSION_BROTLI_QUALITY = 5
+
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
@@ -96,6 +116,25 @@ WSGI_APPLICATION = 'lexuBackend.wsgi.application'
 
 # Use SQLite if PostgreSQL environment variables are not set (for local development)
 if os.environ.get('DB_HOST'):
+    DB_OPTIONS = {
+        'sslmode': os.environ.get('DB_SSLMODE', 'require'),
+    }
+    # DB_POOL=true uses psycopg's built-in pool (one pool per worker process,
+    # so the server sees up to workers x DB_POOL_MAX_SIZE connections).
+    # Otherwise connections persist for CONN_MAX_AGE seconds and are
+    # health-checked before reuse.
+    if os.environ.get('DB_POOL', 'False').lower() in ('true', '1', 'yes'):
+        DB_OPTIONS['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '1')),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '4')),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+            'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+            'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', '1800')),
+        }
+        DB_CONN_MAX_AGE = 0  # Django requires 0 when pooling
+    else:
+        DB_CONN_MAX_AGE = int(os.environ.get('CONN_MAX_AGE', '600'))
+
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.postgresql',
@@ -104,19 +143,79 @@ if os.environ.get('DB_HOST'):
             'PASSWORD': os.environ.get('DB_PASSWORD'),
             'HOST': os.environ.get('DB_HOST'),
             'PORT': os.environ.get('DB_PORT', '5432'),
-            'OPTIONS': {
-                'sslmode': os.environ.get('DB_SSLMODE', 'require'),
-            },
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': DB_OPTIONS,
         }
     }
+    # Read replicas: same credentials as the primary, comma-separated hosts
+    for index, host in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), start=1):
+        DATABASES[f'replica_{index}'] = {
+            **DATABASES['default'],
+            'HOST': host.strip(),
+            'OPTIONS': dict(DB_OPTIONS),
+            'TEST': {'MIRROR': 'default'},
+        }
 else:
     # Fallback to SQLite for local development
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+        },
+        # Second alias on the same file, mirrored in tests. Not routed to
+        # unless listed in DATABASE_REPLICAS (the replica routing tests do).
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'TEST': {'MIRROR': 'default'},
+        },
+    }
+
+# Aliases that safe reads from ReplicaReadMixin / use_replica views may use
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+DATABASE_ROUTERS = ['lexuBackend.routers.ReplicaRouter']
+# Seconds a user reads from the primary after a write (read-your-writes)
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', '30'))
+
+# Cache
+# Shared Redis cache when REDIS_URL is set (replica pins, throttle buckets),
+# otherwise per-process local memory
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
         }
     }
+    THROTTLE_BUCKET_STORE = 'lexuBackend.throttling.CacheBucketStore'
+else:
+    THROTTLE_BUCKET_STORE = 'lexuBackend.throttling.LocalBucketStore'
+
+
+# Password hashing
+# The first hasher hashes new passwords; older hashes are upgraded to it on
+# the next successful login. Argon2id needs argon2-cffi; without it scrypt
+# is preferred. Costs are the OWASP minimums (see users/hashers.py).
+try:
+    import argon2  # noqa: F401
+except ImportError:
+    argon2 = None
+
+PASSWORD_HASHERS = [
+    'users.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+if argon2 is not None:
+    PASSWORD_HASHERS.insert(0, 'users.hashers.Argon2PasswordHasher')
+
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', '2'))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('PASSWORD_ARGON2_MEMORY_COST', '19456'))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('PASSWORD_ARGON2_PARALLELISM', '1'))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ.get('PASSWORD_SCRYPT_WORK_FACTOR', str(2 ** 17)))
+# Threads for login/register (users/hashing.py); half the cores by default
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', str(max(1, (os.cpu_count() or 2) // 2))))
 
 
 # Password validation
@@ -168,6 +267,35 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # orjson-backed drop-ins for the default JSON renderer/parser (same wire format)
+    'DEFAULT_RENDERER_CLASSES': [
+        'lexuBackend.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'lexuBackend.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Token buckets (lexuBackend.throttling): '<n>/<period>' allows bursts of n
+    # and a sustained n per period. Views opt into a scope with throttle_scope.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'lexuBackend.throttling.UserTokenBucketThrottle',
+        'lexuBackend.throttling.ScopedIPTokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'user': os.environ.get('THROTTLE_USER_RATE', '600/min'),
+        'anon': os.environ.get('THROTTLE_ANON_RATE', '120/min'),
+        'availability': os.environ.get('THROTTLE_AVAILABILITY_RATE', '30/min'),
+        'login': os.environ.get('THROTTLE_LOGIN_RATE', '10/min'),
+        'register': os.environ.get('THROTTLE_REGISTER_RATE', '5/min'),
+    },
+    # Proxies in front of the app (Render's load balancer); the client IP is
+    # taken from X-Forwarded-For this many hops from the right. 0 uses
+    # REMOTE_ADDR: X-Forwarded-For is client-controlled unless a proxy sets
+    # it, so trusting it by default would let clients pick their own bucket.
+    # Set NUM_PROXIES=1 behind Render's load balancer.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '0')),
 }
 
 # JWT Settings
@@ -194,6 +322,9 @@ CORS_ALLOWED_ORIGIN_REGEXES = [
     r"^https://.*\.vercel\.app$",
 ]
 
+# Let the frontend read rate limit headers
+CORS_EXPOSE_HEADERS = ['Retry-After', 'RateLimit-Limit', 'RateLimit-Remaining', 'RateLimit-Reset']
+
 # Allow credentials for CORS
 CORS_ALLOW_CREDENTIALS = True
 
@@ -204,9 +335,6 @@ CORS_ALLOW_ALL_ORIGINS = False
 # IMPORTANT: This must match the Single Sender Identity you verified in SendGrid
 DEFAULT_FROM_EMAIL = 'shambachsikuku@gmail.com'
 
-# In-App Notification - Email of admin user in database (for bell icon notifications)
-INAPP_ADMIN_EMAIL = 'shamadmin@gmail.com'
-
 # Email Notification - Email address to receive actual email notifications
 ADMIN_EMAIL = 'shamsikush@gmail.com'
 
@@ -220,6 +348,26 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # Logs to cons
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Read notifications older than this move to NotificationArchive
+# (manage.py archive_notifications, run daily)
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', '90'))
+
+# A vehicle whose next booking starts within this many hours shows as
+# "reserved soon" (fleet/status.py; manage.py refresh_vehicle_status sweeps)
+VEHICLE_RESERVED_SOON_HOURS = int(os.environ.get('VEHICLE_RESERVED_SOON_HOURS', '48'))
+
+# Demand-based pricing (fleet/pricing.py). PRICING_TIERS maps the share of a
+# category's vehicles booked on the busiest day of a rental to a price
+# multiplier; the first tier reached applies. manage.py
+# refresh_category_occupancy rebuilds the occupancy cache (run nightly).
+DYNAMIC_PRICING_ENABLED = os.environ.get('DYNAMIC_PRICING_ENABLED', 'False').lower() in ('true', '1', 'yes')
+PRICING_HORIZON_DAYS = int(os.environ.get('PRICING_HORIZON_DAYS', '365'))
+PRICING_TIERS = [
+    (0.9, '1.50'),
+    (0.75, '1.25'),
+    (0.5, '1.10'),
+]
+
 # Frontend URL for notifications
 FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://localhost:5173")
 
@@ -229,17 +377,37 @@ FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://localhost:5173")
 # TWILIO_PHONE_NUMBER = '+1234567890'
 # ADMIN_PHONE = '+1234567890'
 
+# Structured JSON logging (lexuBackend.log). Records are queued and written
+# by a background thread so request threads never block on stdout.
+# LOG_LEVEL sets the default; LOG_LEVELS overrides per logger,
+# e.g. LOG_LEVELS="bookings=DEBUG,notifications=WARNING".
+from lexuBackend.log import parse_log_levels  # noqa: E402
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'lexuBackend.log.JsonFormatter',
+        },
+    },
+    'filters': {
+        'redact': {
+            '()': 'lexuBackend.log.RedactingFilter',
+        },
+    },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
+            'class': 'lexuBackend.log.QueuedStreamHandler',
+            'formatter': 'json',
+            'filters': ['redact'],
         },
     },
     'root': {
         'handlers': ['console'],
-        'level': 'INFO',
+        'level': LOG_LEVEL,
     },
     'loggers': {
         'django.request': {
@@ -247,5 +415,9 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': False,
         },
+        **{
+            name: {'level': level}
+            for name, level in parse_log_levels(os.environ.get('LOG_LEVELS')).items()
+        },
     },
 }
@@ -0,0 +1,572 @@
+"""
+Tests for the project-wide API plumbing.
+
+QueryCountTests is a query-count regression harness.
+
+Every URL in lexuBackend/urls.py is requested (GET, as a customer and as
+staff) against seeded data at two sizes. The number of queries must not
+depend on the number of rows, and must not grow past the counts checked
+in to query_counts.json. Only reads are covered: routes that answer GET
+with 405 (login, register, token refresh, batch booking, mark-read), and
+routes a role is refused (401/403, e.g. /metrics/ for customers), are
+left out of the snapshot rather than recorded as the cost of a rejection.
+
+After an intentional change, regenerate the snapshot with
+    UPDATE_QUERY_SNAPSHOTS=1 python manage.py test lexuBackend
+and commit the updated query_counts.json.
+"""
+import gzip
+import json
+import logging
+import os
+import re
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse, QueryDict
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from bookings.models import Booking
+from bookings.references import next_references
+from bookings.serializers import BookingListSerializer, BookingSerializer
+from fleet.models import Location, Vehicle, VehicleImage
+from lexuBackend.log import JsonFormatter, QueuedStreamHandler, RedactingFilter
+from lexuBackend.metrics import MetricsMiddleware, registry
+from lexuBackend.middleware import CompressionMiddleware
+from lexuBackend.renderers import ORJSONRenderer
+from lexuBackend.serializers import only_requested, requested_fields
+from lexuBackend.throttling import LocalBucketStore, TokenBucketThrottle, get_bucket_store
+from notifications.models import Notification
+from users.models import User
+
+SNAPSHOT = Path(__file__).with_name('query_counts.json')
+SMALL, LARGE = 2, 12
+ROLES = ('customer', 'staff')
+
+# Not part of the API
+SKIPPED_PREFIXES = ('admin/', 'media/', 'static/')
+
+# Query strings without which an endpoint returns early; callables get the test case
+QUERY_PARAMS = {
+    'vehicle-availability': {'pickup_date': '2030-01-01T10:00:00Z', 'return_date': '2030-01-05T10:00:00Z'},
+    'vehicle-quote': {'pickup_date': '2030-01-01T10:00:00Z', 'return_date': '2030-01-05T10:00:00Z'},
+    'vehicle-available': lambda test: {
+        'location': f'{test.locations[0].id},{test.locations[1].id}', 'return_location': test.locations[0].id,
+        'pickup_date': '2030-01-01T10:00:00Z', 'return_date': '2030-01-05T10:00:00Z',
+    },
+}
+
+
+def url_patterns(patterns=None, prefix=''):
+    """Yield (template, name) for every URL, e.g. ('api/bookings/{pk}/', 'booking-detail')"""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from url_patterns(pattern.url_patterns, route)
+            continue
+        # Format suffix variants (.json) serve the same view
+        if '<format>' in route or ':format>' in route:
+            continue
+        template = re.sub(r'\(\?P<(\w+)>[^)]*\)|<(?:\w+:)?(\w+)>', lambda m: '{%s}' % (m[1] or m[2]), route)
+        template = template.replace('^', '').replace('$', '')
+        if not template.startswith(SKIPPED_PREFIXES):
+            yield template, pattern.name
+
+
+# Measure the costlier quote path
+@override_settings(DYNAMIC_PRICING_ENABLED=True)
+class QueryCountTests(TestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(email='customer@example.com', password=None)
+        self.staff = User.objects.create_user(email='staff@example.com', password=None, is_staff=True)
+        self.locations = Location.objects.bulk_create([Location(name='Nairobi CBD'), Location(name='JKIA')])
+        self.populate(SMALL)
+
+    def populate(self, rows):
+        """Add rows vehicles, customers, bookings and notifications"""
+        start = User.objects.count()
+        users = User.objects.bulk_create([
+            User(email=f'seeded{start + i}@example.com', password='!') for i in range(rows)
+        ])
+        vehicles = Vehicle.objects.bulk_create([
+            Vehicle(make='Toyota', model=f'Prado {i}', year=2022, category='SUV', price_per_day=Decimal('120.00'),
+                    current_location=self.locations[i % 2])
+            for i in range(rows)
+        ])
+        VehicleImage.objects.bulk_create([
+            VehicleImage(vehicle=vehicle, url=f'https://cdn.example.com/{vehicle.id}/{n}.jpg', position=n)
+            for vehicle in vehicles
+            for n in range(3)
+        ])
+        pickup = timezone.now() + timedelta(days=30)
+        owners = [self.customer, self.staff] + users
+        bookings = [
+            Booking(
+                user=owners[i % len(owners)], vehicle_id=vehicles[i % len(vehicles)].id,
+                pickup_date=pickup + timedelta(days=3 * i), return_date=pickup + timedelta(days=3 * i + 2),
+                pickup_location='Nairobi', return_location='JKIA', driver_name='Driver',
+                pickup_branch=self.locations[0], return_branch=self.locations[1],
+                driver_email='driver@example.com', driver_phone='0700000000', license_number='DL-1',
+                base_price=Decimal('240.00'), total_price=Decimal('240.00'), booking_reference=reference,
+            )
+            for i, reference in enumerate(next_references(rows * 2))
+        ]
+        Booking.objects.bulk_create(bookings)
+        Notification.objects.bulk_create([
+            Notification(user=user, title='Booking', message='Confirmed', notification_type='BOOKING_CONFIRMED')
+            for user in (self.customer, self.staff)
+            for _ in range(rows)
+        ])
+
+    def path_for(self, template):
+        """Fill in a URL template with ids of seeded rows"""
+        objects = {
+            'vehicle_id': Vehicle.objects.order_by('id').first(),
+            'notification_id': Notification.objects.filter(user=self.customer).order_by('id').first(),
+        }
+        if '{pk}' in template:
+            model = {
+                'api/vehicles/': Vehicle, 'api/bookings/': Booking, 'api/auth/users/': User, 'api/locations/': Location,
+            }
+            prefix = next((p for p in model if template.startswith(p)), None)
+            self.assertIsNotNone(prefix, f'No fixture for {{pk}} in {template}; add one to QueryCountTests.path_for')
+            queryset = model[prefix].objects.order_by('id')
+            if model[prefix] is User:
+                queryset = queryset.filter(is_staff=False)
+            elif model[prefix] is Booking:
+                queryset = queryset.filter(user=self.customer)
+            objects['pk'] = queryset.first()
+        try:
+            return '/' + template.format(**{name: obj.pk for name, obj in objects.items() if obj})
+        except KeyError as missing:
+            self.fail(f'No fixture for {missing} in {template}; add one to QueryCountTests.path_for')
+
+    def measure(self):
+        """Return {'GET <template> as <role>': queries} for every URL and role"""
+        counts = {}
+        for role in ROLES:
+            client = APIClient()
+            # A session for plain Django views such as /metrics/, a forced user for DRF
+            client.force_login(getattr(self, role))
+            client.force_authenticate(getattr(self, role))
+            for template, name in url_patterns():
+                path = self.path_for(template)
+                # Start every request cold: no cached responses, full throttle buckets
+                cache.clear()
+                get_bucket_store().clear()
+                with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+                    params = QUERY_PARAMS.get(name)
+                    response = client.get(path, params(self) if callable(params) else params)
+                self.assertLess(response.status_code, 500, f'GET {path} as {role}')
+                if response.status_code in (401, 403, 405):
+                    # Write-only route, or one this role may not read: the
+                    # queries of a rejection say nothing about the response
+                    continue
+                counts[f'GET /{template} as {role}'] = len(queries)
+        return counts
+
+    def test_query_counts(self):
+        small = self.measure()
+        self.populate(LARGE - SMALL)
+        large = self.measure()
+
+        growing = {key: (small[key], large[key]) for key in small if small[key] != large[key]}
+        if growing:
+            self.fail('Query count depends on row count (N+1?):\n  ' + '\n  '.join(
+                f'{key}: {a} with {SMALL} rows, {b} with {LARGE}' for key, (a, b) in sorted(growing.items())
+            ))
+
+        if os.environ.get('UPDATE_QUERY_SNAPSHOTS'):
+            SNAPSHOT.write_text(json.dumps(dict(sorted(large.items())), indent=2) + '\n')
+            return
+        snapshot = json.loads(SNAPSHOT.read_text()) if SNAPSHOT.exists() else {}
+        grown = [
+            f'{key}: {count} queries (snapshot {snapshot.get(key, "missing")})'
+            for key, count in sorted(large.items())
+            if count > snapshot.get(key, -1)
+        ]
+        if grown:
+            self.fail('Query counts grew; fix the regression or run with UPDATE_QUERY_SNAPSHOTS=1:\n  '
+                      + '\n  '.join(grown))
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'availability': '2/min'},
+})
+class ThrottlingTests(TestCase):
+    """Token buckets reject with 429 and report their state in headers"""
+
+    def setUp(self):
+        cache.clear()
+        get_bucket_store().clear()
+        vehicle = Vehicle.objects.create(make='Porsche', model='911', year=2023, category='Sports', price_per_day='500.00')
+        self.path = f'/api/vehicles/{vehicle.id}/availability/'
+        self.params = {'pickup_date': '2030-01-01T10:00:00Z', 'return_date': '2030-01-05T10:00:00Z'}
+        self.client = APIClient()
+        self.now = 1_000_000.0
+        timer = mock.patch.object(TokenBucketThrottle, 'timer', mock.Mock(side_effect=lambda: self.now))
+        timer.start()
+        self.addCleanup(timer.stop)
+
+    def get(self, **headers):
+        return self.client.get(self.path, self.params, headers=headers)
+
+    def test_bucket_empties_then_refills(self):
+        first, second, third = self.get(), self.get(), self.get()
+        self.assertEqual([first.status_code, second.status_code, third.status_code], [200, 200, 429])
+        self.assertEqual(third['Retry-After'], '30')
+        self.now += 30
+        self.assertEqual(self.get().status_code, 200)
+
+    def test_ratelimit_headers(self):
+        response = self.get()
+        # The scoped bucket (2/min) is more restrictive than the anon one
+        self.assertEqual(response['RateLimit-Limit'], '2')
+        self.assertEqual(response['RateLimit-Remaining'], '1')
+        self.assertEqual(response['RateLimit-Reset'], '30')
+        self.get()
+        response = self.get()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['RateLimit-Remaining'], '0')
+        self.assertEqual(response['RateLimit-Reset'], '60')
+
+    async def test_ratelimit_headers_under_asgi(self):
+        response = await self.async_client.get(self.path, self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['RateLimit-Limit'], '2')
+        self.assertEqual(response['RateLimit-Remaining'], '1')
+
+    def test_forwarded_for_does_not_pick_the_bucket(self):
+        statuses = [self.get(x_forwarded_for=f'203.0.113.{n}').status_code for n in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_local_store_refill(self):
+        store = LocalBucketStore()
+        self.assertEqual(store.consume('k', 2, 1.0, 0.0), (True, 1.0))
+        self.assertEqual(store.consume('k', 2, 1.0, 0.0), (True, 0.0))
+        self.assertEqual(store.consume('k', 2, 1.0, 0.5), (False, 0.5))
+        self.assertEqual(store.consume('k', 2, 1.0, 1.0), (True, 0.0))
+        # Refill stops at capacity
+        self.assertEqual(store.consume('k', 2, 1.0, 100.0), (True, 1.0))
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """ORJSONRenderer matches DRF's JSONRenderer byte for byte, errors included"""
+
+    def assertSameRendering(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_matches_json_renderer(self):
+        self.assertSameRendering({
+            'decimal': Decimal('1234.50'),
+            'aware': datetime(2030, 1, 1, 10, 0, 0, 123456, tzinfo=dt_timezone.utc),
+            'offset': datetime(2030, 1, 1, 10, tzinfo=dt_timezone(timedelta(hours=3))),
+            'naive': datetime(2030, 1, 1, 10, 0, 0, 5),
+            'date': date(2030, 1, 1),
+            'time': time(10, 30, 0, 250000),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'text': 'Café \u2028 ✓',
+            'nested': [{'n': 1, 'f': 0.1, 'none': None, 'yes': True}],
+        })
+
+    def test_non_str_keys(self):
+        self.assertSameRendering({1: 'int', 2.5: 'float', False: 'bool', None: 'none'})
+
+    def test_non_finite_floats_raise(self):
+        context = {'view': SimpleNamespace(check_non_finite_floats=True)}
+        for value in (float('nan'), float('inf'), [1.0, -float('inf')], {'rate': Decimal('NaN')}):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                ORJSONRenderer().render({'value': value}, renderer_context=context)
+
+    def test_non_finite_floats_unchecked(self):
+        # Views that do not opt in skip the walk; orjson writes null
+        self.assertEqual(ORJSONRenderer().render({'value': float('nan')}), b'{"value":null}')
+        with self.assertRaises(ValueError):
+            ORJSONRenderer().render({'rate': Decimal('NaN')})
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Content negotiation, size and type limits, and the BREACH mitigations"""
+    body = json.dumps([{'make': 'Porsche', 'model': '911', 'category': 'Sports'}] * 100).encode()
+
+    def respond(self, path='/api/vehicles/', body=None, content_type='application/json', **headers):
+        response = HttpResponse(self.body if body is None else body, content_type=content_type)
+        response['ETag'] = '"v1"'
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(RequestFactory().get(path, headers=headers))
+
+    def test_negotiates_encoding(self):
+        self.assertEqual(self.respond(accept_encoding='gzip, deflate, br')['Content-Encoding'], 'br')
+        response = self.respond(accept_encoding='br;q=0, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"v1"')
+        response = self.respond(accept_encoding='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_credentialed_requests_get_padded_gzip(self):
+        response = self.respond(accept_encoding='br, gzip', authorization='Bearer token')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        # Random header padding: the same body compresses differently
+        sizes = {len(self.respond(accept_encoding='gzip', authorization='Bearer token').content) for _ in range(10)}
+        self.assertGreater(len(sizes), 1)
+
+    def test_small_and_unlisted_responses_are_left_alone(self):
+        small = self.respond(body=b'{"ok": true}', accept_encoding='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertFalse(small.has_header('Vary'))
+        image = self.respond(content_type='image/png', accept_encoding='gzip')
+        self.assertFalse(image.has_header('Content-Encoding'))
+
+    def test_token_endpoints_are_exempt(self):
+        for path in ('/api/auth/login/', '/api/auth/token/refresh/'):
+            with self.subTest(path=path):
+                response = self.respond(path=path, accept_encoding='gzip, br')
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response.content, self.body)
+
+
+class SparseFieldsTests(TestCase):
+    """?fields= trims the representation and the SELECT"""
+
+    def setUp(self):
+        self.vehicle = Vehicle.objects.create(
+            make='Porsche', model='911', year=2023, category='Sports', price_per_day='500.00', engine='Flat-6'
+        )
+        self.client = APIClient()
+
+    def vehicle_select(self, path, params):
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        select = next(q['sql'] for q in queries if q['sql'].startswith('SELECT') and 'FROM "fleet_vehicle"' in q['sql']
+                      and 'COUNT(' not in q['sql'])
+        return response, select
+
+    def test_list_returns_and_selects_requested_fields(self):
+        response, select = self.vehicle_select('/api/vehicles/', {'fields': 'id, make,price_per_day'})
+        self.assertEqual(response.data['results'], [{'id': self.vehicle.id, 'make': 'Porsche', 'price_per_day': '500.00'}])
+        self.assertIn('"make"', select)
+        self.assertNotIn('"engine"', select)
+        self.assertNotIn('"image"', select)
+
+    def test_unknown_fields_are_ignored(self):
+        response, select = self.vehicle_select(f'/api/vehicles/{self.vehicle.id}/', {'fields': 'make,password,__class__'})
+        self.assertEqual(response.data, {'make': 'Porsche'})
+        self.assertNotIn('"engine"', select)
+
+    def test_booking_list_is_full_unless_narrowed(self):
+        user = User.objects.create_user(email='customer@example.com', password=None)
+        Booking.objects.create(
+            user=user, vehicle_id=self.vehicle.id, pickup_date=timezone.now(), return_date=timezone.now(),
+            pickup_location='Nairobi', return_location='Nairobi', driver_name='Driver', driver_email='d@example.com',
+            driver_phone='0700000000', license_number='DL-1', base_price='100.00', total_price='100.00',
+        )
+        self.client.force_authenticate(user)
+
+        def keys(params=None):
+            response = self.client.get('/api/bookings/', params)
+            self.assertEqual(response.status_code, 200)
+            return set(response.data[0])
+
+        self.assertEqual(keys(), set(BookingSerializer().fields))
+        self.assertEqual(keys({'summary': 'true'}), set(BookingListSerializer.Meta.fields))
+        self.assertEqual(keys({'fields': 'id,status', 'summary': 'true'}), {'id', 'status'})
+
+    def test_helpers(self):
+        factory = RequestFactory()
+        self.assertIsNone(requested_fields(None))
+        self.assertIsNone(requested_fields(Request(factory.get('/api/vehicles/'))))
+        post = Request(factory.post('/api/vehicles/?fields=make'))
+        self.assertIsNone(requested_fields(post))
+        self.assertEqual(requested_fields(Request(factory.get('/api/vehicles/', {'fields': 'make, ,model'}))),
+                         {'make', 'model'})
+        self.assertIsNone(requested_fields(Request(factory.get('/api/vehicles/', {'fields': ' , '}))))
+
+        queryset = only_requested(Vehicle.objects.all(), {'make', 'gallery', 'availability'})
+        self.assertEqual(queryset.query.deferred_loading, ({'id', 'make'}, False))
+
+
+class MetricsTests(TestCase):
+    """Sampling, per-request counters, Server-Timing and the /metrics/ scrape endpoint"""
+
+    def setUp(self):
+        cache.clear()
+        get_bucket_store().clear()
+        registry.clear()
+        self.addCleanup(registry.clear)
+        self.staff = User.objects.create_user(email='staff@example.com', password=None, is_staff=True)
+
+    def call_middleware(self):
+        """Run a two-query request through a freshly configured MetricsMiddleware"""
+        def view(request):
+            User.objects.count()
+            User.objects.exists()
+            return HttpResponse(b'x' * 10)
+
+        return MetricsMiddleware(view)(RequestFactory().get('/'))
+
+    def histogram(self, name, route='unmatched'):
+        return registry._histograms.get((name, route, 'GET'))
+
+    @override_settings(METRICS_SAMPLE_RATE=0, METRICS_SERVER_TIMING=True)
+    def test_rate_zero_samples_nothing(self):
+        response = self.call_middleware()
+        self.assertEqual(registry.render(), '\n')
+        self.assertNotIn('Server-Timing', response.headers)
+
+    @override_settings(METRICS_SAMPLE_RATE=1, METRICS_SERVER_TIMING=False)
+    def test_rate_one_records_queries_and_sql_time(self):
+        response = self.call_middleware()
+        self.assertEqual(self.histogram('http_request_db_queries').sum, 2)
+        self.assertGreater(self.histogram('http_request_db_seconds').sum, 0)
+        self.assertEqual(self.histogram('http_response_size_bytes').sum, 10)
+        self.assertEqual(self.histogram('http_request_duration_seconds').total, 1)
+        self.assertNotIn('Server-Timing', response.headers)
+
+    @override_settings(METRICS_SAMPLE_RATE=1, METRICS_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.call_middleware()
+        self.assertRegex(
+            response.headers['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="2 queries", serializer;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+
+    @override_settings(METRICS_SAMPLE_RATE=1, METRICS_SERVER_TIMING=True)
+    async def test_async_middleware(self):
+        async def view(request):
+            await User.objects.acount()
+            await sync_to_async(User.objects.exists)()
+            return HttpResponse(b'x' * 10)
+
+        middleware = MetricsMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get('/'))
+        self.assertEqual(self.histogram('http_request_db_queries').sum, 2)
+        self.assertIn('desc="2 queries"', response.headers['Server-Timing'])
+
+    @override_settings(METRICS_SAMPLE_RATE=1)
+    def test_serializer_time(self):
+        Vehicle.objects.create(make='Porsche', model='911', year=2023, category='Sports', price_per_day='500.00')
+        # New client: middleware reads its settings when the handler loads
+        self.assertEqual(APIClient().get('/api/vehicles/').status_code, 200)
+        histogram = self.histogram('http_request_serializer_seconds', '/api/vehicles/')
+        self.assertEqual(histogram.total, 1)
+        self.assertGreater(histogram.sum, 0)
+
+    @override_settings(METRICS_SAMPLE_RATE=0, METRICS_TOKEN='scrape-token')
+    def test_metrics_view_auth(self):
+        registry.observe('/api/vehicles/', 'GET', {'http_request_db_queries': 3})
+        client = APIClient()
+        self.assertEqual(client.get('/metrics/').status_code, 403)
+        self.assertEqual(client.get('/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        customer = User.objects.create_user(email='customer@example.com', password=None)
+        client.force_login(customer)
+        self.assertEqual(client.get('/metrics/').status_code, 403)
+
+        client.force_login(self.staff)
+        self.assertEqual(client.get('/metrics/').status_code, 200)
+        response = APIClient().get('/metrics/', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        labels = 'route="/api/vehicles/",method="GET"'
+        self.assertEqual(response.content.decode().splitlines(), [
+            '# HELP http_request_db_queries SQL queries per request',
+            '# TYPE http_request_db_queries histogram',
+            *(f'http_request_db_queries_bucket{{{labels},le="{bound}"}} {int(bound >= 3)}'
+              for bound in (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)),
+            f'http_request_db_queries_bucket{{{labels},le="+Inf"}} 1',
+            f'http_request_db_queries_sum{{{labels}}} 3.0',
+            f'http_request_db_queries_count{{{labels}}} 1',
+        ])
+
+
+class LoggingTests(SimpleTestCase):
+    """PII is redacted before records are queued; the listener writes one JSON object per line"""
+
+    def setUp(self):
+        self.stream = StringIO()
+        self.handler = QueuedStreamHandler(stream=self.stream)
+        self.handler.setFormatter(JsonFormatter())
+        self.handler.addFilter(RedactingFilter())
+        self.logger = logging.getLogger('lexuBackend.tests.logging')
+        self.logger.propagate = False
+        self.logger.addHandler(self.handler)
+        self.addCleanup(self.logger.removeHandler, self.handler)
+        self.addCleanup(self.handler._stop_listener)
+
+    def records(self):
+        """Stop the listener, which flushes the queue, and parse what reached the stream"""
+        self.handler._stop_listener()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_redacts_query_dicts_and_extras(self):
+        params = QueryDict('email=jane@example.com&password=hunter2&page=2')
+        self.logger.info('Login attempt %s', params, extra={
+            'token': 'abc', 'payload': {'Password': 'x', 'items': [{'refresh': 'r', 'id': 1}]}, 'path': '/api/',
+        })
+        [record] = self.records()
+        self.assertEqual(
+            record['message'], "Login attempt {'email': '[REDACTED]', 'password': '[REDACTED]', 'page': '2'}",
+        )
+        self.assertEqual(record['token'], '[REDACTED]')
+        self.assertEqual(record['payload'], {'Password': '[REDACTED]', 'items': [{'refresh': '[REDACTED]', 'id': 1}]})
+        self.assertEqual(record['path'], '/api/')
+
+    def test_redacts_emails_in_messages(self):
+        self.logger.warning('No user %s for booking %d', 'jane.doe+trip@example.co.ke', 5)
+        self.logger.warning('Bounce from ops@example.com')
+        self.logger.warning('Lookup %(who)s', {'who': 'jane@example.com', 'email': 'x'})
+        self.assertEqual([record['message'] for record in self.records()], [
+            'No user [REDACTED] for booking 5', 'Bounce from [REDACTED]', 'Lookup [REDACTED]',
+        ])
+
+    def test_record_shape_with_exc_info(self):
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            self.logger.exception('Charge failed', extra={'booking_id': 7})
+        [record] = self.records()
+        self.assertEqual(set(record), {'time', 'level', 'logger', 'message', 'booking_id', 'exc_info'})
+        self.assertRegex(record['time'], r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}$')
+        self.assertEqual(record['level'], 'ERROR')
+        self.assertEqual(record['logger'], 'lexuBackend.tests.logging')
+        self.assertEqual(record['message'], 'Charge failed')
+        self.assertEqual(record['booking_id'], 7)
+        self.assertTrue(record['exc_info'].startswith('Traceback'))
+        self.assertTrue(record['exc_info'].endswith('ValueError: boom'))
+
+    def test_queued_records_reach_the_stream_in_order(self):
+        for n in range(50):
+            self.logger.info('Record %d', n)
+        self.assertEqual([record['message'] for record in self.records()], [f'Record {n}' for n in range(50)])
+
+    def test_full_queue_drops_records(self):
+        handler = QueuedStreamHandler(maxsize=1, stream=StringIO())
+        handler._stop_listener()
+        for n in range(3):
+            handler.handle(logging.makeLogRecord({'msg': f'Record {n}'}))
+        self.assertEqual(handler.queue.qsize(), 1)
+        self.assertEqual(handler.dropped, 2)
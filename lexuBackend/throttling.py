@@ -0,0 +1,223 @@
+"""
+Token-bucket throttling for DRF.
+
+Each (scope, identity) pair owns a bucket of `capacity` tokens refilled
+continuously at capacity/period tokens per second; a request takes one
+token. Rates use DRF's syntax in DEFAULT_THROTTLE_RATES, e.g. '30/min'
+means bursts of up to 30 requests and a sustained 30 requests per minute.
+
+Bucket state lives in the store named by THROTTLE_BUCKET_STORE:
+- LocalBucketStore: process memory (tests, single-process development)
+- CacheBucketStore: the default Django cache; atomic on Redis through a
+  Lua script, best-effort on other backends
+
+Either way a check is a single O(1) read-modify-write.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DEFAULT_BUCKET_STORE = 'lexuBackend.throttling.LocalBucketStore'
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Parse '30/min' into (capacity, refill tokens per second)"""
+    if rate is None:
+        return None, None
+    num, period = rate.split('/')
+    capacity = int(num)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def take_token(tokens, updated, capacity, refill_rate, now):
+    """Refill a bucket up to now and try to take one token; returns (allowed, tokens)"""
+    tokens = min(capacity, tokens + max(0.0, now - updated) * refill_rate)
+    if tokens >= 1:
+        return True, tokens - 1
+    return False, tokens
+
+
+class LocalBucketStore:
+    """In-process buckets with LRU eviction, guarded by a lock"""
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate, now):
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            allowed, tokens = take_token(tokens, updated, capacity, refill_rate, now)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+# KEYS[1] = bucket key; ARGV = capacity, refill rate, now, ttl
+REDIS_TOKEN_BUCKET = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+return {allowed, tostring(tokens)}
+"""
+
+
+class CacheBucketStore:
+    """
+    Buckets in the default cache, shared by all workers.
+    With django.core.cache.backends.redis.RedisCache the update runs as one
+    Lua script, so concurrent requests can't both take the last token.
+    """
+
+    def __init__(self):
+        self._script = None
+        client_factory = getattr(getattr(cache, '_cache', None), 'get_client', None)
+        if client_factory is not None:
+            self._script = client_factory(write=True).register_script(REDIS_TOKEN_BUCKET)
+
+    def consume(self, key, capacity, refill_rate, now):
+        ttl = math.ceil(capacity / refill_rate) + 1
+        if self._script is not None:
+            allowed, tokens = self._script(
+                keys=[cache.make_and_validate_key(key)],
+                args=[capacity, refill_rate, now, ttl],
+            )
+            return bool(allowed), float(tokens)
+
+        tokens, updated = cache.get(key, (capacity, now))
+        allowed, tokens = take_token(tokens, updated, capacity, refill_rate, now)
+        cache.set(key, (tokens, now), ttl)
+        return allowed, tokens
+
+
+@lru_cache(maxsize=None)
+def get_bucket_store(path=None):
+    return import_string(path or getattr(settings, 'THROTTLE_BUCKET_STORE', DEFAULT_BUCKET_STORE))()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base token-bucket throttle. Subclasses choose the scope and identity in
+    get_scope()/get_ident_key(); returning None skips throttling.
+    """
+    timer = time.time
+
+    def get_scope(self, request, view):
+        raise NotImplementedError('.get_scope() must be overridden')
+
+    def get_ident_key(self, request, view):
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        scope = self.get_scope(request, view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope) if scope else None
+        ident = self.get_ident_key(request, view) if rate else None
+        if ident is None:
+            return True
+
+        capacity, refill_rate = parse_rate(rate)
+        allowed, tokens = get_bucket_store().consume(
+            f'throttle:{scope}:{ident}', capacity, refill_rate, self.timer()
+        )
+        if not allowed:
+            self.retry_after = (1 - tokens) / refill_rate
+        self._record_headers(request, capacity, tokens, refill_rate)
+        return allowed
+
+    def wait(self):
+        return math.ceil(self.retry_after) if self.retry_after is not None else None
+
+    @staticmethod
+    def _record_headers(request, capacity, tokens, refill_rate):
+        """Keep the most restrictive bucket for RateLimitHeadersMiddleware"""
+        http_request = getattr(request, '_request', request)
+        remaining = int(tokens)
+        current = getattr(http_request, 'ratelimit', None)
+        if current is None or remaining < current['remaining']:
+            http_request.ratelimit = {
+                'limit': capacity,
+                'remaining': remaining,
+                'reset': math.ceil((capacity - tokens) / refill_rate),
+            }
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Global bucket per authenticated user ('user' rate) or per IP for anonymous requests ('anon' rate)"""
+
+    def get_scope(self, request, view):
+        return 'user' if request.user and request.user.is_authenticated else 'anon'
+
+    def get_ident_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return self.get_ident(request)
+
+
+class ScopedIPTokenBucketThrottle(TokenBucketThrottle):
+    """Per-view bucket per client IP, for views that set `throttle_scope`"""
+
+    def get_scope(self, request, view):
+        return getattr(view, 'throttle_scope', None)
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class RateLimitHeadersMiddleware:
+    """
+    Add RateLimit-Limit/Remaining/Reset headers for throttled API requests.
+    Runs natively under both WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.add_headers(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.add_headers(request, await self.get_response(request))
+
+    def add_headers(self, request, response):
+        ratelimit = getattr(request, 'ratelimit', None)
+        if ratelimit is not None:
+            response.headers['RateLimit-Limit'] = str(ratelimit['limit'])
+            response.headers['RateLimit-Remaining'] = str(ratelimit['remaining'])
+            response.headers['RateLimit-Reset'] = str(ratelimit['reset'])
+        return response
@@ -20,27 +20,28 @@ from django.conf.urls.static import static
 from django.urls import path, include, re_path
 from django.views.static import serve
 from rest_framework.routers import DefaultRouter
-from fleet.views import VehicleViewSet
-from bookings.views import BookingListCreateView, BookingDetailView, check_vehicle_availability, get_vehicle_booked_dates
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from fleet.views import LocationViewSet, VehicleViewSet
+from lexuBackend.metrics import metrics_view
+from bookings.views import BookingListCreateView, BookingBatchCreateView, BookingDetailView, check_vehicle_availability, get_vehicle_booked_dates
+from users.views import TokenRefreshRevokingView
 
 router = DefaultRouter()
 router.register(r'vehicles', VehicleViewSet)
+router.register(r'locations', LocationViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
     path('api/', include(router.urls)),
     # Bookings
     path('api/bookings/', BookingListCreateView.as_view(), name='booking-list'),
+    path('api/bookings/batch/', BookingBatchCreateView.as_view(), name='booking-batch'),
     path('api/bookings/<int:pk>/', BookingDetailView.as_view(), name='booking-detail'),
     path('api/vehicles/<int:vehicle_id>/availability/', check_vehicle_availability, name='vehicle-availability'),
     path('api/vehicles/<int:vehicle_id>/booked-dates/', get_vehicle_booked_dates, name='vehicle-booked-dates'),
     # Authentication & Profile
     path('api/auth/', include('users.urls')),
-    path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/auth/token/refresh/', TokenRefreshRevokingView.as_view(), name='token_refresh'),
     # Notifications
     path('api/notifications/', include('notifications.urls')),
 ]
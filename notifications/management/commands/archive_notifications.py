@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from notifications.archive import archivable, archive_batch, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        'Move read notifications older than the retention period '
+        '(NOTIFICATION_RETENTION_DAYS) into compressed NotificationArchive rows'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Retention in days (default: NOTIFICATION_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['days'])
+        if options['dry_run']:
+            count = archivable(cutoff).count()
+            self.stdout.write(f'{count} read notification(s) created before {cutoff:%Y-%m-%d %H:%M} would be archived')
+            return
+
+        batch_size = options['batch_size']
+        total = 0
+        while True:
+            moved = archive_batch(cutoff, batch_size)
+            total += moved
+            if moved:
+                self.stdout.write(f'Archived {total} notification(s)...')
+            if moved < batch_size:
+                break
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} notification(s) created before {cutoff:%Y-%m-%d %H:%M}'))
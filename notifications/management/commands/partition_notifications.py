@@ -0,0 +1,116 @@
+"""
+PostgreSQL only: range-partition notifications_notification by month on
+created_at, and keep partitions created ahead of time.
+
+The first run converts the table in one transaction, holding an ACCESS
+EXCLUSIVE lock for the copy, so run it in a maintenance window. Later runs
+(e.g. a monthly cron) only add the missing partitions. A DEFAULT partition
+catches rows outside the created ranges.
+
+A partitioned table's primary key must include the partition key, so the
+key becomes (id, created_at). ids still come from a single sequence and
+stay unique.
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from notifications.models import Notification
+
+TABLE = Notification._meta.db_table
+LEGACY_TABLE = f'{TABLE}_legacy'
+
+
+def add_months(day, months):
+    years, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + years, month + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_y{month:%Y}m{month:%m}'
+
+
+class Command(BaseCommand):
+    help = 'Convert notifications to monthly range partitions (PostgreSQL) and create upcoming partitions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Partitioning is only supported on PostgreSQL')
+
+        this_month = timezone.now().date().replace(day=1)
+        last_month = add_months(this_month, options['months_ahead'])
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)', [TABLE])
+            row = cursor.fetchone()
+            if row is None:
+                raise CommandError(f'Table {TABLE} does not exist; run migrate first')
+
+            converting = row[0] != 'p'
+            first_month = this_month
+            if converting:
+                first_month = min(first_month, self.create_partitioned_table(cursor))
+
+            created = 0
+            month = first_month
+            while month <= last_month:
+                created += self.create_partition(cursor, month)
+                month = add_months(month, 1)
+
+            if converting:
+                self.copy_legacy_rows(cursor)
+
+        self.stdout.write(self.style.SUCCESS(f'{TABLE} is partitioned; created {created} new partition(s)'))
+
+    def create_partition(self, cursor, month):
+        name = partition_name(month)
+        cursor.execute('SELECT to_regclass(%s)', [name])
+        if cursor.fetchone()[0] is not None:
+            return 0
+        cursor.execute(
+            f'CREATE TABLE "{name}" PARTITION OF "{TABLE}" '
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+        )
+        return 1
+
+    def create_partitioned_table(self, cursor):
+        """Rename the plain table aside and create the partitioned parent; returns the oldest row's month"""
+        self.stdout.write(f'Converting {TABLE} to a partitioned table...')
+        cursor.execute(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'SELECT min(created_at) FROM "{TABLE}"')
+        oldest = cursor.fetchone()[0] or timezone.now()
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{LEGACY_TABLE}"')
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{LEGACY_TABLE}" INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)'
+        )
+        cursor.execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+        return oldest.date().replace(day=1)
+
+    def copy_legacy_rows(self, cursor):
+        """Move the rows into the partitions, then recreate the sequence, keys and indexes"""
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{LEGACY_TABLE}"')
+        # Frees the old constraint, index and identity sequence names
+        cursor.execute(f'DROP TABLE "{LEGACY_TABLE}"')
+
+        sequence = f'{TABLE}_id_seq'
+        cursor.execute(f'CREATE SEQUENCE "{sequence}" OWNED BY "{TABLE}".id')
+        cursor.execute(f"ALTER TABLE \"{TABLE}\" ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+        cursor.execute(f"SELECT setval('{sequence}', COALESCE(max(id), 0) + 1, false) FROM \"{TABLE}\"")
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (id, created_at)')
+
+        user_table = Notification._meta.get_field('user').related_model._meta.db_table
+        cursor.execute(f'CREATE INDEX "{TABLE}_user_id_idx" ON "{TABLE}" (user_id)')
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_user_id_fk" '
+            f'FOREIGN KEY (user_id) REFERENCES "{user_table}" (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+        # Meta.indexes keep their names so later migrations can find them
+        with connection.schema_editor(atomic=False) as editor:
+            for index in Notification._meta.indexes:
+                editor.add_index(Notification, index)
@@ -0,0 +1,63 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+FIELDS = ('title', 'message', 'notification_type', 'priority', 'link', 'is_read', 'read_at', 'created_at')
+
+
+def deliver_to_staff(apps, schema_editor):
+    """
+    Staff used to see every notification, so give each active staff user
+    a copy (read state included) of:
+    - new-booking notifications, which went to a single in-app admin
+      account; that admin keeps theirs and the others get copies
+    - notifications that had no recipient; the originals are dropped
+    """
+    Notification = apps.get_model('notifications', 'Notification')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+
+    staff_ids = list(User.objects.filter(is_staff=True, is_active=True).values_list('id', flat=True))
+    unaddressed = Notification.objects.filter(user__isnull=True)
+    if not staff_ids:
+        return
+
+    booking_new = Notification.objects.filter(notification_type='BOOKING_NEW', user__is_staff=True)
+    # (user, message, created_at) already delivered, so no staff user gets a row twice
+    delivered = set(booking_new.values_list('user_id', 'message', 'created_at'))
+    copies = []
+    for row in list(booking_new.values(*FIELDS)):
+        for user_id in staff_ids:
+            key = (user_id, row['message'], row['created_at'])
+            if key not in delivered:
+                delivered.add(key)
+                copies.append(Notification(user_id=user_id, **row))
+        if len(copies) >= BATCH_SIZE:
+            Notification.objects.bulk_create(copies)
+            copies = []
+
+    for row in unaddressed.values(*FIELDS).iterator():
+        copies.extend(Notification(user_id=user_id, **row) for user_id in staff_ids)
+        if len(copies) >= BATCH_SIZE:
+            Notification.objects.bulk_create(copies)
+            copies = []
+    Notification.objects.bulk_create(copies)
+    unaddressed.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_read_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at'], name='notificatio_user_id_05b4bc_idx'),
+        ),
+        migrations.RunPython(deliver_to_staff, migrations.RunPython.noop),
+    ]
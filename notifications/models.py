@@ -5,6 +5,21 @@ from django.utils import timezone
 User = get_user_model()
 
 
+class NotificationQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Every user, staff included, sees only the notifications addressed to them"""
+        return self.filter(user=user)
+
+    def create_for_staff(self, **fields):
+        """Deliver a notification to every active staff user, one row each"""
+        staff_ids = User.objects.filter(is_staff=True, is_active=True).values_list('id', flat=True)
+        return self.bulk_create([self.model(user_id=user_id, **fields) for user_id in staff_ids])
+
+    def mark_read(self):
+        """Mark unread notifications as read in one UPDATE; returns the count"""
+        return self.filter(is_read=False).update(is_read=True, read_at=timezone.now())
+
+
 class Notification(models.Model):
     """In-app notification model"""
     
@@ -37,12 +52,16 @@ class Notification(models.Model):
     priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES, default='MEDIUM')
     link = models.CharField(max_length=500, blank=True, help_text='Optional link to redirect')
     is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
+
+    objects = NotificationQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'is_read']),
+            models.Index(fields=['user', '-created_at']),
             models.Index(fields=['-created_at']),
         ]
     
@@ -65,3 +84,31 @@ class Notification(models.Model):
             return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
         else:
             return 'Just now'
+
+
+class NotificationArchive(models.Model):
+    """
+    A batch of read notifications moved out of the hot table by
+    `manage.py archive_notifications`, stored as gzip-compressed JSON lines
+    (one Notification row per line).
+    """
+    month = models.DateField(help_text='First day of the month the notifications were created in')
+    first_id = models.BigIntegerField()
+    last_id = models.BigIntegerField()
+    row_count = models.PositiveIntegerField()
+    data = models.BinaryField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['month', 'first_id']
+        indexes = [
+            models.Index(fields=['month']),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} #{self.first_id}-{self.last_id} ({self.row_count})"
+
+    def rows(self):
+        """Decode the archived notifications as dicts"""
+        from .archive import decode_rows
+        return decode_rows(self.data)
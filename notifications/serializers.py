@@ -10,9 +10,9 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = [
             'id', 'title', 'message', 'notification_type', 
-            'priority', 'link', 'is_read', 'created_at', 'time_ago'
+            'priority', 'link', 'is_read', 'read_at', 'created_at', 'time_ago'
         ]
-        read_only_fields = ['id', 'created_at', 'time_ago']
+        read_only_fields = ['id', 'read_at', 'created_at', 'time_ago']
 
 
 class NotificationMarkReadSerializer(serializers.Serializer):
@@ -4,36 +4,24 @@ from django.contrib.auth import get_user_model
 from django.conf import settings
 from notifications.models import Notification
 from bookings.models import Booking
-from notifications.utils import send_booking_email_notification
-import traceback
+from notifications.utils import send_booking_email_notification, send_batch_booking_email_notification
+import logging
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 def send_booking_notification(booking: Booking):
     """
     Send notification when a new booking is created.
-    - Creates in-app notification for primary admin user
+    - Creates an in-app notification for every active staff user
     - Sends email to ADMIN_EMAIL address
     """
     
     try:
-        # In-app notification - uses admin user email from database
-        inapp_admin_email = settings.INAPP_ADMIN_EMAIL if hasattr(settings, 'INAPP_ADMIN_EMAIL') else None
-        
-        # Email notification - uses ADMIN_EMAIL (can be different)
+        # Email notification - uses ADMIN_EMAIL
         admin_email = settings.ADMIN_EMAIL if hasattr(settings, 'ADMIN_EMAIL') else 'admin@luxedrive.com'
         
-        # Get the admin user for in-app notification
-        admin_user = None
-        if inapp_admin_email:
-            admin_user = User.objects.filter(is_staff=True, email=inapp_admin_email, is_active=True).first()
-        
-        # Fallback: If specific admin not found, try to find any superuser
-        if not admin_user:
-            admin_user = User.objects.filter(is_superuser=True, is_active=True).first()
-        
-        # If no specific in-app admin found, skip in-app notification
         booking_url = f"{getattr(settings, 'FRONTEND_URL', None) or 'http://localhost:5173'}/#/admin/bookings"
         
         # Check for existing notifications for this booking to prevent duplicates
@@ -44,33 +32,57 @@ def send_booking_notification(booking: Booking):
             )
             
             if existing_notifications.exists():
-                print(f"Notification already exists for booking {booking.booking_reference}, skipping")
+                logger.debug('Notification already exists for booking %s, skipping', booking.booking_reference)
                 return
         
-        # 1. Create in-app notification for primary admin only
-        if admin_user:
-            Notification.objects.create(
-                user=admin_user,
-                title='New Booking Received',
-                message=f"New booking #{booking.booking_reference} from {booking.driver_name}. "
-                       f"Vehicle: {booking.vehicle_id}, Dates: {booking.pickup_date} to {booking.return_date}. "
-                       f"Total: ${booking.total_price}",
-                notification_type='BOOKING_NEW',
-                priority='HIGH',
-                link=booking_url
-            )
-            print(f"In-app notification created for {inapp_admin_email}")
+        # 1. Create an in-app notification for each staff user (own read state)
+        delivered = Notification.objects.create_for_staff(
+            title='New Booking Received',
+            message=f"New booking #{booking.booking_reference} from {booking.driver_name}. "
+                   f"Vehicle: {booking.vehicle_id}, Dates: {booking.pickup_date} to {booking.return_date}. "
+                   f"Total: ${booking.total_price}",
+            notification_type='BOOKING_NEW',
+            priority='HIGH',
+            link=booking_url
+        )
+        if delivered:
+            logger.debug('In-app notification created for %d staff users', len(delivered))
         else:
-            print(f"In-app admin user not found ({inapp_admin_email}), skipping in-app notification")
+            logger.warning('No active staff users, skipping in-app notification')
         
         # 2. Send email to ADMIN_EMAIL (separate from in-app notification)
         send_booking_email_notification(booking, admin_email)
         
-        print(f"Notification sent for booking {booking.booking_reference}")
+        logger.debug('Notification sent for booking %s', booking.booking_reference)
         
-    except Exception as e:
-        print(f"CRITICAL ERROR: Failed to send booking notification: {e}")
-        traceback.print_exc()
+    except Exception:
+        logger.exception('Failed to send booking notification for %s', booking.booking_reference)
+
+
+def send_batch_booking_notification(bookings):
+    """
+    One in-app notification per staff user and one email for a batch of
+    bookings created together (bulk_create skips the post_save handler).
+    """
+    if not bookings:
+        return
+    try:
+        admin_email = settings.ADMIN_EMAIL if hasattr(settings, 'ADMIN_EMAIL') else 'admin@luxedrive.com'
+        booking_url = f"{getattr(settings, 'FRONTEND_URL', None) or 'http://localhost:5173'}/#/admin/bookings"
+        references = ', '.join(booking.booking_reference for booking in bookings)
+        total = sum(booking.total_price for booking in bookings)
+
+        Notification.objects.create_for_staff(
+            title=f'{len(bookings)} New Bookings Received',
+            message=f"{len(bookings)} bookings from {bookings[0].driver_name}: {references}. "
+                   f"Total: ${total}",
+            notification_type='BOOKING_NEW',
+            priority='HIGH',
+            link=booking_url
+        )
+        send_batch_booking_email_notification(bookings, admin_email)
+    except Exception:
+        logger.exception('Failed to send batch booking notification for %d bookings', len(bookings))
 
 
 @receiver(post_save, sender=Booking)
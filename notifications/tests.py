@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import User
+
+from .archive import ARCHIVED_FIELDS, decode_rows, encode_rows
+from .models import Notification, NotificationArchive
+
+
+class MarkReadTests(TestCase):
+    """Every mark-read path is a single conditional UPDATE"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='driver@example.com', password='pass')
+        self.other = User.objects.create_user(email='other@example.com', password='pass')
+        self.mine = [self.notify(self.user) for _ in range(3)]
+        self.theirs = self.notify(self.other)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def notify(self, user):
+        return Notification.objects.create(
+            user=user, title='Booking', message='Confirmed', notification_type='BOOKING_CONFIRMED'
+        )
+
+    def test_mark_single_read(self):
+        notification = self.mine[0]
+        with self.assertNumQueries(1):
+            response = self.client.post(f'/api/notifications/{notification.id}/read/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 1)
+        notification.refresh_from_db()
+        self.assertTrue(notification.is_read)
+        self.assertIsNotNone(notification.read_at)
+
+    def test_mark_single_read_is_idempotent(self):
+        notification = self.mine[0]
+        self.client.post(f'/api/notifications/{notification.id}/read/')
+        read_at = Notification.objects.get(id=notification.id).read_at
+        response = self.client.post(f'/api/notifications/{notification.id}/read/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 0)
+        self.assertEqual(Notification.objects.get(id=notification.id).read_at, read_at)
+
+    def test_cannot_mark_other_users_notification(self):
+        response = self.client.post(f'/api/notifications/{self.theirs.id}/read/')
+        self.assertEqual(response.status_code, 404)
+        self.theirs.refresh_from_db()
+        self.assertFalse(self.theirs.is_read)
+
+    def test_mark_all_read(self):
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/notifications/mark-all-read/')
+        self.assertEqual(response.data['updated'], 3)
+        self.assertFalse(Notification.objects.filter(user=self.user, is_read=False).exists())
+        self.assertFalse(Notification.objects.get(id=self.theirs.id).is_read)
+
+    def test_mark_read_by_ids(self):
+        ids = [self.mine[0].id, self.mine[1].id, self.theirs.id]
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                '/api/notifications/mark-read/', {'notification_ids': ids}, format='json'
+            )
+        self.assertEqual(response.data['updated'], 2)
+        self.assertFalse(Notification.objects.get(id=self.theirs.id).is_read)
+
+    def test_mark_read_all_keeps_created_at(self):
+        created_at = self.mine[0].created_at
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/notifications/mark-read/', {'mark_all': True}, format='json')
+        self.assertEqual(response.data['updated'], 3)
+        notification = Notification.objects.get(id=self.mine[0].id)
+        self.assertEqual(notification.created_at, created_at)
+        self.assertIsNotNone(notification.read_at)
+
+    def test_requires_authentication(self):
+        client = APIClient()
+        for path in (
+            f'/api/notifications/{self.mine[0].id}/read/',
+            '/api/notifications/mark-all-read/',
+            '/api/notifications/mark-read/',
+        ):
+            self.assertEqual(client.post(path).status_code, 401)
+        self.assertFalse(Notification.objects.filter(is_read=True).exists())
+
+
+class StaffDeliveryTests(TestCase):
+    """Staff notifications are per-recipient rows with their own read state"""
+
+    def setUp(self):
+        cache.clear()
+        self.admins = [
+            User.objects.create_user(email=f'admin{i}@example.com', password='pass', is_staff=True)
+            for i in range(2)
+        ]
+        User.objects.create_user(email='former@example.com', password='pass', is_staff=True, is_active=False)
+        self.customer = User.objects.create_user(email='driver@example.com', password='pass')
+        Notification.objects.create(
+            user=self.customer, title='Booking', message='Confirmed', notification_type='BOOKING_CONFIRMED'
+        )
+        Notification.objects.create_for_staff(
+            title='New Booking Received', message='LX-1', notification_type='BOOKING_NEW'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admins[0])
+
+    def test_fan_out_to_active_staff(self):
+        delivered = Notification.objects.filter(notification_type='BOOKING_NEW')
+        self.assertEqual(sorted(delivered.values_list('user_id', flat=True)), [a.id for a in self.admins])
+
+    def test_staff_only_see_their_own(self):
+        response = self.client.get('/api/notifications/')
+        self.assertEqual(response.data['total_count'], 1)
+        self.assertEqual(response.data['notifications'][0]['notification_type'], 'BOOKING_NEW')
+        self.assertEqual(self.client.get('/api/notifications/unread-count/').data['unread_count'], 1)
+
+    def test_mark_all_read_leaves_other_staff_unread(self):
+        response = self.client.post('/api/notifications/mark-all-read/')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertTrue(Notification.objects.filter(user=self.admins[1], is_read=False).exists())
+        self.assertTrue(Notification.objects.filter(user=self.customer, is_read=False).exists())
+
+
+class ArchiveTests(TestCase):
+    """Old read notifications move into compressed monthly archive rows"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='driver@example.com', password=None)
+        now = timezone.now()
+        self.old = [
+            self.notify(datetime(2024, 1, 5, 10, 0, 0, 123456, tzinfo=dt_timezone.utc), read=True, title='Café ✓'),
+            self.notify(datetime(2024, 1, 20, tzinfo=dt_timezone.utc), read=True),
+            self.notify(datetime(2024, 2, 3, tzinfo=dt_timezone.utc), read=True),
+        ]
+        self.kept = [
+            self.notify(datetime(2024, 1, 6, tzinfo=dt_timezone.utc), read=False),
+            self.notify(now - timedelta(days=10), read=True),
+        ]
+
+    def notify(self, created_at, read, title='Booking'):
+        return Notification.objects.create(
+            user=self.user, title=title, message='Confirmed', notification_type='BOOKING_CONFIRMED',
+            created_at=created_at, is_read=read, read_at=created_at + timedelta(hours=1) if read else None,
+        )
+
+    def archive(self):
+        out = StringIO()
+        call_command('archive_notifications', '--days', '90', '--batch-size', '2', stdout=out)
+        return out.getvalue()
+
+    def test_round_trip(self):
+        rows = list(Notification.objects.order_by('id').values(*ARCHIVED_FIELDS))
+        self.assertEqual(decode_rows(encode_rows(rows)), rows)
+
+    def test_archives_old_read_rows_once(self):
+        expected = list(Notification.objects.filter(id__in=[n.id for n in self.old]).order_by('id').values(*ARCHIVED_FIELDS))
+        self.assertIn('Archived 3 notification(s)', self.archive())
+
+        archives = list(NotificationArchive.objects.all())
+        self.assertEqual([(a.month.isoformat(), a.row_count) for a in archives], [('2024-01-01', 2), ('2024-02-01', 1)])
+        self.assertEqual([row for archive in archives for row in archive.rows()], expected)
+        self.assertEqual(sorted(Notification.objects.values_list('id', flat=True)), [n.id for n in self.kept])
+
+        self.assertIn('Archived 0 notification(s)', self.archive())
+        self.assertEqual(NotificationArchive.objects.count(), 2)
+        self.assertEqual(Notification.objects.count(), 2)
@@ -2,9 +2,11 @@
 Utility functions for notifications.
 """
 from django.conf import settings
-import traceback
+import logging
 import threading
 
+logger = logging.getLogger(__name__)
+
 
 def _send_email_sync(subject, message_content, admin_email):
     """
@@ -16,7 +18,7 @@ def _send_email_sync(subject, message_content, admin_email):
         
         sg_api_key = getattr(settings, 'SENDGRID_API_KEY', None)
         if not sg_api_key:
-            print("ERROR: SENDGRID_API_KEY not configured")
+            logger.error('SENDGRID_API_KEY not configured')
             return False
         
         from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@luxedrive.com')
@@ -33,17 +35,14 @@ def _send_email_sync(subject, message_content, admin_email):
         sg = SendGridAPIClient(api_key=sg_api_key)
         response = sg.send(mail)
         
-        print(f"SUCCESS: Email sent to: {admin_email}, Status code: {response.status_code}")
+        logger.debug('Booking email sent', extra={'status_code': response.status_code})
         return True
         
     except ImportError:
-        print("ERROR: sendgrid library not installed. Run: pip install sendgrid")
-        traceback.print_exc()
+        logger.exception('sendgrid library not installed. Run: pip install sendgrid')
         return False
-    except Exception as e:
-        print(f"ERROR: Failed to send email: {e}")
-        print(f"Error type: {type(e).__name__}")
-        traceback.print_exc()
+    except Exception:
+        logger.exception('Failed to send booking email')
         return False
 
 
@@ -79,7 +78,7 @@ def send_booking_email_notification(booking, admin_email):
     </html>
     """
     
-    print(f"Attempting to send email via SendGrid API TO: {admin_email}")
+    logger.debug('Sending booking email via SendGrid', extra={'booking_reference': booking.booking_reference})
     
     # Start email sending in a background thread to avoid blocking the request
     email_thread = threading.Thread(
@@ -90,3 +89,52 @@ def send_booking_email_notification(booking, admin_email):
     email_thread.start()
     
     return True  # Return immediately, email will be sent in background
+
+
+
+def send_batch_booking_email_notification(bookings, admin_email):
+    """
+    Send one email to admin for a batch of bookings (POST /api/bookings/batch/).
+    Uses async threading to avoid blocking the main request.
+    """
+    booking_url = f"{getattr(settings, 'FRONTEND_URL', None) or 'http://localhost:5173'}/#/admin/bookings"
+    first = bookings[0]
+    total = sum(booking.total_price for booking in bookings)
+
+    subject = f'🚗 {len(bookings)} New Bookings from {first.driver_name} - LuxeDrive'
+
+    rows = ''.join(
+        f'<tr><td style="padding: 10px; border-bottom: 1px solid #ddd;">{booking.booking_reference}</td>'
+        f'<td style="padding: 10px; border-bottom: 1px solid #ddd;">{booking.vehicle_id}</td>'
+        f'<td style="padding: 10px; border-bottom: 1px solid #ddd;">{booking.pickup_date}</td>'
+        f'<td style="padding: 10px; border-bottom: 1px solid #ddd;">{booking.return_date}</td>'
+        f'<td style="padding: 10px; border-bottom: 1px solid #ddd;">${booking.total_price}</td></tr>'
+        for booking in bookings
+    )
+    message_html = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; padding: 20px;">
+        <h2 style="color: #333;">{len(bookings)} New Bookings Received!</h2>
+        <p><strong>Customer:</strong> {first.driver_name} ({first.driver_email}, {first.driver_phone})</p>
+        <p><strong>Total Price:</strong> ${total}</p>
+        <table style="border-collapse: collapse; width: 100%; max-width: 800px;">
+            <tr><th style="padding: 10px; text-align: left;">Reference</th><th style="padding: 10px; text-align: left;">Vehicle ID</th><th style="padding: 10px; text-align: left;">Pickup Date</th><th style="padding: 10px; text-align: left;">Return Date</th><th style="padding: 10px; text-align: left;">Total</th></tr>
+            {rows}
+        </table>
+        <p style="margin-top: 20px;">
+            <a href="{booking_url}" style="background-color: #007bff; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px;">View Bookings in Admin Dashboard</a>
+        </p>
+    </body>
+    </html>
+    """
+
+    logger.debug('Sending batch booking email via SendGrid', extra={'bookings': len(bookings)})
+
+    email_thread = threading.Thread(
+        target=_send_email_sync,
+        args=(subject, message_html, admin_email),
+        daemon=True
+    )
+    email_thread.start()
+
+    return True
@@ -1,3 +1,47 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.forms import BaseUserCreationForm, UserChangeForm
 
-# Register your models here.
+from lexuBackend.paginators import EstimatedCountPaginator
+
+from .models import User
+
+
+class UserCreationForm(BaseUserCreationForm):
+    class Meta:
+        model = User
+        fields = ('email',)
+
+
+class UserAdminChangeForm(UserChangeForm):
+    class Meta:
+        model = User
+        fields = '__all__'
+
+
+@admin.register(User)
+class UserAdmin(BaseUserAdmin):
+    """
+    Users are identified by email (there is no username). Like BookingAdmin,
+    the changelist avoids the unfiltered COUNT(*) and searches an indexed
+    exact email match.
+    """
+    form = UserAdminChangeForm
+    add_form = UserCreationForm
+    list_display = ['email', 'first_name', 'last_name', 'membership_tier', 'is_staff', 'date_joined']
+    list_filter = ['is_staff', 'is_superuser', 'is_active', 'membership_tier']
+    search_fields = ['=email']
+    search_help_text = 'Exact email address'
+    ordering = ['-id']
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    fieldsets = [
+        (None, {'fields': ['email', 'password']}),
+        ('Personal info', {'fields': ['first_name', 'last_name', 'phone_number', 'license_number']}),
+        ('Membership', {'fields': ['membership_tier', 'points']}),
+        ('Permissions', {'fields': ['is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions']}),
+        ('Important dates', {'fields': ['last_login', 'date_joined']}),
+    ]
+    add_fieldsets = [
+        (None, {'classes': ['wide'], 'fields': ['email', 'password1', 'password2']}),
+    ]
@@ -0,0 +1,29 @@
+"""
+Password hashers with cost parameters tuned from settings.
+
+Django's Argon2 defaults (100 MiB, parallelism 8) and PBKDF2's iteration
+count cost hundreds of milliseconds of CPU per login. The defaults here
+follow the OWASP Password Storage Cheat Sheet minimums instead:
+- Argon2id: m=19 MiB, t=2, p=1
+- scrypt: N=2^17, r=8, p=1
+
+Django's must_update() compares each stored hash with these parameters,
+so changing them (or the preferred hasher in PASSWORD_HASHERS) rehashes
+a user's password on their next successful login.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    time_cost = getattr(settings, 'PASSWORD_ARGON2_TIME_COST', 2)
+    memory_cost = getattr(settings, 'PASSWORD_ARGON2_MEMORY_COST', 19456)
+    parallelism = getattr(settings, 'PASSWORD_ARGON2_PARALLELISM', 1)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    work_factor = getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 17)
+    block_size = getattr(settings, 'PASSWORD_SCRYPT_BLOCK_SIZE', 8)
+    parallelism = getattr(settings, 'PASSWORD_SCRYPT_PARALLELISM', 1)
+    # scrypt needs 128 * N * r bytes; OpenSSL refuses more than 32 MiB unless told
+    maxmem = 2 * 128 * work_factor * block_size
@@ -0,0 +1,59 @@
+"""
+Run password-hashing views on a dedicated, bounded thread pool.
+
+Each login or registration spends most of its time hashing, and the hash
+functions release the GIL. Left on the request threads, a burst of logins
+can hash on every core at once and starve the requests queued behind
+them. Views wrapped with offload_to_hashing_pool run on at most
+PASSWORD_HASHING_WORKERS threads. Extra logins wait for a free thread,
+which costs no CPU, so the remaining cores keep serving other requests.
+
+The wrapped view is async. Under ASGI the wait happens on the event loop.
+Under WSGI, Django runs the view with async_to_sync, so the request
+thread blocks until the pool finishes.
+"""
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hashing_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'PASSWORD_HASHING_WORKERS', 4),
+                thread_name_prefix='password-hashing',
+            )
+    return _executor
+
+
+def _call_view(view, request, *args, **kwargs):
+    # Pool threads outlive requests, so apply CONN_MAX_AGE and health checks
+    # the way request_started/request_finished do for request threads
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def offload_to_hashing_pool(view):
+    """Wrap a sync view (e.g. SomeAPIView.as_view()) to run on the hashing pool"""
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        run = sync_to_async(_call_view, thread_sensitive=False, executor=get_hashing_executor())
+        return await run(view, request, *args, **kwargs)
+
+    return wrapper
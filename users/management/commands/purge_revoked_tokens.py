@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users.tokens import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete revoked refresh tokens that have expired (run daily from cron)'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired()
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} expired revoked token(s)'))
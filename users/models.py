@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Upper
 from .managers import UserManager
 
 class User(AbstractUser):
@@ -26,5 +27,25 @@ class User(AbstractUser):
 
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Admin search on email is an iexact match on UPPER(email)
+            models.Index(Upper('email'), name='user_email_upper_idx'),
+        ]
+
     def __str__(self):
         return self.email
+
+
+class RevokedToken(models.Model):
+    """
+    A refresh token that can no longer be used, keyed by its jti claim.
+    Rows are only needed until the token would have expired anyway;
+    `purge_revoked_tokens` deletes the rest.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.jti
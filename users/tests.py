@@ -1,3 +1,111 @@
-from django.test import TestCase
+from datetime import timedelta
+import threading
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from lexuBackend.throttling import get_bucket_store
+
+from . import hashing
+from .models import RevokedToken, User
+
+
+class TokenRefreshTests(TestCase):
+    """Each refresh token rotates once; users.tokens rejects any replay"""
+
+    def setUp(self):
+        cache.clear()
+        get_bucket_store().clear()
+        self.user = User.objects.create_user(email='driver@example.com', password='pass')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+
+    def refresh_with(self, token):
+        return self.client.post('/api/auth/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_refresh_rotates(self):
+        response = self.refresh_with(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+        self.assertNotEqual(response.data['refresh'], str(self.refresh))
+        self.assertTrue(RevokedToken.objects.filter(jti=self.refresh['jti']).exists())
+        self.assertEqual(self.refresh_with(response.data['refresh']).status_code, 200)
+
+    def test_replay_is_rejected(self):
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 200)
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+
+    def test_replay_is_rejected_without_cache(self):
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 200)
+        cache.clear()
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+
+    def test_concurrent_refreshes_rotate_once(self):
+        # Both requests pass the cache pre-check before either revokes the jti
+        with mock.patch('users.views.is_revoked', return_value=False):
+            statuses = [self.refresh_with(self.refresh).status_code for _ in range(2)]
+        self.assertEqual(sorted(statuses), [200, 401])
+        self.assertEqual(RevokedToken.objects.filter(jti=self.refresh['jti']).count(), 1)
+
+    def test_purge_deletes_only_expired(self):
+        now = timezone.now()
+        RevokedToken.objects.create(jti='expired', expires_at=now - timedelta(minutes=1))
+        RevokedToken.objects.create(jti='live', expires_at=now + timedelta(days=1))
+        out = StringIO()
+        call_command('purge_revoked_tokens', stdout=out)
+        self.assertIn('Purged 1 ', out.getvalue())
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['live'])
+
+
+class HashingPoolTests(TransactionTestCase):
+    """Login and register run on the hashing pool, whose threads use their own connections"""
+
+    def setUp(self):
+        cache.clear()
+        get_bucket_store().clear()
+        self.client = APIClient()
+
+    def login(self, email, password):
+        return self.client.post('/api/auth/login/', {'email': email, 'password': password}, format='json')
+
+    def test_register_then_login(self):
+        threads = []
+        call_view = hashing._call_view
+
+        def record_thread(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return call_view(*args, **kwargs)
+
+        with mock.patch.object(hashing, '_call_view', record_thread):
+            response = self.client.post('/api/auth/register/', {
+                'email': 'new@example.com', 'first_name': 'New', 'last_name': 'Driver', 'password': 'correct-horse',
+            }, format='json')
+            self.assertEqual(self.login('new@example.com', 'correct-horse').status_code, 200)
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith('password-hashing') for name in threads), threads)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertNotIn('password', response.data)
+        self.assertTrue(User.objects.get(email='new@example.com').password.startswith('argon2'))
+
+        response = self.login('new@example.com', 'correct-horse')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+        self.assertIn('refresh', response.data)
+        self.assertEqual(self.login('new@example.com', 'wrong').status_code, 401)
+
+    def test_login_upgrades_pbkdf2_hash(self):
+        user = User.objects.create_user(email='old@example.com', password=None)
+        user.password = make_password('correct-horse', hasher='pbkdf2_sha256')
+        user.save(update_fields=['password'])
+
+        self.assertEqual(self.login('old@example.com', 'correct-horse').status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('argon2$argon2id$'))
+        self.assertTrue(user.check_password('correct-horse'))
@@ -0,0 +1,47 @@
+"""
+Refresh-token revocation keyed by jti.
+
+Revoked jtis are stored in the RevokedToken table, whose unique index
+makes revoke() an atomic gate: when two requests rotate the same refresh
+token at once, only one insert succeeds. Each revoked jti is also cached
+until the token expires, so replays are normally rejected with a single
+cache lookup. The table only holds tokens that haven't expired yet;
+`manage.py purge_revoked_tokens` removes the rest.
+"""
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+
+def _cache_key(jti):
+    return f'revoked-jti:{jti}'
+
+
+def is_revoked(jti):
+    """Cheap pre-check; revoke() is the authoritative test"""
+    return cache.get(_cache_key(jti)) is not None
+
+
+def revoke(jti, expires_at):
+    """Revoke a token; returns False if it was already revoked"""
+    ttl = int((expires_at - timezone.now()).total_seconds())
+    if ttl <= 0:
+        # Already expired, signature checks reject it
+        return True
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+        created = True
+    except IntegrityError:
+        created = False
+    cache.set(_cache_key(jti), 1, ttl)
+    return created
+
+
+def purge_expired():
+    """Delete revocations of tokens that have expired; returns the row count"""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
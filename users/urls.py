@@ -1,9 +1,11 @@
 from django.urls import path
 from .views import RegisterView, UserProfileView, LoginView, UserListView, UserDetailView
+from .hashing import offload_to_hashing_pool
 
 urlpatterns = [
-    path("login/", LoginView.as_view()),
-    path('register/', RegisterView.as_view(), name='auth_register'),
+    # Password hashing runs on its own thread pool (see users/hashing.py)
+    path("login/", offload_to_hashing_pool(LoginView.as_view())),
+    path('register/', offload_to_hashing_pool(RegisterView.as_view()), name='auth_register'),
     path('me/', UserProfileView.as_view(), name='user_me'),
     path('users/', UserListView.as_view(), name='user_list'),
     path('users/<int:pk>/', UserDetailView.as_view(), name='user_detail'),
@@ -1,9 +1,14 @@
 from rest_framework import generics, permissions, serializers
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
 from rest_framework.response import Response
 from bookings.models import Booking
+from lexuBackend.metrics import InstrumentedViewMixin
+from .tokens import is_revoked, revoke
 
 User = get_user_model()
 
@@ -43,6 +48,7 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'register'
 
 class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = 'email'
@@ -55,8 +61,32 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 class LoginView(TokenObtainPairView):
     serializer_class = EmailTokenObtainPairSerializer
+    throttle_scope = 'login'
 
-class UserProfileView(generics.RetrieveAPIView):
+class RevokingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Enforces BLACKLIST_AFTER_ROTATION with users.tokens instead of the
+    token_blacklist app: each refresh token can be rotated once.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        jti = refresh[jwt_settings.JTI_CLAIM]
+        if is_revoked(jti):
+            raise InvalidToken('Token is blacklisted')
+
+        data = super().validate(attrs)
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS and jwt_settings.BLACKLIST_AFTER_ROTATION:
+            # Losing the insert race means another request already rotated it
+            if not revoke(jti, datetime_from_epoch(refresh['exp'])):
+                raise InvalidToken('Token is blacklisted')
+        return data
+
+class TokenRefreshRevokingView(TokenRefreshView):
+    serializer_class = RevokingTokenRefreshSerializer
+
+class UserProfileView(InstrumentedViewMixin, generics.RetrieveAPIView):
     """
     Returns the profile of the currently authenticated user.
     Used by the frontend to determine if a user is staff.
@@ -81,7 +111,7 @@ class UserProfileView(generics.RetrieveAPIView):
         user.license_image_url = license_image_url
         return user
 
-class UserListView(generics.ListAPIView):
+class UserListView(InstrumentedViewMixin, generics.ListAPIView):
     """
     Admin endpoint to list all users (customers).
     """